@@ -0,0 +1,29 @@
+"""Atomic file replacement for build artifacts.
+
+Artifacts are written to a temporary file next to the target and renamed
+over it once complete, so a reader (e.g. the web server hosting the
+leaderboard) sees either the old or the new file, never a half-written one.
+"""
+import os
+import tempfile
+from contextlib import contextmanager
+
+
+@contextmanager
+def atomic_open(path, mode='wb', **kwargs):
+    """Open a temporary file that replaces path when the block exits without error"""
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=os.path.basename(path) + '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, mode, **kwargs) as f:
+            yield f
+        # mkstemp creates the file 0600; give it the usual permissions
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(tmp_path, 0o666 & ~umask)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
@@ -0,0 +1,223 @@
+"""End-to-end performance harness against the local stand-in sheet server.
+
+Runs the full fetch -> process -> html (-> plots) flow several times against
+benchmarks/sheet_server.py and asserts on latency and on the conditional
+fetch cache:
+
+  1. cold run            -> cache miss, all artifacts written
+  2. unchanged sheet     -> cache hit (304), same leaderboard
+  3. edited sheet        -> cache miss, new leaderboard
+  4. transient failures  -> retried with backoff, build succeeds
+  5. sheet server down   -> build fails after retries, cached copy left intact
+  6. several tracks      -> fetched concurrently, one leaderboard per track
+  7. watch mode          -> conditional polls, edit picked up within seconds
+
+    python benchmarks/e2e_harness.py --systems 200 --latency 0.1 --max-seconds 10
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARK_DIR))
+
+from sheet_server import export_path, start_server  # noqa: E402
+from synthetic_sheet import write_synthetic_sheet  # noqa: E402
+
+
+def run_build(argv, report_file):
+    """Run the leaderboard CLI in-process; returns (wall seconds, report dict)"""
+    import create_leaderboard
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        create_leaderboard.main(['--report', report_file] + argv)
+    wall = time.perf_counter() - start
+    with open(report_file) as f:
+        return wall, json.load(f)
+
+
+def stage(report, name):
+    """First stage entry with the given name"""
+    return next(entry for entry in report['stages'] if entry['name'] == name)
+
+
+def read(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def wait_for(condition, timeout=10.0):
+    """Poll condition until it returns something truthy (or timeout); returns its last value"""
+    deadline = time.monotonic() + timeout
+    while True:
+        value = condition()
+        if value or time.monotonic() > deadline:
+            return value
+        time.sleep(0.02)
+
+
+def check(condition, message):
+    """Assert with a readable message (kept under python -O)"""
+    if not condition:
+        raise AssertionError(message)
+    print(f"  ✅ {message}")
+
+
+def main(argv=None):
+    """Run the end-to-end scenarios and print per-run latency"""
+    parser = argparse.ArgumentParser(description="End-to-end harness against the local stand-in sheet server")
+    parser.add_argument('--systems', type=int, default=50, help="systems in the fixture sheet")
+    parser.add_argument('--latency', type=float, default=0.05, help="injected server latency in seconds")
+    parser.add_argument('--max-seconds', type=float, default=30.0, help="latency budget of a single build")
+    parser.add_argument('--with-plots', action='store_true', help="also run the plots stage")
+    args = parser.parse_args(argv)
+
+    if args.with_plots:
+        import matplotlib
+        matplotlib.use('Agg')
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        fixture = write_synthetic_sheet(os.path.join(work_dir, 'fixture.csv'), args.systems)
+        server, base_url = start_server(fixture, latency=args.latency)
+        state = server.state
+        url = base_url + export_path()
+
+        output_dir = os.path.join(work_dir, 'leaderboard')
+        cache = os.path.join(work_dir, 'cache', 'sheet_export.csv')
+        report_file = os.path.join(work_dir, 'report.json')
+        # Without a subcommand the CLI runs fetch, process and html
+        build = ['--source', url, '--sheet-cache', cache, '--output-dir', output_dir,
+                 '--plots-dir', os.path.join(work_dir, 'plots')] + (['all'] if args.with_plots else [])
+        csv_file = os.path.join(output_dir, 'leaderboard_data.csv')
+        html_file = os.path.join(output_dir, 'deepscholar_bench_leaderboard.html')
+
+        def full_build():
+            return run_build(build, report_file)
+
+        timings = []
+        try:
+            print("🧪 1. Cold run")
+            wall, report = full_build()
+            timings.append(('cold', wall))
+            check(stage(report, 'fetch')['cache'] == 'miss', "fetch is a cache miss")
+            check(state.stats['ok'] == 1, "server served the export once")
+            check(os.path.exists(csv_file) and os.path.exists(html_file), "CSV and HTML written")
+            check(stage(report, 'fetch')['wall_s'] >= args.latency, "fetch includes the injected latency")
+            check(wall <= args.max_seconds, f"build took {wall:.2f}s <= {args.max_seconds}s")
+            first_csv = read(csv_file)
+
+            print("🧪 2. Unchanged sheet")
+            wall, report = full_build()
+            timings.append(('unchanged', wall))
+            check(stage(report, 'fetch')['cache'] == 'hit', "fetch is a cache hit")
+            check(state.stats['not_modified'] == 1, "server answered 304 Not Modified")
+            check(read(csv_file) == first_csv, "leaderboard unchanged")
+            check(wall <= args.max_seconds, f"build took {wall:.2f}s <= {args.max_seconds}s")
+
+            print("🧪 3. Edited sheet")
+            write_synthetic_sheet(fixture, args.systems, seed=1)
+            wall, report = full_build()
+            timings.append(('edited', wall))
+            check(stage(report, 'fetch')['cache'] == 'miss', "fetch is a cache miss")
+            check(state.stats['ok'] == 2, "server served the new export")
+            check(read(csv_file) != first_csv, "leaderboard updated")
+            check(wall <= args.max_seconds, f"build took {wall:.2f}s <= {args.max_seconds}s")
+
+            print("🧪 4. Transient server failures")
+            write_synthetic_sheet(fixture, args.systems, seed=2)
+            failed_before = state.stats['failed']
+            state.fail_first = state.stats['requests'] + 2
+            wall, report = full_build()
+            timings.append(('transient', wall))
+            check(state.stats['failed'] == failed_before + 2, "two requests failed")
+            check(stage(report, 'fetch')['cache'] == 'miss', "fetch succeeded after retrying")
+            check(read(csv_file) != first_csv, "leaderboard updated")
+
+            print("🧪 5. Sheet server failing")
+            cached_copy = read(cache)
+            state.fail_rate = 1.0
+            start = time.perf_counter()
+            try:
+                run_build(['--source', url, '--sheet-cache', cache, '--retries', '2', 'fetch'], report_file)
+                failed = False
+            except OSError:
+                failed = True
+            timings.append(('failing', time.perf_counter() - start))
+            state.fail_rate = 0.0
+            check(failed, "fetch fails when the server keeps failing")
+            check(state.stats['failed'] == failed_before + 2 + 3, "request retried twice before giving up")
+            check(read(cache) == cached_copy, "cached copy left intact")
+        finally:
+            server.shutdown()
+
+        print("🧪 6. Several tracks")
+        track_dir = os.path.join(work_dir, 'tracks')
+        os.makedirs(track_dir)
+        names = ['main', 'archive', 'ablation']
+        for gid, name in enumerate(names):
+            write_synthetic_sheet(os.path.join(track_dir, f'{gid}.csv'), args.systems, seed=gid)
+        track_latency = max(args.latency, 0.2)
+        server, base_url = start_server(track_dir, latency=track_latency)
+        tracks_file = os.path.join(work_dir, 'tracks.json')
+        with open(tracks_file, 'w') as f:
+            json.dump({'tracks': [{'name': name, 'url': base_url + export_path(gid=str(gid))}
+                                  for gid, name in enumerate(names)]}, f)
+        try:
+            wall, report = run_build(['--tracks', tracks_file, '--sheet-cache', cache, '--output-dir', output_dir,
+                                      '--plots-dir', os.path.join(work_dir, 'plots')], report_file)
+            timings.append(('tracks', wall))
+            fetch_wall = stage(report, 'fetch_tracks')['wall_s']
+            check(server.state.stats['ok'] == len(names), "every track fetched once")
+            check(fetch_wall < 2 * track_latency, f"concurrent fetch took {fetch_wall:.2f}s < 2 x {track_latency}s latency")
+            check(all(os.path.exists(os.path.join(output_dir, name, 'deepscholar_bench_leaderboard.html'))
+                      for name in names), "one leaderboard per track")
+            check(len({read(os.path.join(output_dir, name, 'leaderboard_data.csv')) for name in names}) == len(names),
+                  "tracks built from their own sheets")
+        finally:
+            server.shutdown()
+
+        print("🧪 7. Watch mode")
+        server, base_url = start_server(fixture, latency=args.latency)
+        url = base_url + export_path()
+        watch_dir = os.path.join(work_dir, 'watch')
+        watch_csv = os.path.join(watch_dir, 'leaderboard_data.csv')
+        watch_argv = ['--source', url, '--sheet-cache', os.path.join(work_dir, 'watch_cache', 'sheet.csv'),
+                      '--output-dir', watch_dir, 'watch', '--interval', '0.1', '--debounce', '0.2',
+                      '--max-polls', '40']
+        try:
+            import create_leaderboard
+
+            with contextlib.redirect_stdout(io.StringIO()):
+                watcher = threading.Thread(target=create_leaderboard.main, args=(watch_argv,))
+                watcher.start()
+                first_csv = wait_for(lambda: os.path.exists(watch_csv) and read(watch_csv))
+                time.sleep(0.3)
+                write_synthetic_sheet(fixture, args.systems, seed=3)
+                start = time.perf_counter()
+                updated = wait_for(lambda: read(watch_csv) != first_csv)
+                pickup = time.perf_counter() - start
+                watcher.join()
+            timings.append(('watch', pickup))
+            check(first_csv, "watch built the leaderboard on start")
+            check(updated, f"edit picked up after {pickup:.2f}s")
+            check(server.state.stats['not_modified'] > 0, "unchanged polls answered 304")
+            check(server.state.stats['ok'] == 2, "export downloaded once per version")
+            check(not [name for name in os.listdir(watch_dir) if name.endswith('.tmp')], "no temporary files left")
+        finally:
+            server.shutdown()
+
+        print("\n⏱️  Build latency")
+        for name, wall in timings:
+            print(f"  {name:<10} {wall:.3f}s")
+        print(f"📡 Server stats: {state.stats}")
+
+
+if __name__ == "__main__":
+    main()
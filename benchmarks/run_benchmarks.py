@@ -0,0 +1,191 @@
+"""Synthetic-scale benchmarks for the leaderboard and spider-plot pipelines.
+
+Times process_data (and the fast engine), create_html_leaderboard,
+diff_leaderboards, dominance_layers, get_model_data, both spider-plot generators and the
+metric distribution plot on
+synthetic sheets of 10 to 100,000 systems, and stores the results as JSON under
+benchmarks/results/ so runs can be compared across commits:
+
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --sizes 10 1000 --extra-metrics 0 50
+    python benchmarks/run_benchmarks.py --compare results/old.json results/new.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARK_DIR))
+
+from synthetic_sheet import write_synthetic_sheet  # noqa: E402
+
+DEFAULT_SIZES = [10, 100, 1000, 10000, 100000]
+RESULTS_DIR = os.path.join(BENCHMARK_DIR, 'results')
+
+
+def time_call(func, repeats):
+    """Run func repeats times and return the list of wall times"""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            func()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def git_commit():
+    """Short hash of the checked-out commit ('unknown' outside git)"""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=BENCHMARK_DIR, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def run_suite(sizes, extra_metrics, repeats, max_plot_systems, work_dir):
+    """Run every benchmark for every (size, extra metric count) and return the result rows"""
+    import matplotlib
+    matplotlib.use('Agg')
+
+    import create_leaderboard
+    import fast_engine
+    import leaderboard_diff
+    import pareto
+    import spiderplot_unified
+
+    results = []
+
+    def record(benchmark, n_systems, n_extra, timings):
+        results.append({
+            'benchmark': benchmark,
+            'systems': n_systems,
+            'extra_metrics': n_extra,
+            'repeats': len(timings),
+            'min_s': min(timings),
+            'median_s': statistics.median(timings),
+        })
+        print(f"  {benchmark:<28} {n_systems:>7} systems {n_extra:>3} extra  "
+              f"min {min(timings):.4f}s  median {statistics.median(timings):.4f}s")
+
+    for n_extra in extra_metrics:
+        for n_systems in sizes:
+            sheet = write_synthetic_sheet(os.path.join(work_dir, f'sheet_{n_systems}_{n_extra}.csv'),
+                                          n_systems, n_extra)
+            print(f"\n📏 {n_systems} systems, {n_extra} extra metric columns")
+
+            df = create_leaderboard.load_data(sheet)
+            record('load_data', n_systems, n_extra, time_call(lambda: create_leaderboard.load_data(sheet), repeats))
+            record('process_data', n_systems, n_extra,
+                   time_call(lambda: create_leaderboard.process_data(df), repeats))
+
+            columns, rows = fast_engine.load_rows(sheet)
+            record('fast_engine.process_rows', n_systems, n_extra,
+                   time_call(lambda: fast_engine.process_rows(columns, rows), repeats))
+
+            data, metric_columns = create_leaderboard.process_data(df)
+            record('create_html_leaderboard', n_systems, n_extra,
+                   time_call(lambda: create_leaderboard.create_html_leaderboard(data, metric_columns), repeats))
+
+            # Worst case for the diff: every system moved
+            table = leaderboard_diff.leaderboard_table(data, metric_columns)
+            shuffled = (table[0], table[1][::-1])
+            record('diff_leaderboards', n_systems, n_extra,
+                   time_call(lambda: leaderboard_diff.diff_leaderboards(table, shuffled), repeats))
+
+            scores = data[metric_columns].to_numpy(dtype=float)
+            record('dominance_layers', n_systems, n_extra,
+                   time_call(lambda: pareto.dominance_layers(scores), repeats))
+
+            with contextlib.redirect_stdout(io.StringIO()):
+                spiderplot_unified.load_data(sheet)
+            models = spiderplot_unified.get_models_for_group('llama_only')
+            record('get_model_data', n_systems, n_extra,
+                   time_call(lambda: spiderplot_unified.get_model_data(
+                       models, spiderplot_unified.metrics_to_plot, spiderplot_unified.global_color_map), repeats))
+
+            # Drawing one polygon per system stops being meaningful long before 100k systems
+            if n_systems <= max_plot_systems:
+                plots_dir = os.path.join(work_dir, 'plots')
+                record('generate_individual_plots', n_systems, n_extra,
+                       time_call(lambda: spiderplot_unified.generate_individual_plots(plots_dir), 1))
+                record('generate_combined_plot', n_systems, n_extra,
+                       time_call(lambda: spiderplot_unified.generate_combined_plot(plots_dir), 1))
+                record('generate_distribution_plot', n_systems, n_extra,
+                       time_call(lambda: spiderplot_unified.generate_distribution_plot(plots_dir), 1))
+                spiderplot_unified.plt.close('all')
+    return results
+
+
+def compare(old_file, new_file):
+    """Print the median time ratio new/old of every benchmark present in both files"""
+    with open(old_file) as f:
+        old = json.load(f)
+    with open(new_file) as f:
+        new = json.load(f)
+
+    def key(row):
+        return row['benchmark'], row['systems'], row['extra_metrics']
+
+    old_rows = {key(row): row for row in old['results']}
+    print(f"{'benchmark':<28} {'systems':>8} {'extra':>6} {old['commit']:>10} {new['commit']:>10}  ratio")
+    for row in new['results']:
+        if key(row) in old_rows:
+            before = old_rows[key(row)]['median_s']
+            after = row['median_s']
+            print(f"{row['benchmark']:<28} {row['systems']:>8} {row['extra_metrics']:>6} "
+                  f"{before:>9.4f}s {after:>9.4f}s  {after / before if before else float('nan'):.2f}x")
+
+
+def main(argv=None):
+    """Run the benchmark suite (or compare two result files)"""
+    parser = argparse.ArgumentParser(description="Benchmark the leaderboard and plot pipelines on synthetic sheets")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help="numbers of systems")
+    parser.add_argument('--extra-metrics', type=int, nargs='+', default=[0],
+                        help="numbers of extra (non-leaderboard) metric columns in the sheet")
+    parser.add_argument('--repeats', type=int, default=3, help="repetitions of each timed call")
+    parser.add_argument('--max-plot-systems', type=int, default=1000,
+                        help="skip the spider-plot generators above this many systems")
+    parser.add_argument('--output', default=None, help="result file (default: results/<date>_<commit>.json)")
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'), help="compare two result files and exit")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    print("⏱️  DeepScholar-Bench pipeline benchmarks")
+    with tempfile.TemporaryDirectory() as work_dir:
+        results = run_suite(args.sizes, args.extra_metrics, args.repeats, args.max_plot_systems, work_dir)
+
+    import numpy
+    import pandas
+
+    commit = git_commit()
+    started = datetime.now(timezone.utc)
+    output = args.output or os.path.join(RESULTS_DIR, f"{started:%Y%m%d-%H%M%S}_{commit}.json")
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump({
+            'commit': commit,
+            'timestamp': started.isoformat(),
+            'python': platform.python_version(),
+            'numpy': numpy.__version__,
+            'pandas': pandas.__version__,
+            'platform': platform.platform(),
+            'results': results,
+        }, f, indent=2)
+    print(f"\n💾 Results saved to: {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""Local stand-in for the Google Sheets CSV export.
+
+Serves fixture CSVs at the same path layout as docs.google.com
+(/spreadsheets/d/<sheet id>/export?format=csv&gid=<gid>), with ETag /
+If-None-Match support, injected latency and injected failures, so the
+pipeline can be run and timed without network access:
+
+    python benchmarks/sheet_server.py fixture.csv --port 8765 --latency 0.2
+    DEEPSCHOLAR_SHEET_URL="http://127.0.0.1:8765/spreadsheets/d/x/export?format=csv&gid=0" \\
+        python create_leaderboard.py
+
+A fixture directory serves <gid>.csv for each gid; a single file is served
+for every gid. Request counters are available as JSON at /_stats.
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+class SheetServerState:
+    """Fixtures, fault injection settings and request counters shared by the handler threads"""
+
+    def __init__(self, fixture, latency=0.0, fail_rate=0.0, fail_first=0, fail_status=500, use_etag=True, seed=0):
+        self.fixture = fixture
+        self.latency = latency
+        self.fail_rate = fail_rate
+        self.fail_first = fail_first
+        self.fail_status = fail_status
+        self.use_etag = use_etag
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.stats = {'requests': 0, 'ok': 0, 'not_modified': 0, 'failed': 0, 'not_found': 0, 'bytes_out': 0}
+
+    def fixture_path(self, gid):
+        """File served for a gid"""
+        if os.path.isdir(self.fixture):
+            return os.path.join(self.fixture, f"{gid}.csv")
+        return self.fixture
+
+    def count(self, key, amount=1):
+        with self.lock:
+            self.stats[key] += amount
+
+    def should_fail(self):
+        """Decide whether the current request gets an injected failure"""
+        with self.lock:
+            if self.stats['requests'] <= self.fail_first:
+                return True
+            return self.random.random() < self.fail_rate
+
+
+class SheetRequestHandler(BaseHTTPRequestHandler):
+    """Handles export requests against the server's SheetServerState"""
+
+    # Keep-alive, like the real export endpoint (every response carries a Content-Length)
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send(self, status, body=b'', headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if body and self.command != 'HEAD':
+            self.wfile.write(body)
+
+    def do_GET(self):
+        state = self.server.state
+        url = urlparse(self.path)
+
+        if url.path == '/_stats':
+            with state.lock:
+                body = json.dumps(state.stats).encode()
+            self._send(200, body, {'Content-Type': 'application/json'})
+            return
+
+        state.count('requests')
+        if state.latency:
+            time.sleep(state.latency)
+        if state.should_fail():
+            state.count('failed')
+            self._send(state.fail_status, b'injected failure')
+            return
+
+        gid = parse_qs(url.query).get('gid', ['0'])[0]
+        path = state.fixture_path(gid)
+        if not url.path.endswith('/export') or not os.path.isfile(path):
+            state.count('not_found')
+            self._send(404, b'not found')
+            return
+
+        with open(path, 'rb') as f:
+            body = f.read()
+        etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        if state.use_etag and self.headers.get('If-None-Match') == etag:
+            state.count('not_modified')
+            self._send(304, headers={'ETag': etag})
+            return
+
+        state.count('ok')
+        state.count('bytes_out', len(body))
+        headers = {'Content-Type': 'text/csv; charset=utf-8'}
+        if state.use_etag:
+            headers['ETag'] = etag
+        self._send(200, body, headers)
+
+    do_HEAD = do_GET
+
+
+def start_server(fixture, host='127.0.0.1', port=0, verbose=False, **options):
+    """Start the stand-in server in a background thread; returns (server, base URL)"""
+    server = ThreadingHTTPServer((host, port), SheetRequestHandler)
+    server.daemon_threads = True
+    server.state = SheetServerState(fixture, **options)
+    server.verbose = verbose
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def export_path(sheet_id='stand-in', gid='0'):
+    """Path of an export URL on the stand-in server"""
+    return f"/spreadsheets/d/{sheet_id}/export?format=csv&gid={gid}"
+
+
+def main(argv=None):
+    """Run the stand-in server in the foreground"""
+    parser = argparse.ArgumentParser(description="Serve fixture CSVs like the Google Sheets export")
+    parser.add_argument('fixture', help="CSV served for every gid, or a directory of <gid>.csv files")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.0, help="seconds to wait before each response")
+    parser.add_argument('--fail-rate', type=float, default=0.0, help="probability of an injected failure")
+    parser.add_argument('--fail-first', type=int, default=0, help="fail the first N requests")
+    parser.add_argument('--fail-status', type=int, default=500, help="HTTP status of injected failures")
+    parser.add_argument('--no-etag', action='store_true', help="do not send ETags or answer 304")
+    parser.add_argument('-v', '--verbose', action='store_true', help="log every request")
+    args = parser.parse_args(argv)
+
+    server, base_url = start_server(args.fixture, args.host, args.port, verbose=args.verbose,
+                                    latency=args.latency, fail_rate=args.fail_rate, fail_first=args.fail_first,
+                                    fail_status=args.fail_status, use_etag=not args.no_etag)
+    print(f"📡 Serving {args.fixture} at {base_url}{export_path()}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Synthetic Google Sheets exports for benchmarking.
+
+Writes CSVs in the exact layout load_data expects (a title row, then the
+header row, then one row per system), with the seven registry metrics in
+the same mix of percent / fraction cells, occasional missing values and
+any number of extra metric columns.
+"""
+import csv
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from metrics import METRIC_SPECS  # noqa: E402
+
+LMS = ['o3', 'GPT4.1', 'Claude-opus-4', 'Gemini-2.5-pro', 'Llama-4-scout', 'GPT4.1, o3']
+SYSTEM_TYPES = ['Open', 'Closed', 'Open Pipeline', 'Closed Pipeline']
+
+
+def write_synthetic_sheet(path, n_systems, n_extra_metrics=0, missing_rate=0.05, seed=0):
+    """Write a synthetic sheet export with n_systems rows and return its path"""
+    rng = np.random.default_rng(seed)
+    extra_columns = [f"extra metric {i}" for i in range(n_extra_metrics)]
+    header = ['System Name', 'lm', 'open/close'] + [spec['column'] for spec in METRIC_SPECS] + extra_columns
+
+    values = rng.random((n_systems, len(METRIC_SPECS) + n_extra_metrics))
+    missing = rng.random(values.shape) < missing_rate
+    lms = rng.integers(len(LMS), size=n_systems)
+    types = rng.integers(len(SYSTEM_TYPES), size=n_systems)
+
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Synthetic DeepScholar-Bench results'] + [''] * (len(header) - 1))
+        writer.writerow(header)
+        for i in range(n_systems):
+            row = [f"System {i} ({LMS[lms[i]]})", LMS[lms[i]], SYSTEM_TYPES[types[i]]]
+            for j, value in enumerate(values[i]):
+                if missing[i, j]:
+                    row.append('')
+                elif j < len(METRIC_SPECS) and METRIC_SPECS[j]['percent']:
+                    row.append(f"{value * 100:.2f}%")
+                else:
+                    row.append(f"{value:.4f}")
+            writer.writerow(row)
+    return path
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Write a synthetic sheet export")
+    parser.add_argument('path')
+    parser.add_argument('--systems', type=int, default=100)
+    parser.add_argument('--extra-metrics', type=int, default=0)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    write_synthetic_sheet(args.path, args.systems, args.extra_metrics, seed=args.seed)
+    print(f"Wrote {args.systems} systems to: {args.path}")
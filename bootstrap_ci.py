@@ -0,0 +1,172 @@
+"""Bootstrap confidence intervals for the leaderboard metrics and ranks.
+
+The queries of a score-cube slice are resampled with replacement. Each
+resample is a row of an index matrix drawn in one call; the index matrix is
+turned into per-query weights, so the resampled means of every system and
+metric are one matrix product of the weights with the (queries x systems
+* metrics) scores. All systems share the same resamples (a paired
+bootstrap), which is what makes the rank intervals meaningful.
+
+Resamples are processed in chunks that bound the size of the index matrix;
+with jobs > 1 the chunks are spread over a process pool, each worker
+memory-mapping the cube. Every chunk has its own seed spawned from the
+base seed, so the intervals do not depend on the number of workers.
+"""
+import csv
+import json
+import os
+
+import numpy as np
+
+from atomic_io import atomic_open
+from metrics import METRIC_DISPLAY_NAMES, METRIC_SPECS, compile_specs, normalize_matrix
+from score_cube import DOC_POSITION, ORG_POSITION, SYSTEM_BLOCK, ScoreCube
+
+DEFAULT_RESAMPLES = 1000
+DEFAULT_CONFIDENCE = 0.95
+
+# Upper bound on the cells of one chunk's index matrix (resamples x queries)
+MAX_INDEX_CELLS = 1 << 22
+
+INTERVALS_CSV = 'leaderboard_ci.csv'
+INTERVALS_JSON = 'leaderboard_ci.json'
+
+def resample_weights(rng, n_queries, n_resamples):
+    """(resamples x queries) count of each query in each resample, from one index matrix"""
+    index = rng.integers(0, n_queries, size=(n_resamples, n_queries))
+    index += np.arange(n_resamples)[:, np.newaxis] * n_queries
+    return np.bincount(index.ravel(), minlength=n_resamples * n_queries).reshape(n_resamples, n_queries).astype(float)
+
+
+def leaderboard_ranks(values):
+    """1-based process_data ranks (Org. then Doc. Imp., descending, ties in row order) along the last axis but one
+
+    values: (..., systems, metrics) normalised scores.
+    """
+    order = np.lexsort((-values[..., DOC_POSITION], -values[..., ORG_POSITION]), axis=-1)
+    ranks = np.empty(order.shape, dtype=np.int32)
+    np.put_along_axis(ranks, order, np.broadcast_to(np.arange(1, order.shape[-1] + 1, dtype=np.int32), order.shape),
+                      axis=-1)
+    return ranks
+
+
+def resampled_scores(scores, systems, queries, weights):
+    """(resamples x systems x metrics) normalised means of the given systems and queries of the raw score cube"""
+    n_systems, n_queries, n_metrics = len(systems), len(queries), scores.shape[2]
+    compiled = compile_specs()
+    means = np.empty((len(weights), n_systems, n_metrics))
+    for start in range(0, n_systems, SYSTEM_BLOCK):
+        # Only one block of systems is read from the memory-mapped cube at a time
+        block = scores[systems[start:start + SYSTEM_BLOCK]][:, queries]
+        valid = ~np.isnan(block)
+        # queries x (systems * metrics), so a resample is a weighted sum over rows
+        values = np.where(valid, block, 0.0).transpose(1, 0, 2).reshape(n_queries, -1)
+        counts = valid.transpose(1, 0, 2).reshape(n_queries, -1).astype(float)
+        sums = weights @ values
+        totals = weights @ counts
+        with np.errstate(invalid='ignore', divide='ignore'):
+            block_means = np.where(totals > 0, sums / np.maximum(totals, 1), np.nan)
+        means[:, start:start + SYSTEM_BLOCK] = block_means.reshape(len(weights), -1, n_metrics)
+    return normalize_matrix(means, compiled)
+
+
+def _chunk(scores, systems, queries, seed, n_resamples):
+    """Normalised scores and ranks of one chunk of resamples"""
+    rng = np.random.default_rng(seed)
+    values = resampled_scores(scores, systems, queries, resample_weights(rng, len(queries), n_resamples))
+    return values, leaderboard_ranks(values)
+
+
+def _cube_chunk(cube_dir, systems, queries, seed, n_resamples):
+    """Worker: one chunk of resamples, memory-mapping the cube in the worker process"""
+    return _chunk(ScoreCube(cube_dir).scores, systems, queries, seed, n_resamples)
+
+
+def _chunk_sizes(n_resamples, n_queries):
+    size = max(1, MAX_INDEX_CELLS // max(n_queries, 1))
+    return [min(size, n_resamples - start) for start in range(0, n_resamples, size)]
+
+
+def bootstrap(cube, mask, n_resamples=DEFAULT_RESAMPLES, confidence=DEFAULT_CONFIDENCE, seed=0, jobs=None):
+    """Bootstrap intervals of the slice of a ScoreCube selected by a query mask.
+
+    Returns a dict with the systems on the slice leaderboard (in rank order)
+    and (systems x metrics) arrays 'value', 'lower', 'upper', plus the
+    point 'rank' and its 'rank_lower'/'rank_upper' interval. jobs: worker
+    processes for the chunks of resamples (default: one per CPU).
+    """
+    queries = np.flatnonzero(mask)
+    # Point estimates exactly as on the slice leaderboard; rows of the resamples follow the same order
+    systems, point = cube.ranked_systems(mask)
+
+    sizes = _chunk_sizes(n_resamples, len(queries))
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    jobs = jobs or os.cpu_count() or 1
+    if jobs > 1 and len(sizes) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            chunks = list(pool.map(_cube_chunk, [cube.cube_dir] * len(sizes), [systems] * len(sizes),
+                                   [queries] * len(sizes), seeds, sizes))
+    else:
+        chunks = [_chunk(cube.scores, systems, queries, chunk_seed, size) for chunk_seed, size in zip(seeds, sizes)]
+    values = np.concatenate([chunk[0] for chunk in chunks])
+    ranks = np.concatenate([chunk[1] for chunk in chunks])
+
+    tail = (1 - confidence) / 2 * 100
+    lower, upper = np.percentile(values, [tail, 100 - tail], axis=0)
+    rank_lower, rank_upper = np.percentile(ranks, [tail, 100 - tail], axis=0, method='nearest')
+    return {
+        'systems': [cube.systems[i] for i in systems],
+        'metric_columns': [METRIC_DISPLAY_NAMES.get(spec['column'], spec['display']) for spec in METRIC_SPECS],
+        'value': point,
+        'lower': lower,
+        'upper': upper,
+        'rank': np.arange(1, len(systems) + 1),
+        'rank_lower': rank_lower.astype(int),
+        'rank_upper': rank_upper.astype(int),
+        'resamples': n_resamples,
+        'confidence': confidence,
+        'queries': len(queries),
+    }
+
+
+def intervals_json(result):
+    """JSON-serialisable form of a bootstrap result (also the input of the page's error bars)"""
+    systems = []
+    for i, system in enumerate(result['systems']):
+        systems.append({
+            'system': system['System Name'],
+            'lm': system['lm'] or '',
+            'system_type': system['open/close'] or '',
+            'rank': int(result['rank'][i]),
+            'rank_interval': [int(result['rank_lower'][i]), int(result['rank_upper'][i])],
+            'metrics': {metric: {'value': round(float(result['value'][i, j]), 6),
+                                 'lower': round(float(result['lower'][i, j]), 6),
+                                 'upper': round(float(result['upper'][i, j]), 6)}
+                        for j, metric in enumerate(result['metric_columns'])},
+        })
+    return {'confidence': result['confidence'], 'resamples': result['resamples'], 'queries': result['queries'],
+            'systems': systems}
+
+
+def write_intervals(result, output_dir):
+    """Save the intervals as leaderboard_ci.csv and leaderboard_ci.json (atomically); returns the JSON dict"""
+    data = intervals_json(result)
+    with atomic_open(os.path.join(output_dir, INTERVALS_JSON), 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2)
+
+    header = ['System Name', 'lm', 'System Type', 'Rank', 'Rank Low', 'Rank High']
+    for metric in result['metric_columns']:
+        header += [metric, f"{metric} Low", f"{metric} High"]
+    with atomic_open(os.path.join(output_dir, INTERVALS_CSV), 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        for entry in data['systems']:
+            row = [entry['system'], entry['lm'], entry['system_type'], entry['rank'], *entry['rank_interval']]
+            for metric in result['metric_columns']:
+                cell = entry['metrics'][metric]
+                row += [cell['value'], cell['lower'], cell['upper']]
+            writer.writerow(row)
+    return data
+
@@ -0,0 +1,182 @@
+"""How correlated are the leaderboard metrics? Correlation matrices and a redundancy check.
+
+Across systems, the Pearson matrix is one product of the standardised
+(systems x metrics) score matrix with itself, and the Spearman matrix the
+same on average ranks. Over per-query scores (score cube), PearsonAccumulator
+folds chunks of (rows x metrics) values into pairwise-complete sums with a
+few matrix products per chunk, so the full cube is never loaded at once.
+
+A pair of metrics whose |correlation| reaches REDUNDANCY_THRESHOLD is
+flagged as redundant; the process stage compares the flags with those of
+the previous build, so a metric pair becoming redundant as the leaderboard
+grows is reported.
+"""
+import json
+from datetime import datetime, timezone
+
+import numpy as np
+
+from atomic_io import atomic_open
+
+REDUNDANCY_THRESHOLD = 0.95
+CORRELATION_FILE = 'leaderboard_correlation.json'
+
+# Queries per chunk when correlating the per-query scores of a score cube
+QUERY_CHUNK = 1024
+
+
+def pearson(values):
+    """(metrics x metrics) Pearson correlation of the columns of a (rows x metrics) matrix; NaN for constant columns"""
+    values = np.asarray(values, dtype=float)
+    centered = values - values.mean(axis=0)
+    norms = np.sqrt((centered ** 2).sum(axis=0))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        standardized = centered / norms
+    return np.clip(standardized.T @ standardized, -1.0, 1.0)
+
+
+def average_ranks(values):
+    """Ranks of every column (1 = lowest), ties sharing their average rank"""
+    values = np.asarray(values, dtype=float)
+    n_rows = len(values)
+    order = np.argsort(values, axis=0, kind='stable')
+    ordered = np.take_along_axis(values, order, axis=0)
+    starts = np.ones(values.shape, dtype=bool)
+    starts[1:] = ordered[1:] != ordered[:-1]
+    ends = np.ones(values.shape, dtype=bool)
+    ends[:-1] = starts[1:]
+    positions = np.arange(1, n_rows + 1, dtype=float)[:, np.newaxis]
+    first = np.maximum.accumulate(np.where(starts, positions, 0), axis=0)
+    last = np.minimum.accumulate(np.where(ends, positions, n_rows + 1)[::-1], axis=0)[::-1]
+    ranks = np.empty(values.shape)
+    np.put_along_axis(ranks, order, (first + last) / 2, axis=0)
+    return ranks
+
+
+def spearman(values):
+    """(metrics x metrics) Spearman rank correlation of the columns of a (rows x metrics) matrix"""
+    return pearson(average_ranks(values))
+
+
+class PearsonAccumulator:
+    """Pairwise-complete Pearson correlation over chunks of (rows x metrics) values with NaN for missing"""
+
+    def __init__(self, n_metrics):
+        shape = (n_metrics, n_metrics)
+        self.count = np.zeros(shape)
+        self.sum = np.zeros(shape)  # sum[i, j]: sum of metric i over rows where i and j are both present
+        self.sum_squares = np.zeros(shape)
+        self.products = np.zeros(shape)
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float)
+        valid = (~np.isnan(values)).astype(float)
+        filled = np.where(valid > 0, values, 0.0)
+        self.count += valid.T @ valid
+        self.sum += filled.T @ valid
+        self.sum_squares += (filled ** 2).T @ valid
+        self.products += filled.T @ filled
+
+    def correlation(self):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            covariance = self.products - self.sum * self.sum.T / self.count
+            variance = self.sum_squares - self.sum ** 2 / self.count
+            return np.clip(covariance / np.sqrt(variance * variance.T), -1.0, 1.0)
+
+
+def cube_pearson(cube, mask, chunk=QUERY_CHUNK):
+    """Pearson correlation of the metrics over every (system, query) of a score cube slice, read in query chunks"""
+    queries = np.flatnonzero(mask)
+    accumulator = PearsonAccumulator(cube.scores.shape[2])
+    for start in range(0, len(queries), chunk):
+        block = cube.scores[:, queries[start:start + chunk]]
+        accumulator.update(block.reshape(-1, block.shape[2]))
+    return accumulator.correlation()
+
+
+def redundant_pairs(matrix, metric_columns, threshold=REDUNDANCY_THRESHOLD):
+    """[(metric, metric, correlation)] of the metric pairs with |correlation| >= threshold"""
+    rows, columns = np.nonzero(np.triu(np.abs(np.nan_to_num(matrix)) >= threshold, k=1))
+    return [(metric_columns[i], metric_columns[j], round(float(matrix[i, j]), 4)) for i, j in zip(rows, columns)]
+
+
+def correlation_report(matrices, metric_columns, systems, previous=None, threshold=REDUNDANCY_THRESHOLD):
+    """JSON-serialisable correlation matrices and redundancy flags ({'pearson': matrix, ...})
+
+    'newly_redundant' lists the redundant pairs that were not flagged in the previous report.
+    """
+    def rounded(matrix):
+        return [[None if np.isnan(value) else round(float(value), 4) for value in row] for row in matrix]
+
+    redundant = {name: [list(pair) for pair in redundant_pairs(matrix, metric_columns, threshold)]
+                 for name, matrix in matrices.items()}
+    previously = set()
+    for pairs in ((previous or {}).get('redundant') or {}).values():
+        previously.update((first, second) for first, second, _ in pairs)
+    newly = sorted({(first, second) for pairs in redundant.values() for first, second, _ in pairs} - previously)
+    return {
+        'metrics': list(metric_columns),
+        'systems': systems,
+        'threshold': threshold,
+        'correlation': {name: rounded(matrix) for name, matrix in matrices.items()},
+        'redundant': redundant,
+        'newly_redundant': [list(pair) for pair in newly],
+        'generated': datetime.now(timezone.utc).isoformat(),
+    }
+
+
+def read_correlation(path):
+    """Report saved by write_correlation, or None"""
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_correlation(report, path):
+    """Save a correlation report as JSON (atomically)"""
+    with atomic_open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    return path
+
+
+def _heatmap_table(title, matrix, labels):
+    header = ''.join(f'<th style="padding: 4px; font-size: 0.7rem;">{label}</th>' for label in labels)
+    rows = ''
+    for label, row in zip(labels, matrix):
+        cells = ''
+        for value in row:
+            if np.isnan(value):
+                cells += '<td style="padding: 4px; text-align: center; background: #eee;">–</td>'
+                continue
+            # Blue for positive, red for negative correlation
+            color = f"rgba(102, 126, 234, {abs(value):.2f})" if value >= 0 else f"rgba(231, 76, 60, {abs(value):.2f})"
+            text = 'white' if abs(value) > 0.6 else '#333'
+            cells += f'<td style="padding: 4px; text-align: center; background: {color}; color: {text};">{value:.2f}</td>'
+        rows += f'<tr><th style="padding: 4px; font-size: 0.7rem; text-align: right;">{label}</th>{cells}</tr>'
+    return (f'<div><h4 style="color: #1e3c72; margin-bottom: 8px;">{title}</h4>'
+            f'<table style="border-collapse: collapse; font-size: 0.75rem;"><tr><th></th>{header}</tr>{rows}</table></div>')
+
+
+def render_correlation_panel(scores, metric_columns, threshold=REDUNDANCY_THRESHOLD):
+    """HTML panel with the Pearson and Spearman heatmaps of the metrics across systems ('' for < 3 systems)"""
+    if len(scores) < 3:
+        return ''
+    labels = [metric.replace('<br>', ' ') for metric in metric_columns]
+    pearson_matrix, spearman_matrix = pearson(scores), spearman(scores)
+    flagged = redundant_pairs(spearman_matrix, labels, threshold) + redundant_pairs(pearson_matrix, labels, threshold)
+    notes = sorted({f"{first} ~ {second}" for first, second, _ in flagged})
+    redundancy = (f"<p style=\"margin-top: 10px; color: #e74c3c;\">⚠️ Possibly redundant (|r| ≥ {threshold}): {', '.join(notes)}</p>"
+                  if notes else '')
+    return f"""
+        <!-- Metric Correlation Section -->
+        <div class="correlation-section" style="margin: 40px 30px; padding: 20px; background: #f8f9ff; border-radius: 12px; border-left: 5px solid #667eea;">
+            <h3 style="color: #1e3c72; margin-bottom: 15px;">🔗 Metric Correlations</h3>
+            <p style="margin-bottom: 15px;">Correlation of the metrics across the {len(scores)} systems of the leaderboard.</p>
+            <div style="display: flex; gap: 30px; flex-wrap: wrap;">
+                {_heatmap_table('Pearson', pearson_matrix, labels)}
+                {_heatmap_table('Spearman', spearman_matrix, labels)}
+            </div>{redundancy}
+        </div>
+"""
@@ -1,19 +1,22 @@
-import pandas as pd
-import numpy as np
+import argparse
+import csv
 import os
 from datetime import datetime
 
-def load_data():
-    """Load data from Google Sheets"""
-    # Use Sheet ID and GID from the URL
-    sheet_id = "16vmSDBJ4ylWLWAgJJ8cRg0waVmQYO4miLA5jRT3aIGE"
-    gid = "122040106"  # updated GID
-    
-    # Construct the export URL
-    csv_url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/export?format=csv&gid={gid}"
+from metrics import (METRIC_COLUMNS, METRIC_DISPLAY_NAMES, METRIC_SPECS, category_spans, compile_specs, normalize_matrix,
+                     normalize_metrics, parse_metric_values)
+from atomic_io import atomic_open
+from http_session import configure_session
+from instrumentation import RunReport, file_size
+from sheet_source import DEFAULT_SHEET_CACHE, fetch_sheet, read_sheet_csv, resolve_source, sheet_url
+
+def load_data(source=None):
+    """Load data from Google Sheets (or a local copy of the export)"""
+    # Use the configured export URL unless a local copy or another URL is given
+    csv_url = source or sheet_url()
     
     # Read the CSV into a DataFrame, using the second row as the header
-    df = pd.read_csv(csv_url, header=1)
+    df = read_sheet_csv(csv_url)
     
     # Clean whitespace in all metric names
     df.iloc[:, 0] = df.iloc[:, 0].astype(str).str.strip()
@@ -23,32 +26,17 @@ def load_data():
 
 
 
-def process_data(df):
-    """Process and clean the data for leaderboard"""
+def process_data(df, raw=None):
+    """Process and clean the data for leaderboard
+
+    raw: the matrix of raw_metric_values(df), if already parsed.
+    """
     # Filter out 'nan' systems
     df_clean = df[df['System Name'] != 'nan'].copy()
     
-    # Define the 7 metrics from spider plot
-    metrics = [
-        "Win rate (including ties as .5)",
-        "strict all", 
-        "Retreival Relevance Normalized (Avg / 2) avg over ALL user-provided reference -> any arxiv id found in the report",
-        "Document Importance RATIO (avg over median citations per reference div by gt arxiv number)",
-        "ARXIV Essential citation coverage avg per file",
-        "Citation Precision (0's for Nans)", 
-        "relaxed recall - divisor all sentences - slide 1  - 0 for nans"
-    ]
-    
-    # Create clean metric names for display
-    metric_display_names = {
-        "Win rate (including ties as .5)": "Org.",
-        "strict all": "Nugget<br>Cov.",
-        "Retreival Relevance Normalized (Avg / 2) avg over ALL user-provided reference -> any arxiv id found in the report": "Rel.<br>Rate.",
-        "Document Importance RATIO (avg over median citations per reference div by gt arxiv number)": "Doc.<br>Imp.",
-        "ARXIV Essential citation coverage avg per file": "Ref.<br>Cov.",
-        "Citation Precision (0's for Nans)": "Cite-P", 
-        "relaxed recall - divisor all sentences - slide 1  - 0 for nans": "Claim<br>Cov."
-    }
+    # The 7 metrics from the spider plot, with their display names, come from the registry
+    metrics = METRIC_COLUMNS
+    metric_display_names = METRIC_DISPLAY_NAMES
     
     # Select required columns (including the open/close column from the sheet)
     leaderboard_data = df_clean[['System Name', 'lm', 'open/close'] + metrics].copy()
@@ -56,22 +44,11 @@ def process_data(df):
     # Rename the open/close column to System Type for consistency
     leaderboard_data = leaderboard_data.rename(columns={'open/close': 'System Type'})
     
-    # Process metric values
-    for metric in metrics:
-        if metric in leaderboard_data.columns:
-            # Convert to numeric, handling percentages and NaN
-            leaderboard_data[metric] = pd.to_numeric(leaderboard_data[metric].astype(str).str.replace('%', ''), errors='coerce')
-            
-            # Convert percentage metrics to decimal
-            if metric in ["Win rate (including ties as .5)", "Citation Precision (0's for Nans)", 
-                         "relaxed recall - divisor all sentences - slide 1  - 0 for nans"]:
-                leaderboard_data[metric] = leaderboard_data[metric] / 100
-            
-            # Fill NaN with 0
-            leaderboard_data[metric] = leaderboard_data[metric].fillna(0)
-            
-            # Clip values to maximum of 1.0
-            leaderboard_data[metric] = leaderboard_data[metric].clip(upper=1.0)
+    # Convert, scale percentages, fill NaN with 0 and clip to 1.0 in a single pass
+    if raw is None:
+        leaderboard_data[metrics] = normalize_metrics(leaderboard_data)
+    else:
+        leaderboard_data[metrics] = normalize_matrix(raw, compile_specs())
     
     # Rename columns for display
     leaderboard_data = leaderboard_data.rename(columns=metric_display_names)
@@ -82,8 +59,38 @@ def process_data(df):
     
     return leaderboard_data, metric_columns
 
-def create_html_leaderboard(data, metric_columns):
-    """Create HTML leaderboard"""
+def raw_metric_values(df):
+    """Raw metric matrix of the systems process_data keeps (NaN for missing or non-numeric cells)"""
+    return parse_metric_values(df[df['System Name'] != 'nan'])
+
+def _is_missing(value):
+    """True for NaN/None cells and for empty cells read back from the CSV"""
+    return value is None or value == '' or (isinstance(value, float) and value != value)
+
+
+def _iter_records(data):
+    """Iterate over leaderboard rows given as a DataFrame or as a list of dicts"""
+    if hasattr(data, 'to_dict'):
+        return data.to_dict('records')
+    return data
+
+
+def read_leaderboard_csv(csv_file):
+    """Read a processed leaderboard CSV back without pandas"""
+    with open(csv_file, newline='', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        metric_columns = [column for column in reader.fieldnames if column not in ('System Name', 'lm', 'System Type')]
+        rows = []
+        for row in reader:
+            for metric in metric_columns:
+                row[metric] = float(row[metric])
+            rows.append(row)
+    return rows, metric_columns
+
+
+def create_html_leaderboard(data, metric_columns, changes=None, intervals=None, significance=None, win_rates=None):
+    """Create HTML leaderboard (with a "What changed" panel if a diff is given, error bars if intervals are,
+    a pairwise significance heatmap if p-values are, and per-query win rates in the head-to-head panel if given)"""
     
     # Get timestamp
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S UTC")
@@ -229,6 +236,22 @@ def create_html_leaderboard(data, metric_columns):
             color: #e74c3c;
         }}
         
+        .ci-bar {{
+            position: relative;
+            height: 4px;
+            margin-top: 4px;
+            background: #eef0fb;
+            border-radius: 2px;
+        }}
+        
+        .ci-bar span {{
+            position: absolute;
+            top: 0;
+            height: 4px;
+            background: #667eea;
+            border-radius: 2px;
+        }}
+        
 
         
         .footer {{
@@ -482,24 +505,34 @@ def create_html_leaderboard(data, metric_columns):
 
 
     # Add table structure
-    html_content += """
+    category_headers = ''.join(
+        f'\n                    <th colspan="{count}" class="category-header">{icon} {name}</th>'
+        for name, icon, count in category_spans()
+    )
+    metric_headers = ''.join(
+        f"\n                    <th onclick='sortTable({i})' style='font-size: 0.85rem;'>{spec['header']} <span class='sort-btn' data-column='{i}'>↕</span></th>"
+        for i, spec in enumerate(METRIC_SPECS, start=1)
+    )
+    # Composite rankings of every weighting profile, for the "Rank by" selector
+    import numpy as np
+    from ranking import rank_profiles, render_profile_selector
+    
+    records = _iter_records(data)
+    scores = np.array([[row[metric] for metric in metric_columns] for row in records], dtype=float)
+    scores = scores.reshape(len(records), len(metric_columns))
+    rankings = rank_profiles(scores, metric_columns)
+    html_content += render_profile_selector(rankings)
+    
+    layer_column = len(METRIC_SPECS) + 1
+    html_content += f"""
     <div class='table-container'>
         <table id='leaderboard'>
             <thead>
                 <tr>
-                    <th rowspan="2" onclick='sortTable(0)'>System Name <span class='sort-btn'>↕</span></th>
-                    <th colspan="2" class="category-header">🧠 Knowledge Synthesis</th>
-                    <th colspan="3" class="category-header">🔍 Retrieval Quality</th>
-                    <th colspan="2" class="category-header">✅ Verifiability</th>
+                    <th rowspan="2" onclick='sortTable(0)'>System Name <span class='sort-btn' data-column='0'>↕</span></th>{category_headers}
+                    <th rowspan="2" onclick='sortTable({layer_column})' style='font-size: 0.85rem;' title='Pareto layer over all metrics: 1 = no other system is at least as good on every metric and better on one'>Pareto<br>Layer <span class='sort-btn' data-column='{layer_column}'>↕</span></th>
                 </tr>
-                <tr>
-                    <th onclick='sortTable(1)' style='font-size: 0.85rem;'>Organization <span class='sort-btn'>↕</span></th>
-                    <th onclick='sortTable(2)' style='font-size: 0.85rem;'>Nugget<br>Coverage <span class='sort-btn'>↕</span></th>
-                    <th onclick='sortTable(3)' style='font-size: 0.85rem;'>Relevance<br>Rate <span class='sort-btn'>↕</span></th>
-                    <th onclick='sortTable(4)' style='font-size: 0.85rem;'>Document<br>Importance <span class='sort-btn'>↕</span></th>
-                    <th onclick='sortTable(5)' style='font-size: 0.85rem;'>Reference<br>Coverage <span class='sort-btn'>↕</span></th>
-                    <th onclick='sortTable(6)' style='font-size: 0.85rem;'>Citation<br>Precision <span class='sort-btn'>↕</span></th>
-                    <th onclick='sortTable(7)' style='font-size: 0.85rem;'>Claim<br>Coverage <span class='sort-btn'>↕</span></th>
+                <tr>{metric_headers}
                 </tr>
             </thead>
             <tbody>
@@ -519,11 +552,20 @@ def create_html_leaderboard(data, metric_columns):
     </script>
     """
     
+    # Bootstrap intervals by (System Name, lm), drawn as error bars under the scores
+    interval_rows = {(entry['system'], entry['lm']): entry for entry in intervals['systems']} if intervals else {}
+    
+    # Pareto layer of every system over all metrics, with dominance counts for the tooltips
+    from pareto import DOMINANCE_COUNT_LIMIT, dominance_counts, dominance_layers
+    
+    layers = dominance_layers(scores)
+    counts = dominance_counts(scores) if len(records) <= DOMINANCE_COUNT_LIMIT else None
+    
     # Add table rows
-    for idx, row in data.iterrows():
+    for position, row in enumerate(records):
         # Format System Type and Language Model as tags
         system_type = row['System Type']
-        lm = row['lm'] if pd.notna(row['lm']) else 'N/A'
+        lm = row['lm'] if not _is_missing(row['lm']) else 'N/A'
         
         if system_type == 'Open':
             type_style = 'background: #d4edda; color: #155724; padding: 2px 6px; border-radius: 12px; font-size: 0.75rem; font-weight: 600;'
@@ -536,17 +578,23 @@ def create_html_leaderboard(data, metric_columns):
             system_type_display = 'Unknown'
 
         lm_style = 'background: #f0f0ff; color: #764ba2; padding: 2px 6px; border-radius: 12px; font-size: 0.75rem; font-weight: 600;'
+        interval = interval_rows.get((str(row['System Name']), '' if _is_missing(row['lm']) else str(row['lm'])))
+        rank_interval = ''
+        if interval:
+            low, high = interval['rank_interval']
+            rank_interval = f'\n                            <span style="color: #666; font-size: 0.75rem;" title="{intervals["confidence"]:.0%} bootstrap rank interval">rank {low}–{high}</span>'
 
         html_content += f"""
-                    <tr>
+                    <tr data-row="{position}">
                         <td class="system-name">{row['System Name']}<br/>
                             <span style="{type_style}">{system_type_display}</span>
-                            <span style="{lm_style}">{lm}</span>
+                            <span style="{lm_style}">{lm}</span>{rank_interval}
+                            <span class="profile-rank" style="display: none; color: #1e3c72; font-size: 0.75rem; font-weight: 600;"></span>
                         </td>
 """
         
         # Add metric scores with color coding
-        for metric in metric_columns:
+        for metric_position, metric in enumerate(metric_columns):
             score = row[metric]
             score_class = ""
             if score >= 0.7:
@@ -559,15 +607,52 @@ def create_html_leaderboard(data, metric_columns):
                 score_class = "score-fair"
                 score_style = "color: #e74c3c; font-weight: 600;"
             
-            html_content += f'<td class="metric-score" style="background: white;"><span style="{score_style}">{score:.3f}</span></td>\n'
+            error_bar = ''
+            if interval and metric in interval['metrics']:
+                low, high = interval['metrics'][metric]['lower'], interval['metrics'][metric]['upper']
+                error_bar = (f'<div class="ci-bar" title="{intervals["confidence"]:.0%} CI {low:.3f}–{high:.3f}">'
+                             f'<span style="left: {low * 100:.1f}%; width: {max(high - low, 0.005) * 100:.1f}%;"></span></div>')
+            
+            metric_rank = rankings['metric_rank'][position, metric_position]
+            metric_percentile = rankings['metric_percentile'][position, metric_position]
+            rank_title = f"rank {metric_rank} · {metric_percentile:.0f}th percentile"
+            html_content += f'<td class="metric-score" style="background: white;" title="{rank_title}"><span style="{score_style}">{score:.3f}</span>{error_bar}</td>\n'
         
+        layer = int(layers[position])
+        layer_title = 'Pareto frontier' if layer == 1 else f'Pareto layer {layer}'
+        if counts is not None:
+            layer_title += f': dominates {counts[0][position]}, dominated by {counts[1][position]}'
+        layer_style = "color: #1e3c72; font-weight: 700;" if layer == 1 else "color: #666;"
+        html_content += f'<td class="pareto-layer" style="background: white; text-align: center;" title="{layer_title}"><span style="{layer_style}">{layer}</span></td>\n'
         html_content += "                    </tr>\n"
     
     html_content += """
                 </tbody>
             </table>
         </div>
+"""
+    
+    if changes:
+        from leaderboard_diff import render_changes_panel
+        
+        html_content += render_changes_panel(changes)
+    
+    from head_to_head import HEAD_TO_HEAD_LIMIT, metric_wins, render_head_to_head_panel
+    
+    if len(records) <= HEAD_TO_HEAD_LIMIT:
+        html_content += render_head_to_head_panel([str(row['System Name']) for row in records], metric_wins(scores),
+                                                  len(metric_columns), win_rates)
+    
+    from correlation import render_correlation_panel
+    
+    html_content += render_correlation_panel(scores, metric_columns)
+    
+    if significance:
+        from significance import render_significance_panel
         
+        html_content += render_significance_panel(significance)
+    
+    html_content += """        
         <!-- Interactive Radar Charts Section -->
         <div class="radar-charts-section" style="margin: 40px 30px; padding: 20px; background: #f8f9ff; border-radius: 12px; border-left: 5px solid #667eea;">
             <h3 style="color: #1e3c72; margin-bottom: 15px;">📊 Interactive Radar Charts</h3>
@@ -593,33 +678,26 @@ def create_html_leaderboard(data, metric_columns):
             
         </div>
 
-        <!-- Evaluation Metrics Section -->
+"""
+
+    # Evaluation metric descriptions, grouped by category
+    html_content += """        <!-- Evaluation Metrics Section -->
         <div class="metric-info" style="margin: 40px 30px; padding: 20px; background: #f8f9ff; border-radius: 12px; border-left: 5px solid #667eea;">
             <h3 style="color: #1e3c72; margin-bottom: 15px;">📊 Evaluation Metrics</h3>
             <div style="display: grid; grid-template-columns: repeat(auto-fit, minmax(300px, 1fr)); gap: 20px; margin-top: 15px;">
-                <div>
-                    <h4 style="color: #1e3c72; margin-bottom: 10px;">🧠 Knowledge Synthesis</h4>
-                    <ul style="margin: 0; padding-left: 20px; line-height: 1.6;">
-                        <li><strong>Organization</strong> - Measures how well the system organizes and structures the related work section</li>
-                        <li><strong>Nugget Coverage</strong> - Evaluates the comprehensiveness of key insights and findings covered</li>
-                    </ul>
-                </div>
-                <div>
-                    <h4 style="color: #1e3c72; margin-bottom: 10px;">🔍 Retrieval Quality</h4>
-                    <ul style="margin: 0; padding-left: 20px; line-height: 1.6;">
-                        <li><strong>Relevance Rate</strong> - Assesses how relevant the retrieved references are to the query</li>
-                        <li><strong>Document Importance</strong> - Measures the significance and impact of cited documents</li>
-                        <li><strong>Reference Coverage</strong> - Evaluates the breadth of reference sources included</li>
-                    </ul>
-                </div>
-                <div>
-                    <h4 style="color: #1e3c72; margin-bottom: 10px;">✅ Verifiability</h4>
+"""
+    for name, icon, _ in category_spans():
+        items = ''.join(
+            f"                        <li><strong>{spec['header'].replace('<br>', ' ')}</strong> - {spec['description']}</li>\n"
+            for spec in METRIC_SPECS if spec['category'] == name
+        )
+        html_content += f"""                <div>
+                    <h4 style="color: #1e3c72; margin-bottom: 10px;">{icon} {name}</h4>
                     <ul style="margin: 0; padding-left: 20px; line-height: 1.6;">
-                        <li><strong>Citation Precision</strong> - Measures the accuracy and correctness of citations</li>
-                        <li><strong>Claim Coverage</strong> - Evaluates how well claims are supported by evidence</li>
-                    </ul>
+{items}                    </ul>
                 </div>
-            </div>
+"""
+    html_content += """            </div>
         </div>
 
         <!-- Contact Form Section -->
@@ -646,7 +724,19 @@ def create_html_leaderboard(data, metric_columns):
     
     <!-- Chart.js Library -->
     <script src="https://cdn.jsdelivr.net/npm/chart.js"></script>
-    
+"""
+
+    # Metric labels and table column indices for the page scripts
+    metric_labels = ', '.join("'" + spec['header'].replace('<br>', '\\n') + "'" for spec in METRIC_SPECS)
+    metric_indices = ', '.join(str(i) for i in range(1, len(METRIC_SPECS) + 1))
+    html_content += f"""    
+    <script>
+        const METRIC_LABELS = [{metric_labels}];
+        const METRIC_COLUMN_INDICES = [{metric_indices}];
+    </script>
+"""
+
+    html_content += """    
     <script>
         let sortDirection = {};
         let allRows = []; // Store all original rows for filtering
@@ -676,7 +766,7 @@ def create_html_leaderboard(data, metric_columns):
         function applyMetricColorCoding() {
             // Metric columns: 1=Organization, 2=Nugget Coverage, 3=Relevance Rate, 
             // 4=Document Importance, 5=Reference Coverage, 6=Citation Precision, 7=Claim Coverage
-            const metricColumns = [1, 2, 3, 4, 5, 6, 7];
+            const metricColumns = METRIC_COLUMN_INDICES;
             
             metricColumns.forEach(columnIndex => {
                 // Get all values for this column
@@ -820,7 +910,7 @@ def create_html_leaderboard(data, metric_columns):
             
             // Metric columns: 1=Organization, 2=Nugget Coverage, 3=Relevance Rate, 
             // 4=Document Importance, 5=Reference Coverage, 6=Citation Precision, 7=Claim Coverage
-            const metricColumns = [1, 2, 3, 4, 5, 6, 7];
+            const metricColumns = METRIC_COLUMN_INDICES;
             
             metricColumns.forEach(columnIndex => {
                 // Get all values for this column from visible rows
@@ -869,8 +959,8 @@ def create_html_leaderboard(data, metric_columns):
         function updateSortIndicators(activeColumnIndex, ascending) {
             // Reset all sort indicators
             const headers = document.querySelectorAll('th .sort-btn');
-            headers.forEach((btn, index) => {
-                if (index === activeColumnIndex) {
+            headers.forEach((btn) => {
+                if (Number(btn.dataset.column) === activeColumnIndex) {
                     // Show active sort direction
                     btn.textContent = ascending ? '↑' : '↓';
                     btn.style.color = '#fff';
@@ -926,7 +1016,7 @@ def create_html_leaderboard(data, metric_columns):
         // Radar Chart Functions
         function initializeRadarChart() {
             const ctx = document.getElementById('radarChart').getContext('2d');
-            const labels = ['Organization', 'Nugget\\nCoverage', 'Relevance\\nRate', 'Document\\nImportance', 'Reference\\nCoverage', 'Citation\\nPrecision', 'Claim\\nCoverage'];
+            const labels = METRIC_LABELS;
             radarChart = new Chart(ctx, {
                 type: 'radar',
                 data: { labels: labels, datasets: [] },
@@ -1003,7 +1093,7 @@ def create_html_leaderboard(data, metric_columns):
                 const systemNameCell = row.cells[0];
                 const systemName = systemNameCell.textContent.split('\\n')[0].trim();
                 const metrics = [];
-                for (let i = 1; i <= 7; i++) {
+                for (let i = 1; i <= METRIC_LABELS.length; i++) {
                     const cell = row.cells[i];
                     if (cell) {
                         const value = parseFloat(cell.textContent.trim());
@@ -1077,44 +1167,585 @@ def create_html_leaderboard(data, metric_columns):
     
     return html_content
 
-def main():
-    """Main function to generate the leaderboard"""
-    print("🚀 Creating DeepScholar-Bench Leaderboard...")
-    
-    # Load and process data
-    df = load_data()
-    leaderboard_data, metric_columns = process_data(df)
-    
-    print(f"✅ Processed {len(leaderboard_data)} systems")
-    print(f"📊 Included metrics: {', '.join(metric_columns)}")
-    
-    # Create HTML leaderboard
-    html_content = create_html_leaderboard(leaderboard_data, metric_columns)
+def write_html(data, metric_columns, output_dir='leaderboard', report=None, changes=None, intervals=None,
+               significance=None, win_rates=None):
+    """Render the HTML leaderboard and save it"""
+    report = report or RunReport('html')
+    with report.stage('html_render', rows=len(data)):
+        html_content = create_html_leaderboard(data, metric_columns, changes, intervals, significance, win_rates)
+        html_bytes = html_content.encode('utf-8')
     
     # Create output directory
-    output_dir = 'leaderboard'
     os.makedirs(output_dir, exist_ok=True)
     
     # Save HTML file
     html_file = os.path.join(output_dir, 'deepscholar_bench_leaderboard.html')
-    with open(html_file, 'w', encoding='utf-8') as f:
-        f.write(html_content)
+    with report.stage('html_write', bytes_out=len(html_bytes)):
+        with atomic_open(html_file) as f:
+            f.write(html_bytes)
     
     print(f"🎉 Leaderboard saved to: {html_file}")
+    return html_file
+
+def print_top_systems(top_rows, metric_columns):
+    """Print the top 5 systems given (original row index, row) pairs"""
+    print("\n🏆 Top 5 Systems:")
+    print("=" * 80)
+    for idx, row in top_rows[:5]:
+        print(f"{idx+1:2d}. {row['System Name']:<30} ({row['lm']}) - Org: {row[metric_columns[0]]:.3f}")
+
+def run_fetch(args, report):
+    """Stage: download the sheet export to the local cache"""
+    url = args.source or sheet_url()
+    print(f"⬇️  Fetching {url}")
+    with report.stage('fetch') as stats:
+        result = fetch_sheet(url, args.sheet_cache)
+        stats['bytes_in'] = 0 if result['cached'] else result['bytes']
+        stats['cache'] = 'hit' if result['cached'] else 'miss'
+    if result['cached']:
+        print(f"✅ Sheet unchanged, using cached copy: {args.sheet_cache}")
+    else:
+        print(f"✅ Saved {result['bytes']} bytes to: {args.sheet_cache}")
+
+def ingest_results(args, report):
+    """Aggregate the per-query result files in args.results into sheet-layout rows"""
+    from results_ingest import aggregate_results_dir
+    
+    with report.stage('ingest') as stats:
+        rows = aggregate_results_dir(args.results, args.results_chunk_size)
+        stats['rows'] = sum(row['queries'] for row in rows)
+    print(f"🧮 Aggregated {sum(row['queries'] for row in rows)} query results for {len(rows)} systems from: {args.results}")
+    return rows
+
+def merge_ingested_results(df, args, report):
+    """Sheet DataFrame with the aggregated per-query results merged in (unchanged without --results)"""
+    if not args.results:
+        return df
+    from results_ingest import merge_results
     
-    # Also save CSV for reference
+    return merge_results(df, ingest_results(args, report))
+
+def ingest_submissions(args, report):
+    """Validated, deduplicated rows of the submission files in args.submissions, and the ingestion report"""
+    from submissions import ingest_submissions as ingest
+    
+    with report.stage('submissions') as stats:
+        rows, result = ingest(args.submissions)
+        stats['rows'] = result['submissions']
+    return rows, result
+
+def report_submissions(args, result):
+    """Save and print the outcome of merging the submission files"""
+    from submissions import SUBMISSIONS_FILE, write_submissions_report
+    
+    path = write_submissions_report(result, os.path.join(args.output_dir, SUBMISSIONS_FILE))
+    print(f"📬 Merged {result['accepted']} of {result['submissions']} submissions from {args.submissions}: "
+          f"{len(result['inserted'])} new, {len(result['updated'])} updated, {len(result['unchanged'])} unchanged, "
+          f"{len(result['duplicates'])} duplicates -> {path}")
+    for update in result['updated']:
+        cells = ', '.join(f"{cell['metric'].replace('<br>', ' ')} {cell['previous']} -> {cell['value']}"
+                          for cell in update['overwritten'])
+        print(f"✏️ Updated {update['system']} ({update['lm']}): {cells or 'system type'}")
+    for conflict in result['conflicts']:
+        print(f"⚠️ Conflicting submissions for {conflict['system']} ({conflict['lm']}): "
+              f"{', '.join(conflict['files'])}; kept {conflict['kept']}")
+    for rejection in result['rejected']:
+        system = f" ({rejection['system']})" if rejection['system'] else ''
+        print(f"❌ Rejected {rejection['file']}{system}: {'; '.join(rejection['errors'])}")
+
+def merge_submissions(df, args, report):
+    """Sheet DataFrame with the submission files upserted (unchanged without --submissions)"""
+    if not args.submissions:
+        return df
+    from submissions import upsert_submissions
+    
+    rows, result = ingest_submissions(args, report)
+    with report.stage('upsert', rows=len(rows)):
+        df, result = upsert_submissions(df, rows, result)
+    report_submissions(args, result)
+    return df
+
+def run_process(args, report):
+    """Stage: load and process the sheet, save the leaderboard CSV"""
+    source = resolve_source(args.source, args.sheet_cache)
+    print(f"📥 Loading data from: {source}")
+    os.makedirs(args.output_dir, exist_ok=True)
+    csv_file = os.path.join(args.output_dir, 'leaderboard_data.csv')
+    previous_content = read_bytes(csv_file)
+    
+    if args.engine == 'fast':
+        import fast_engine
+        
+        with report.stage('parse', bytes_in=file_size(source)) as stats:
+            columns, rows = fast_engine.load_rows(source)
+            stats['rows'] = len(rows)
+        if args.results:
+            from results_ingest import merge_result_rows
+            
+            rows = merge_result_rows(columns, rows, ingest_results(args, report))
+        if args.submissions:
+            from submissions import upsert_submission_rows
+            
+            submitted, result = ingest_submissions(args, report)
+            with report.stage('upsert', rows=len(submitted)):
+                rows, result = upsert_submission_rows(columns, rows, submitted, result)
+            report_submissions(args, result)
+        with report.stage('normalise', rows=len(rows)):
+            kept, raw = fast_engine.raw_metric_values(columns, rows)
+            records, metric_columns, positions = fast_engine.process_rows(columns, rows, raw)
+        lm = columns.index('lm')
+        validate_build(args, [rows[i][0] for i in kept],
+                       ['' if rows[i][lm] in fast_engine.NA_VALUES else rows[i][lm] for i in kept], raw,
+                       previous_content, report)
+        with report.stage('csv_write', rows=len(records)) as stats:
+            fast_engine.write_csv(records, metric_columns, csv_file)
+            stats['bytes_out'] = file_size(csv_file)
+        n_systems = len(records)
+        top_rows = list(zip(positions, records))
+    else:
+        # Load and process data
+        with report.stage('parse', bytes_in=file_size(source)) as stats:
+            df = load_data(source)
+            stats['rows'] = len(df)
+        df = merge_ingested_results(df, args, report)
+        df = merge_submissions(df, args, report)
+        with report.stage('normalise', rows=len(df)):
+            raw = raw_metric_values(df)
+            leaderboard_data, metric_columns = process_data(df, raw)
+        kept = df[df['System Name'] != 'nan']
+        validate_build(args, kept['System Name'].tolist(), ['' if _is_missing(lm) else lm for lm in kept['lm']], raw,
+                       previous_content, report)
+        
+        # Save CSV for reference (and as input to the html stage)
+        with report.stage('csv_write', rows=len(leaderboard_data)) as stats:
+            with atomic_open(csv_file, 'w', newline='', encoding='utf-8') as f:
+                leaderboard_data.to_csv(f, index=False)
+            stats['bytes_out'] = file_size(csv_file)
+        n_systems = len(leaderboard_data)
+        top_rows = list(leaderboard_data.head().iterrows())
+    
+    print(f"✅ Processed {n_systems} systems")
+    print(f"📊 Included metrics: {', '.join(metric_columns)}")
+    print(f"📋 CSV data saved to: {csv_file}")
+    update_changes(args, previous_content, read_bytes(csv_file), report)
+    record_snapshot(args, csv_file, report)
+    update_correlation(args, csv_file, report)
+    
+    print_top_systems(top_rows, metric_columns)
+
+def read_bytes(path):
+    """Contents of a file, or None if it doesn't exist"""
+    try:
+        with open(path, 'rb') as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+def update_changes(args, previous_content, content, report):
+    """Diff the new leaderboard CSV against the previous one and save the changes JSON if anything moved"""
+    if previous_content is None or previous_content == content:
+        return None
+    from leaderboard_diff import CHANGES_FILE, diff_csv, has_changes, write_changes
+    
+    with report.stage('diff') as stats:
+        changes = diff_csv(previous_content, content)
+        stats['rows'] = changes['summary']['systems']
+        if not has_changes(changes):
+            return None
+        changes_file = write_changes(changes, os.path.join(args.output_dir, CHANGES_FILE))
+    summary = changes['summary']
+    print(f"🔄 Changes: {summary['added']} new, {summary['removed']} removed, {summary['moved']} moved, "
+          f"{summary['changed']} updated -> {changes_file}")
+    return changes
+
+def validate_build(args, names, lms, raw, previous_content, report):
+    """Check the raw metric values for anomalies and save the report; raises ValidationError past a --max-anomalies limit"""
+    from validation import (VALIDATION_FILE, ValidationError, parse_limits, previous_scores, validation_report,
+                            write_validation)
+    
+    path = os.path.join(args.output_dir, VALIDATION_FILE)
+    with report.stage('validate', rows=len(raw)) as stats:
+        previous, present = previous_scores(previous_content, list(zip(names, lms)))
+        result = validation_report(raw, names, lms, previous if present.any() else None,
+                                   parse_limits(args.max_anomalies), args.jump_z)
+        write_validation(result, path)
+        stats['anomalies'] = sum(counts['total'] for counts in result['counts'].values())
+    found = ', '.join(f"{counts['total']} {check}" for check, counts in result['counts'].items() if counts['total'])
+    if found:
+        print(f"🔎 Validation: {found} -> {path}")
+    if result['failed']:
+        details = ', '.join(f"{check} {result['counts'][check]['total']} > {result['limits'][check]}"
+                            for check in result['failed'])
+        raise ValidationError(f"❌ Validation failed ({details}), see {path}", result)
+    return result
+
+def update_correlation(args, csv_file, report):
+    """Save the metric correlations of the leaderboard CSV and warn about metric pairs that became redundant"""
+    import numpy as np
+    from correlation import CORRELATION_FILE, correlation_report, pearson, read_correlation, spearman, write_correlation
+    
+    path = os.path.join(args.output_dir, CORRELATION_FILE)
+    with report.stage('correlation') as stats:
+        data, metric_columns = read_leaderboard_csv(csv_file)
+        scores = np.array([[row[metric] for metric in metric_columns] for row in data], dtype=float)
+        scores = scores.reshape(len(data), len(metric_columns))
+        correlations = correlation_report({'pearson': pearson(scores), 'spearman': spearman(scores)}, metric_columns,
+                                          len(data), previous=read_correlation(path))
+        write_correlation(correlations, path)
+        stats['rows'] = len(data)
+    for first, second in correlations['newly_redundant']:
+        print(f"⚠️ Metrics {first.replace('<br>', ' ')} and {second.replace('<br>', ' ')} are now correlated "
+              f"at |r| >= {correlations['threshold']} across {len(data)} systems (possibly redundant)")
+    return correlations
+
+def history_path(args):
+    """Snapshot log of this build (default: history.jsonl next to the leaderboard), or None if disabled"""
+    if args.no_history:
+        return None
+    return args.history or os.path.join(args.output_dir, 'history.jsonl')
+
+def record_snapshot(args, csv_file, report):
+    """Append the processed leaderboard to the snapshot history"""
+    path = history_path(args)
+    if path is None:
+        return None
+    from snapshot_store import SnapshotStore
+    
+    with report.stage('history_append') as stats:
+        entry = SnapshotStore(path).append_file(csv_file)
+        stats['bytes_out'] = file_size(path)
+    if entry is None:
+        print(f"🗂️  Leaderboard unchanged since the last snapshot in {path}")
+    else:
+        kind = 'keyframe' if entry.get('keyframe') else 'delta'
+        print(f"🗂️  Snapshot #{entry['id']} ({kind}) appended to: {path}")
+    return entry
+
+def run_history(args, report):
+    """Stage: query the snapshot history"""
+    from snapshot_store import KEY_COLUMNS, SnapshotStore
+    
+    path = history_path(args) or os.path.join(args.output_dir, 'history.jsonl')
+    store = SnapshotStore(path)
+    with report.stage('history_query') as stats:
+        stats['bytes_in'] = file_size(path)
+        if args.system:
+            points = store.system_history(args.system, args.lm)
+            print(f"📈 {args.system} over {len(points)} snapshots")
+            for point in points:
+                metrics = '  '.join(f"{value:.3f}" for name, value in point.items()
+                                    if name not in KEY_COLUMNS + ('timestamp', 'rank'))
+                print(f"  {point['timestamp']}  #{point['rank']:<3} {metrics}")
+        elif args.as_of:
+            content = store.as_of_csv(args.as_of)
+            if content is None:
+                print(f"❌ No snapshot at or before {args.as_of}")
+                return
+            csv_file = args.output or os.path.join(args.output_dir, f"leaderboard_data_{args.as_of}.csv")
+            with atomic_open(csv_file) as f:
+                f.write(content)
+            print(f"📋 Leaderboard as of {args.as_of} saved to: {csv_file}")
+        else:
+            for snapshot in store.snapshots():
+                print(f"  #{snapshot['id']:<4} {snapshot['timestamp']}  {snapshot['hash'][:10]}  "
+                      f"{snapshot['rows_total']} systems")
+
+def run_sensitivity(args, report):
+    """Stage: sensitivity of the processed leaderboard's ranking to the metric weights"""
+    import numpy as np
+    from sensitivity import analyse, sensitivity_json, write_sensitivity
+    
+    csv_file = os.path.join(args.output_dir, 'leaderboard_data.csv')
+    with report.stage('csv_read', bytes_in=file_size(csv_file)) as stats:
+        data, metric_columns = read_leaderboard_csv(csv_file)
+        stats['rows'] = len(data)
+    scores = np.array([[row[metric] for metric in metric_columns] for row in data], dtype=float)
+    with report.stage('sensitivity', rows=len(data)) as stats:
+        result = analyse(scores.reshape(len(data), len(metric_columns)), args.samples, args.seed, args.tau_top)
+        summary = sensitivity_json(result, data, metric_columns)
+        stats['variants'] = result['variants']
+        stats['bytes_out'] = file_size(write_sensitivity(summary, args.output_dir))
+    
+    print(f"🎲 Ranking under {result['variants']} metric weightings (Kendall tau over the top {result['tau_systems']} systems)")
+    for entry in summary['leave_one_out']:
+        print(f"  without {entry['metric'].replace('<br>', ' '):<16} tau {entry['kendall_tau']:.3f}  top: {entry['top_system']}")
+    if summary['random_weights']['samples']:
+        random_weights = summary['random_weights']
+        print(f"  random weights        tau mean {random_weights['mean']:.3f}, p5 {random_weights['p5']:.3f}, "
+              f"min {random_weights['min']:.3f}")
+    for entry in sorted(summary['systems'], key=lambda entry: entry['reference_rank'])[:5]:
+        print(f"  #{entry['reference_rank']:<3} {entry['system']:<40} ranks {entry['rank_p5']}–{entry['rank_p95']} "
+              f"(best {entry['rank_min']}, worst {entry['rank_max']}), first in {entry['top1_share']:.0%}")
+    print(f"📋 Sensitivity report saved to: {os.path.join(args.output_dir, 'leaderboard_sensitivity.json')}")
+
+def run_cube(args, report):
+    """Stage: build the memory-mapped score cube from the per-query result files"""
+    import glob
+    from score_cube import build_cube
+    
+    if not args.results:
+        raise SystemExit("❌ cube needs --results DIR (per-query result files)")
+    result_files = sorted(glob.glob(os.path.join(args.results, '*.jsonl')))
+    with report.stage('cube_build', rows=len(result_files)) as stats:
+        build_cube(result_files, args.cube, args.results_chunk_size)
+        stats['bytes_out'] = file_size(os.path.join(args.cube, 'scores.npy'))
+    print(f"🧊 Score cube of {len(result_files)} systems saved to: {args.cube}")
+
+def slice_name(args):
+    """Directory name of a slice: --name, else derived from its filters"""
+    if args.name:
+        return args.name
+    parts = [category.replace('*', 'all') for category in args.category or []]
+    if args.last_days:
+        parts.append(f"last{args.last_days}d")
+    if args.since:
+        parts.append(f"since{args.since}")
+    if args.until:
+        parts.append(f"until{args.until}")
+    return '_'.join(parts) or 'all'
+
+def run_slice(args, report):
+    """Stage: leaderboard of a slice of the queries (category, date range), computed from the score cube"""
+    from score_cube import ScoreCube
+    
+    cube = ScoreCube(args.cube)
+    with report.stage('slice', rows=len(cube.queries)) as stats:
+        try:
+            mask = cube.query_mask(args.category, args.since, args.until, args.last_days)
+        except ValueError as e:
+            raise SystemExit(f"❌ slice: {e}")
+        df = cube.slice_frame(mask)
+        stats['rows'] = int(mask.sum())
+    print(f"🔪 Slice covers {int(mask.sum())} of {len(cube.queries)} queries, {len(df)} systems")
+    with report.stage('normalise', rows=len(df)):
+        leaderboard_data, metric_columns = process_data(df)
+    
+    output_dir = os.path.join(args.output_dir, 'slices', slice_name(args))
     csv_file = os.path.join(output_dir, 'leaderboard_data.csv')
-    leaderboard_data.to_csv(csv_file, index=False)
+    with report.stage('csv_write', rows=len(leaderboard_data)) as stats:
+        with atomic_open(csv_file, 'w', newline='', encoding='utf-8') as f:
+            leaderboard_data.to_csv(f, index=False)
+        stats['bytes_out'] = file_size(csv_file)
     print(f"📋 CSV data saved to: {csv_file}")
     
-    # Print top 5 systems
-    print("\n🏆 Top 5 Systems:")
-    print("=" * 80)
-    top_5 = leaderboard_data.head()
-    for idx, row in top_5.iterrows():
-        print(f"{idx+1:2d}. {row['System Name']:<30} ({row['lm']}) - Org: {row[metric_columns[0]]:.3f}")
+    intervals = None
+    if args.bootstrap:
+        from bootstrap_ci import bootstrap, write_intervals
+        
+        with report.stage('bootstrap', rows=args.bootstrap) as stats:
+            result = bootstrap(cube, mask, args.bootstrap, args.confidence, args.seed, args.jobs)
+            intervals = write_intervals(result, output_dir)
+            stats['systems'] = len(result['systems'])
+        print(f"🎯 {args.confidence:.0%} bootstrap intervals ({args.bootstrap} resamples) saved to: {output_dir}")
+    
+    significance = None
+    if args.significance:
+        from significance import pairwise_pvalues, significance_json, write_significance
+        
+        with report.stage('significance') as stats:
+            systems, pvalues = pairwise_pvalues(cube, mask, args.significance, args.permutations, args.seed, args.jobs)
+            point = leaderboard_data[metric_columns].to_numpy(dtype=float)
+            significance = significance_json(cube, systems, point, pvalues, args.significance, args.alpha)
+            stats['rows'] = len(systems)
+            stats['bytes_out'] = file_size(write_significance(significance, output_dir))
+        print(f"🧪 Pairwise {args.significance} tests of {len(systems)} systems saved to: {output_dir}")
+    
+    if args.correlation:
+        from correlation import CORRELATION_FILE, correlation_report, cube_pearson, pearson, spearman, write_correlation
+        
+        with report.stage('correlation', rows=int(mask.sum())):
+            point = leaderboard_data[metric_columns].to_numpy(dtype=float)
+            matrices = {'pearson': pearson(point), 'spearman': spearman(point), 'per_query_pearson': cube_pearson(cube, mask)}
+            correlation_file = write_correlation(correlation_report(matrices, metric_columns, len(leaderboard_data)),
+                                                 os.path.join(output_dir, CORRELATION_FILE))
+        print(f"🔗 Metric correlations saved to: {correlation_file}")
+    
+    win_rates = None
+    if args.head_to_head:
+        from head_to_head import cube_win_rates
+        
+        with report.stage('head_to_head', rows=len(leaderboard_data)):
+            win_rates = cube_win_rates(cube, mask)
+    write_html(leaderboard_data, metric_columns, output_dir, report, intervals=intervals, significance=significance,
+               win_rates=win_rates)
+
+def run_rolling(args, report):
+    """Stage: live rolling-window leaderboard of the per-query results in --results"""
+    import rolling_leaderboard
+    
+    if not args.results:
+        raise SystemExit("❌ rolling needs --results DIR (per-query result files)")
+    with report.stage('rolling') as stats:
+        stats['polls'] = rolling_leaderboard.follow(args)
+
+def run_html(args, report):
+    """Stage: render the HTML leaderboard from the processed CSV"""
+    csv_file = os.path.join(args.output_dir, 'leaderboard_data.csv')
+    with report.stage('csv_read', bytes_in=file_size(csv_file)) as stats:
+        data, metric_columns = read_leaderboard_csv(csv_file)
+        stats['rows'] = len(data)
+    from leaderboard_diff import CHANGES_FILE, read_changes
+    
+    changes = read_changes(os.path.join(args.output_dir, CHANGES_FILE))
+    write_html(data, metric_columns, args.output_dir, report, changes)
+
+def run_plots(args, report):
+    """Stage: generate the spider plots"""
+    import spiderplot_unified
+    
+    spiderplot_unified.main(verbose=args.verbose, source=resolve_source(args.source, args.sheet_cache),
+                            output_dir=args.plots_dir, report=report)
+
+def run_watch(args, report):
+    """Stage: poll the sheet and regenerate changed artifacts until interrupted"""
+    import watch
+    
+    with report.stage('watch') as stats:
+        stats['polls'] = watch.watch(args)
+
+# Stages run by each subcommand, in order ('build' is the default without a subcommand)
+STAGES = {
+    'fetch': [run_fetch],
+    'process': [run_process],
+    'html': [run_html],
+    'plots': [run_plots],
+    'build': [run_fetch, run_process, run_html],
+    'all': [run_fetch, run_process, run_html, run_plots],
+    'watch': [run_watch],
+    'history': [run_history],
+    'sensitivity': [run_sensitivity],
+    'cube': [run_cube],
+    'slice': [run_slice],
+    'rolling': [run_rolling],
+}
+
+def build_parser():
+    """Command line interface of the leaderboard build"""
+    parser = argparse.ArgumentParser(
+        description="Build the DeepScholar-Bench leaderboard. Without a subcommand, runs fetch, process and html.")
+    parser.add_argument('-v', '--verbose', action='store_true', help="print debug output")
+    parser.add_argument('--source', default=None,
+                        help="sheet export URL or local CSV (default: the fetched copy, else $DEEPSCHOLAR_SHEET_URL or the live sheet)")
+    parser.add_argument('--sheet-cache', default=DEFAULT_SHEET_CACHE, help="where fetch stores the sheet export")
+    parser.add_argument('--output-dir', default='leaderboard', help="directory for the HTML and CSV leaderboard")
+    parser.add_argument('--engine', choices=['pandas', 'fast'], default='pandas',
+                        help="process with pandas or with the pandas-free csv/NumPy engine (same output)")
+    parser.add_argument('--plots-dir', default='eval/plots/spiderplot_final', help="directory for the spider plots")
+    parser.add_argument('--report', default=None, help="write a JSON report of per-stage time and memory to this path")
+    parser.add_argument('--trace-memory', action='store_true', help="also record tracemalloc peaks in the report")
+    parser.add_argument('--profile-dir', default=None, help="dump a cProfile file per stage into this directory")
+    parser.add_argument('--connect-timeout', type=float, default=10.0, help="seconds to wait for the sheet server to accept")
+    parser.add_argument('--timeout', type=float, default=60.0, help="seconds to wait for data from the sheet server")
+    parser.add_argument('--retries', type=int, default=3, help="retries of failed sheet requests (with jittered backoff)")
+    parser.add_argument('--tracks', default=None,
+                        help="JSON file of sheet tabs to build side by side into <output-dir>/<track>/ (see tracks.py)")
+    parser.add_argument('--jobs', type=int, default=None,
+                        help="worker processes for --tracks and the statistics of slice (default: one per CPU)")
+    parser.add_argument('--results', default=None,
+                        help="directory of per-query result files (<system>.jsonl) to aggregate into the leaderboard")
+    parser.add_argument('--results-chunk-size', type=int, default=10000,
+                        help="records aggregated per chunk when streaming --results")
+    parser.add_argument('--submissions', default=None,
+                        help="directory of submission files (one system per .json/.csv) to validate and upsert into the leaderboard")
+    parser.add_argument('--cube', default=os.path.join('.cache', 'score_cube'), help="directory of the systems x queries x metrics score cube")
+    parser.add_argument('--history', default=None,
+                        help="snapshot log every processed leaderboard is appended to (default: <output-dir>/history.jsonl)")
+    parser.add_argument('--no-history', action='store_true', help="don't record leaderboard snapshots")
+    parser.add_argument('--max-anomalies', action='append', default=[], metavar='CHECK=COUNT',
+                        help="fail the build when a validation check (out_of_range, clipped, filled, scale_mixup, jump) "
+                             "finds more than COUNT cells (repeatable; default: report only)")
+    parser.add_argument('--jump-z', type=float, default=2.0,
+                        help="flag scores that moved by this many standard deviations since the previous build")
+    
+    subparsers = parser.add_subparsers(dest='stage', metavar='{fetch,process,html,plots,all,watch,history,sensitivity,cube,slice,rolling}')
+    subparsers.add_parser('fetch', help="download the sheet export to the local cache")
+    subparsers.add_parser('process', help="process the sheet into leaderboard_data.csv")
+    subparsers.add_parser('html', help="render the HTML leaderboard from leaderboard_data.csv")
+    subparsers.add_parser('plots', help="generate the spider plots")
+    subparsers.add_parser('all', help="run every stage")
+    watch_parser = subparsers.add_parser('watch', help="poll the sheet and regenerate the leaderboard when it changes")
+    watch_parser.add_argument('--interval', type=float, default=60.0, help="seconds between polls")
+    watch_parser.add_argument('--debounce', type=float, default=5.0,
+                              help="after a change, wait until the sheet is unchanged for this many seconds")
+    watch_parser.add_argument('--with-plots', action='store_true', help="also regenerate the spider plots")
+    watch_parser.add_argument('--max-polls', type=int, default=None, help="stop after this many polls")
+    history_parser = subparsers.add_parser('history', help="list snapshots or query the leaderboard history")
+    history_parser.add_argument('--system', default=None, help="print this system's scores and rank over time")
+    history_parser.add_argument('--lm', default=None, help="LM of --system (default: its first entry)")
+    history_parser.add_argument('--as-of', default=None, help="save the leaderboard as of this ISO date/time")
+    history_parser.add_argument('--output', default=None, help="CSV file for --as-of")
+    sensitivity_parser = subparsers.add_parser('sensitivity',
+                                               help="how the ranking of leaderboard_data.csv changes with the metric weights")
+    sensitivity_parser.add_argument('--samples', type=int, default=2000, help="random weight vectors on the simplex")
+    sensitivity_parser.add_argument('--seed', type=int, default=0, help="random seed of the weight vectors")
+    sensitivity_parser.add_argument('--tau-top', type=int, default=250,
+                                    help="Kendall tau over this many of the best systems of the reference ranking")
+    subparsers.add_parser('cube', help="build the score cube from the per-query result files in --results")
+    slice_parser = subparsers.add_parser('slice', help="leaderboard of a slice of the queries, from the score cube")
+    slice_parser.add_argument('--category', action='append', help="arXiv category to keep (repeatable; 'cs.*' for a prefix)")
+    slice_parser.add_argument('--since', default=None, help="first query publication date (ISO)")
+    slice_parser.add_argument('--until', default=None, help="last query publication date (ISO)")
+    slice_parser.add_argument('--last-days', type=int, default=None, help="queries published in the last N days")
+    slice_parser.add_argument('--name', default=None, help="slice name (default: derived from the filters)")
+    slice_parser.add_argument('--bootstrap', type=int, default=None, metavar='N',
+                              help="add bootstrap confidence intervals of the scores and ranks from N query resamples")
+    slice_parser.add_argument('--confidence', type=float, default=0.95, help="confidence level of the bootstrap intervals")
+    slice_parser.add_argument('--seed', type=int, default=0, help="random seed of the bootstrap resamples and permutations")
+    slice_parser.add_argument('--significance', choices=['sign', 'permutation'], default=None,
+                              help="add pairwise paired significance tests between all systems on every metric")
+    slice_parser.add_argument('--permutations', type=int, default=1000, help="random sign flips of the permutation test")
+    slice_parser.add_argument('--alpha', type=float, default=0.05, help="significance level of the tied groups")
+    slice_parser.add_argument('--correlation', action='store_true',
+                              help="save the metric correlations across systems and over the per-query scores")
+    slice_parser.add_argument('--head-to-head', action='store_true',
+                              help="add per-query win rates of every pair of systems to the head-to-head heatmap")
+    rolling_parser = subparsers.add_parser('rolling', help="live rolling-window leaderboard of the result files in --results")
+    rolling_parser.add_argument('--window-days', type=float, default=None, help="only count results from the last N days")
+    rolling_parser.add_argument('--interval', type=float, default=10.0, help="seconds between polls of the result files")
+    rolling_parser.add_argument('--max-polls', type=int, default=None, help="stop after this many polls")
+    return parser
+
+def main(argv=None):
+    """Main function to generate the leaderboard"""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    stage = args.stage or 'build'
+    if args.tracks and stage in ('watch', 'history', 'sensitivity', 'cube', 'slice', 'rolling'):
+        parser.error(f"{stage} does not support --tracks")
+    if args.tracks and args.submissions:
+        parser.error("--submissions does not support --tracks")
+    if stage == 'watch' and args.engine == 'fast':
+        parser.error("watch does not support --engine fast (it rebuilds with pandas)")
+    if args.max_anomalies:
+        from validation import parse_limits
+        
+        try:
+            parse_limits(args.max_anomalies)
+        except ValueError as e:
+            parser.error(f"--max-anomalies: {e}")
+    if stage == 'history' and args.as_of:
+        from snapshot_store import parse_timestamp
+        
+        try:
+            parse_timestamp(args.as_of)
+        except ValueError as e:
+            parser.error(f"--as-of: {e}")
+    configure_session(connect_timeout=args.connect_timeout, read_timeout=args.timeout, retries=args.retries)
+    
+    report = RunReport(stage, trace_memory=args.trace_memory, profile_dir=args.profile_dir)
+    
+    print("🚀 Creating DeepScholar-Bench Leaderboard...")
+    if args.tracks:
+        import tracks
+        
+        tracks.run_tracks(args, stage, report)
+    else:
+        for run_stage in STAGES[stage]:
+            run_stage(args, report)
     
-    return html_file, csv_file
+    if args.report:
+        report.write(args.report)
+        print(f"🧾 Run report saved to: {args.report}")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,108 @@
+"""Per-metric distributions of the plotted systems, drawn in one batched render.
+
+All metrics share one axes on the normalised 0-1 scale: a single boxplot
+call draws the seven boxes from the columns of the (systems x metrics)
+matrix, and one scatter call per system group draws every system's
+jittered point on every metric. The figure is saved once.
+
+Rendering only needs the matrix, so it runs in a worker process while the
+spider plots are drawn; the pyplot-free Figure API keeps it independent of
+the parent's figure state. The figure is cached: a hash of everything it
+shows is stored next to the PDF and an unchanged sheet skips the render.
+"""
+import hashlib
+import os
+
+import numpy as np
+
+from atomic_io import atomic_open
+
+DISTRIBUTION_FILE = 'metric_distributions.pdf'
+
+# Boards larger than this show the boxes only (the strip of points would be a solid band)
+STRIP_LIMIT = 2000
+
+# Bump when the drawing changes, so cached figures are re-rendered
+RENDER_VERSION = 1
+
+# Background of the metric categories (same palette as the spider-plot arcs)
+CATEGORY_COLORS = ['#9ea8b8', '#9e938a', '#aebdb0']
+
+
+def distribution_key(values, labels, categories, groups):
+    """Hash of everything the figure shows"""
+    digest = hashlib.sha256(f"v{RENDER_VERSION}|{labels}|{categories}".encode('utf-8'))
+    digest.update(np.ascontiguousarray(values, dtype=float).tobytes())
+    for title, color, mask in groups:
+        digest.update(f"|{title}|{color}|".encode('utf-8'))
+        digest.update(np.ascontiguousarray(mask, dtype=bool).tobytes())
+    return digest.hexdigest()
+
+
+def _key_file(path):
+    return os.path.join(os.path.dirname(path), f".{os.path.basename(path)}.sha256")
+
+
+def is_cached(path, key):
+    """Whether the figure at path was rendered from data with this key"""
+    try:
+        with open(_key_file(path), encoding='utf-8') as f:
+            return f.read().strip() == key and os.path.exists(path)
+    except OSError:
+        return False
+
+
+def draw_distributions(fig, values, labels, categories, groups):
+    """Draw the box and strip plots of every metric column on a single axes of fig"""
+    values = np.asarray(values, dtype=float).reshape(-1, len(labels))
+    ax = fig.add_subplot(1, 1, 1)
+    positions = np.arange(len(labels))
+
+    # Category bands behind the boxes, in table order
+    start = 0
+    for i, (category, count) in enumerate(categories):
+        ax.axvspan(start - 0.5, start + count - 0.5, color=CATEGORY_COLORS[i % len(CATEGORY_COLORS)], alpha=0.25, lw=0)
+        ax.text(start + (count - 1) / 2, 1.07, category, ha='center', va='bottom', fontsize=14, fontweight='bold')
+        start += count
+
+    if len(values):
+        ax.boxplot(values, positions=positions, widths=0.5, showfliers=False, patch_artist=True,
+                   boxprops=dict(facecolor='white', alpha=0.8), medianprops=dict(color='black', linewidth=2))
+    if 0 < len(values) <= STRIP_LIMIT:
+        # Same jitter on every metric, so a system sits at the same offset in each column
+        jitter = np.random.default_rng(0).uniform(-0.18, 0.18, len(values))
+        x = positions[np.newaxis] + jitter[:, np.newaxis]
+        for title, color, mask in groups:
+            if mask.any():
+                ax.scatter(x[mask].ravel(), values[mask].ravel(), s=40, color=color, alpha=0.75,
+                           edgecolors='white', linewidths=0.5, label=f"{title} ({int(mask.sum())})", zorder=3)
+        shown = sum(mask.any() for _, _, mask in groups)
+        ax.legend(loc='upper center', bbox_to_anchor=(0.5, -0.12), ncol=max(1, shown), fontsize=14, frameon=False)
+
+    ax.set_xticks(positions)
+    ax.set_xticklabels(labels, fontsize=14)
+    ax.set_xlim(-0.5, len(labels) - 0.5)
+    ax.set_ylim(-0.02, 1.05)
+    ax.set_ylabel('Normalised score', fontsize=16)
+    ax.grid(axis='y', alpha=0.3)
+    ax.set_title(f"Metric distributions ({len(values)} systems)", fontsize=20, fontweight='bold', pad=40)
+
+
+def render_distributions(values, labels, categories, groups, path):
+    """Render the distribution figure to path unless the cached one is current
+
+    Returns {'path', 'cached', 'bytes'}. Safe to run in a worker process.
+    """
+    from matplotlib.figure import Figure
+
+    key = distribution_key(values, labels, categories, groups)
+    if is_cached(path, key):
+        return {'path': path, 'cached': True, 'bytes': 0}
+    fig = Figure(figsize=(18, 9))
+    draw_distributions(fig, values, labels, categories, groups)
+    fig.tight_layout()
+    with atomic_open(path) as f:
+        fig.savefig(f, format='pdf', bbox_inches='tight', dpi=300)
+    with atomic_open(_key_file(path), 'w', encoding='utf-8') as f:
+        f.write(key)
+    return {'path': path, 'cached': False, 'bytes': os.path.getsize(path)}
@@ -0,0 +1,126 @@
+"""Pandas-free leaderboard engine built on the csv module and NumPy.
+
+Implements the same load -> normalise -> sort -> CSV pipeline as
+create_leaderboard.load_data / process_data / DataFrame.to_csv, with identical
+output, for builds where importing pandas dominates the runtime. (Numbers
+with more than ~15 significant digits can differ in the last bit, since
+pandas' float parser is not always correctly rounded; sheet exports don't
+contain such values.)
+"""
+import contextlib
+import csv
+import io
+
+import numpy as np
+
+from atomic_io import atomic_open
+from metrics import METRIC_COLUMNS, METRIC_DISPLAY_NAMES, compile_specs, normalize_matrix
+from sheet_source import open_sheet
+
+# Cells pandas.read_csv reads as NaN by default
+NA_VALUES = {
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+    '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null',
+}
+
+
+@contextlib.contextmanager
+def _open_source(source):
+    """Open a local path or URL as a text stream"""
+    with open_sheet(source) as stream:
+        yield io.TextIOWrapper(stream, encoding='utf-8', newline='')
+
+
+def _dedupe_columns(header):
+    """Name blank and duplicated columns the way pandas does ('Unnamed: i', 'x.1')"""
+    columns = []
+    seen = {}
+    for i, name in enumerate(header):
+        name = name if name != '' else f"Unnamed: {i}"
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        columns.append(name)
+    return [column.strip() for column in columns]
+
+
+def load_rows(source):
+    """Load the sheet export: returns (column names, data rows) using the second row as the header"""
+    with _open_source(source) as f:
+        rows = [row for row in csv.reader(f) if row and any(row)]
+
+    columns = _dedupe_columns(rows[1])
+    width = len(columns)
+    data = [(row + [''] * width)[:width] for row in rows[2:]]
+
+    # Clean whitespace in the system names (missing names become 'nan', as with astype(str))
+    for row in data:
+        row[0] = 'nan' if row[0] in NA_VALUES else row[0].strip()
+    return columns, data
+
+
+def parse_metric_cells(cells):
+    """Convert raw cells to floats: strip '%', NaN for missing or non-numeric cells"""
+    values = np.full(len(cells), np.nan)
+    for i, cell in enumerate(cells):
+        if cell in NA_VALUES:
+            continue
+        try:
+            values[i] = float(cell.replace('%', ''))
+        except ValueError:
+            pass
+    return values
+
+
+def raw_metric_values(columns, data):
+    """(positions of the non-'nan' systems, their raw metric matrix with NaN for missing or non-numeric cells)"""
+    kept = [i for i, row in enumerate(data) if row[0] != 'nan']
+    positions = [columns.index(name) for name in METRIC_COLUMNS]
+    raw = np.array([parse_metric_cells([data[i][p] for i in kept]) for p in positions]).T
+    return kept, raw.reshape(len(kept), len(METRIC_COLUMNS))
+
+
+def process_rows(columns, data, raw=None):
+    """Process and clean the data for the leaderboard; returns (records, metric columns, original positions)
+
+    raw: the matrix of raw_metric_values(columns, data), if already parsed.
+    """
+    # Filter out 'nan' systems
+    kept = [i for i, row in enumerate(data) if row[0] != 'nan']
+
+    positions = [columns.index(name) for name in ['System Name', 'lm', 'open/close']]
+    table = [[data[i][p] for p in positions] for i in kept]
+
+    # Convert, scale percentages, fill NaN with 0 and clip to 1.0 in a single pass
+    if raw is None:
+        _, raw = raw_metric_values(columns, data)
+    values = normalize_matrix(raw, compile_specs())
+
+    # Sort by Organization first, then by Document Importance if tied (stable, like sort_values)
+    order = np.lexsort((-values[:, 3], -values[:, 0]))
+
+    metric_columns = list(METRIC_DISPLAY_NAMES.values())
+    records = []
+    for i in order:
+        name, lm, system_type = table[i][:3]
+        record = {
+            'System Name': name,
+            'lm': '' if lm in NA_VALUES else lm,
+            'System Type': '' if system_type in NA_VALUES else system_type,
+        }
+        record.update(zip(metric_columns, values[i].tolist()))
+        records.append(record)
+    return records, metric_columns, [kept[i] for i in order]
+
+
+def write_csv(records, metric_columns, csv_file):
+    """Save the processed leaderboard in the same format as DataFrame.to_csv(index=False)"""
+    fieldnames = ['System Name', 'lm', 'System Type'] + metric_columns
+    with atomic_open(csv_file, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f, lineterminator='\n')
+        writer.writerow(fieldnames)
+        for record in records:
+            writer.writerow([repr(value) if isinstance(value, float) else value
+                             for value in (record[name] for name in fieldnames)])
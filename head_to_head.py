@@ -0,0 +1,138 @@
+"""Head-to-head comparison of every pair of systems.
+
+wins[a, b] is the number of metrics on which system a scores higher than
+system b on the processed leaderboard; it fits a uint8 and is computed by
+broadcasting a block of systems against all of them. When per-query
+scores are available (score cube slices), win_rates[a, b] is the share of
+the (query, metric) comparisons both systems have a value for that a
+wins, ties counting half, stored as a uint8 percentage.
+
+Both matrices are embedded in the page as base64 bytes and drawn as a
+canvas heatmap (one pixel per pair, scaled up) only when the panel
+scrolls into view, so the page stays responsive with hundreds of systems.
+"""
+import base64
+import json
+
+import numpy as np
+
+# Largest leaderboard whose page gets the head-to-head heatmap (the matrix grows quadratically)
+HEAD_TO_HEAD_LIMIT = 1000
+
+# Upper bound on the cells of one block's broadcast comparisons
+MAX_BLOCK_CELLS = 1 << 24
+
+
+def metric_wins(scores):
+    """(systems x systems) uint8 number of metrics on which the row system beats the column system"""
+    scores = np.asarray(scores, dtype=float)
+    n_systems, n_metrics = scores.shape
+    wins = np.zeros((n_systems, n_systems), dtype=np.uint8)
+    step = max(1, MAX_BLOCK_CELLS // max(n_systems * n_metrics, 1))
+    for start in range(0, n_systems, step):
+        wins[start:start + step] = (scores[start:start + step, np.newaxis] > scores[np.newaxis]).sum(axis=2)
+    return wins
+
+
+def query_win_rates(scores):
+    """(systems x systems) uint8 percentage of per-query comparisons won by the row system, ties counting half
+
+    scores: (systems x queries x metrics) raw per-query scores, NaN where missing.
+    Pairs without a comparison get 50.
+    """
+    scores = np.asarray(scores, dtype=float)
+    n_systems = len(scores)
+    rates = np.full((n_systems, n_systems), 50, dtype=np.uint8)
+    step = max(1, MAX_BLOCK_CELLS // max(scores[0].size * n_systems, 1)) if n_systems else 1
+    for start in range(0, n_systems, step):
+        differences = scores[start:start + step, np.newaxis] - scores[np.newaxis]
+        compared = (~np.isnan(differences)).sum(axis=(2, 3))
+        points = (differences > 0).sum(axis=(2, 3)) + 0.5 * (differences == 0).sum(axis=(2, 3))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            block = np.where(compared > 0, np.rint(100 * points / np.maximum(compared, 1)), 50)
+        rates[start:start + step] = block.astype(np.uint8)
+    return rates
+
+
+def cube_win_rates(cube, mask):
+    """Per-query win rates of a score cube slice, systems in slice leaderboard order"""
+    systems, _ = cube.ranked_systems(mask)
+    return query_win_rates(cube.scores[systems][:, np.flatnonzero(mask)])
+
+
+def _encode(matrix):
+    return base64.b64encode(np.ascontiguousarray(matrix, dtype=np.uint8).tobytes()).decode('ascii')
+
+
+def render_head_to_head_panel(names, wins, n_metrics, win_rates=None):
+    """HTML head-to-head heatmap panel ('' for boards too large to embed)"""
+    if not 1 < len(names) <= HEAD_TO_HEAD_LIMIT:
+        return ''
+    data = {'names': names, 'metrics': n_metrics, 'wins': _encode(wins),
+            'rates': _encode(win_rates) if win_rates is not None else None}
+    rates_option = '<option value="rates">Per-query win rate</option>' if win_rates is not None else ''
+    return f"""
+        <!-- Head-to-Head Section -->
+        <div class="head-to-head-section" style="margin: 40px 30px; padding: 20px; background: #f8f9ff; border-radius: 12px; border-left: 5px solid #667eea;">
+            <h3 style="color: #1e3c72; margin-bottom: 15px;">⚔️ Head to Head</h3>
+            <p style="margin-bottom: 10px;">Row system against column system, in leaderboard order: green where the row system wins, red where it loses. Hover a cell for details.</p>
+            <select id="headToHeadMode" onchange="drawHeadToHead()" style="margin-bottom: 15px; padding: 4px 8px;">
+                <option value="wins">Metrics won (of {n_metrics})</option>{rates_option}
+            </select>
+            <div id="headToHeadTip" style="min-height: 1.5em; margin-bottom: 8px; color: #1e3c72; font-weight: 600;"></div>
+            <canvas id="headToHeadHeatmap" style="border: 1px solid #e9ecef; image-rendering: pixelated; max-width: 100%;"></canvas>
+        </div>
+        <script>
+        const HEAD_TO_HEAD = {json.dumps(data)};
+        const headToHeadBytes = {{}};
+        function headToHeadMatrix(mode) {{
+            if (!headToHeadBytes[mode]) {{
+                const raw = atob(HEAD_TO_HEAD[mode]);
+                headToHeadBytes[mode] = Uint8Array.from(raw, (c) => c.charCodeAt(0));
+            }}
+            return headToHeadBytes[mode];
+        }}
+        function drawHeadToHead() {{
+            const mode = document.getElementById('headToHeadMode').value;
+            const matrix = headToHeadMatrix(mode);
+            const n = HEAD_TO_HEAD.names.length;
+            // 0..1, 0.5 = even
+            const share = mode === 'wins'
+                ? (i, j) => (matrix[i * n + j] - matrix[j * n + i] + HEAD_TO_HEAD.metrics) / (2 * HEAD_TO_HEAD.metrics)
+                : (i, j) => matrix[i * n + j] / 100;
+            const canvas = document.getElementById('headToHeadHeatmap');
+            canvas.width = canvas.height = n;
+            const scale = Math.max(1, Math.floor(600 / n));
+            canvas.style.width = canvas.style.height = (n * scale) + 'px';
+            const ctx = canvas.getContext('2d');
+            const image = ctx.createImageData(n, n);
+            for (let i = 0; i < n; i++) {{
+                for (let j = 0; j < n; j++) {{
+                    const offset = (i * n + j) * 4;
+                    const s = i === j ? 0.5 : share(i, j);
+                    image.data[offset] = Math.round(255 * Math.min(1, 2 * (1 - s)));
+                    image.data[offset + 1] = Math.round(255 * Math.min(1, 2 * s));
+                    image.data[offset + 2] = Math.round(255 * (1 - Math.abs(2 * s - 1)));
+                    image.data[offset + 3] = 255;
+                }}
+            }}
+            ctx.putImageData(image, 0, 0);
+            canvas.onmousemove = (event) => {{
+                const i = Math.floor(event.offsetY / scale), j = Math.floor(event.offsetX / scale);
+                if (i >= n || j >= n || i === j) return;
+                const detail = mode === 'wins'
+                    ? `wins ${{matrix[i * n + j]}}, loses ${{matrix[j * n + i]}} of ${{HEAD_TO_HEAD.metrics}} metrics`
+                    : `wins ${{matrix[i * n + j]}}% of per-query comparisons`;
+                document.getElementById('headToHeadTip').textContent =
+                    `${{HEAD_TO_HEAD.names[i]}} vs ${{HEAD_TO_HEAD.names[j]}}: ${{detail}}`;
+            }};
+        }}
+        // Draw the heatmap only once it scrolls into view
+        new IntersectionObserver((entries, observer) => {{
+            if (entries.some((entry) => entry.isIntersecting)) {{
+                observer.disconnect();
+                drawHeadToHead();
+            }}
+        }}).observe(document.getElementById('headToHeadHeatmap'));
+        </script>
+"""
@@ -0,0 +1,243 @@
+"""Pooled HTTP session with timeouts, retries and streamed responses.
+
+Built on http.client so the fetch path needs no third-party packages.
+Connections are kept alive and reused per (scheme, host, port); every
+request has separate connect and read timeouts; connection errors,
+timeouts, 429 and 5xx responses are retried with exponential backoff and
+full jitter; and responses are returned unread so callers can stream the
+body in chunks instead of buffering it. Proxies are taken from the
+environment like urllib does (HTTP_PROXY/HTTPS_PROXY, NO_PROXY): HTTPS
+goes through a CONNECT tunnel, plain HTTP sends absolute URLs to the proxy.
+"""
+import base64
+import http.client
+import io
+import random
+import threading
+import time
+import urllib.request
+from urllib.parse import unquote, urljoin, urlsplit
+
+# Statuses worth retrying: rate limiting and transient server errors
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+REDIRECT_STATUSES = {301, 302, 303, 307, 308}
+
+
+class FetchError(OSError):
+    """A request failed for good (after retries, or with a non-retryable status)"""
+
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+
+class StreamedResponse(io.BufferedIOBase):
+    """File-like response body; returns its connection to the pool once fully read"""
+
+    def __init__(self, session, key, connection, response, url):
+        super().__init__()
+        self._session = session
+        self._key = key
+        self._connection = connection
+        self._response = response
+        self.url = url
+        self.status = response.status
+        self.headers = response.headers
+
+    def read(self, size=-1):
+        return self._response.read(size if size is not None and size >= 0 else None)
+
+    def read1(self, size=-1):
+        return self._response.read1(size)
+
+    def readinto(self, buffer):
+        return self._response.readinto(buffer)
+
+    def readline(self, size=-1):
+        return self._response.readline(size)
+
+    def readable(self):
+        return True
+
+    def close(self):
+        if self._connection is not None:
+            if self._response.length == 0 and not self._response.isclosed():
+                # Bodiless responses (304, redirects) are drained so the connection can be reused
+                self._response.read()
+            if self._response.isclosed() and not self._response.will_close:
+                self._session._release(self._key, self._connection)
+            else:
+                self._response.close()
+                self._connection.close()
+            self._connection = None
+        super().close()
+
+
+class HTTPSession:
+    """Keep-alive connection pool with connect/read timeouts and jittered retries"""
+
+    def __init__(self, connect_timeout=10.0, read_timeout=60.0, retries=3, backoff=0.5, max_backoff=8.0,
+                 max_redirects=5, pool_size=4, user_agent='deepscholar-leaderboard'):
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.max_redirects = max_redirects
+        self.pool_size = pool_size
+        self.user_agent = user_agent
+        self._pool = {}
+        self._lock = threading.Lock()
+
+    def _acquire(self, key):
+        """An idle pooled connection for (scheme, host, port, proxy), or a new one"""
+        with self._lock:
+            idle = self._pool.get(key)
+            if idle:
+                return idle.pop()
+        scheme, host, port, proxy = key
+        connection_class = http.client.HTTPSConnection if scheme == 'https' else http.client.HTTPConnection
+        if proxy is None:
+            return connection_class(host, port, timeout=self.connect_timeout)
+        proxy_host, proxy_port, authorization = proxy
+        connection = connection_class(proxy_host, proxy_port, timeout=self.connect_timeout)
+        if scheme == 'https':
+            connection.set_tunnel(host, port, headers={'Proxy-Authorization': authorization} if authorization else None)
+        return connection
+
+    def _release(self, key, connection):
+        with self._lock:
+            idle = self._pool.setdefault(key, [])
+            if len(idle) < self.pool_size:
+                idle.append(connection)
+                return
+        connection.close()
+
+    def close(self):
+        """Close every pooled connection"""
+        with self._lock:
+            pools, self._pool = self._pool, {}
+        for idle in pools.values():
+            for connection in idle:
+                connection.close()
+
+    @staticmethod
+    def _proxy_for(scheme, host):
+        """(host, port, Proxy-Authorization or None) of the environment's proxy for scheme://host, None if direct"""
+        proxy = urllib.request.getproxies().get(scheme)
+        if not proxy or urllib.request.proxy_bypass(host):
+            return None
+        parts = urlsplit(proxy if '://' in proxy else f"http://{proxy}")
+        authorization = None
+        if parts.username:
+            credentials = f"{unquote(parts.username)}:{unquote(parts.password or '')}".encode('utf-8')
+            authorization = 'Basic ' + base64.b64encode(credentials).decode('ascii')
+        return parts.hostname, parts.port or 80, authorization
+
+    def _sleep_before_retry(self, attempt, retry_after=None):
+        """Exponential backoff with full jitter (or the server's Retry-After)"""
+        if retry_after is not None:
+            delay = retry_after
+        else:
+            delay = random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+        time.sleep(min(delay, self.max_backoff))
+
+    def _send_once(self, url, headers):
+        """Send one GET; returns a StreamedResponse (body not read yet)"""
+        parts = urlsplit(url)
+        port = parts.port or (443 if parts.scheme == 'https' else 80)
+        proxy = self._proxy_for(parts.scheme, parts.hostname)
+        key = (parts.scheme, parts.hostname, port, proxy)
+        path = parts.path or '/'
+        if parts.query:
+            path += '?' + parts.query
+
+        request_headers = {'User-Agent': self.user_agent, 'Accept-Encoding': 'identity'}
+        if proxy is not None and parts.scheme == 'http':
+            # A plain-HTTP proxy takes the absolute URL (HTTPS tunnels through it instead)
+            path = f"http://{parts.netloc.rpartition('@')[2]}{path}"
+            if proxy[2]:
+                request_headers['Proxy-Authorization'] = proxy[2]
+        request_headers.update(headers)
+        connection = self._acquire(key)
+        while True:
+            reused = connection.sock is not None
+            try:
+                if not reused:
+                    connection.connect()
+                # Connect with the connect timeout, then wait for data with the read timeout
+                connection.sock.settimeout(self.read_timeout)
+                connection.request('GET', path, headers=request_headers)
+                response = connection.getresponse()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                connection.close()
+                if not reused:
+                    raise
+                # The server closed an idle keep-alive connection; resend on a fresh one
+                continue
+            except BaseException:
+                connection.close()
+                raise
+            return StreamedResponse(self, key, connection, response, url)
+
+    def get(self, url, headers=None):
+        """GET url following redirects and retrying transient failures.
+
+        Returns an unread StreamedResponse; 2xx and 304 are returned, other
+        statuses raise FetchError. Use it as a context manager.
+        """
+        headers = dict(headers or {})
+        last_error = None
+        for attempt in range(self.retries + 1):
+            if attempt:
+                self._sleep_before_retry(attempt - 1, getattr(last_error, 'retry_after', None))
+            try:
+                response = self._follow_redirects(url, headers)
+            except (OSError, http.client.HTTPException) as e:
+                if isinstance(e, FetchError) and e.status not in RETRY_STATUSES:
+                    raise
+                last_error = e
+                continue
+            return response
+        raise FetchError(f"GET {url} failed after {self.retries + 1} attempts: {last_error}",
+                         getattr(last_error, 'status', None))
+
+    def _follow_redirects(self, url, headers):
+        for _ in range(self.max_redirects + 1):
+            response = self._send_once(url, headers)
+            if response.status in REDIRECT_STATUSES and response.headers.get('Location'):
+                response.read()
+                response.close()
+                url = urljoin(url, response.headers['Location'])
+                continue
+            if 200 <= response.status < 300 or response.status == 304:
+                return response
+            response.read()
+            response.close()
+            error = FetchError(f"GET {url} returned HTTP {response.status}", response.status)
+            retry_after = response.headers.get('Retry-After')
+            if retry_after and retry_after.isdigit():
+                error.retry_after = float(retry_after)
+            raise error
+        raise FetchError(f"GET {url}: too many redirects")
+
+
+_default_session = None
+_session_options = {}
+
+
+def configure_session(**options):
+    """Set the timeouts/retries of the shared session (replaces it)"""
+    global _default_session
+    _session_options.update({name: value for name, value in options.items() if value is not None})
+    if _default_session is not None:
+        _default_session.close()
+    _default_session = None
+
+
+def get_session():
+    """The shared, lazily created session"""
+    global _default_session
+    if _default_session is None:
+        _default_session = HTTPSession(**_session_options)
+    return _default_session
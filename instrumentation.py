@@ -0,0 +1,126 @@
+"""Per-stage timing and memory instrumentation for the leaderboard build.
+
+Each stage is wrapped in ``report.stage(name)``, which records wall time, CPU
+time, peak RSS and (optionally) the tracemalloc peak, plus whatever counters
+the stage fills in (rows, bytes_in, bytes_out). The collected stages are
+written as one JSON report per run, and each stage can optionally be
+profiled with cProfile.
+"""
+import cProfile
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+
+def peak_rss_kb():
+    """Peak resident set size of this process so far, in KiB (None if unknown)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and KiB on Linux
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+class RunReport:
+    """Collects per-stage measurements for one run"""
+
+    def __init__(self, name, trace_memory=False, profile_dir=None):
+        self.name = name
+        self.trace_memory = trace_memory
+        self.profile_dir = profile_dir
+        self.started = datetime.now(timezone.utc)
+        self.stages = []
+        self._profiling = False
+        self._traced_peaks = []  # tracemalloc peaks of the enclosing (open) stages
+        self._start = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name, **counters):
+        """Measure a stage; the yielded dict takes counters such as rows, bytes_in, bytes_out"""
+        stats = {'rows': None, 'bytes_in': None, 'bytes_out': None}
+        stats.update(counters)
+
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            # Fold the peak so far into the enclosing stage before resetting it
+            if self._traced_peaks:
+                self._traced_peaks[-1] = max(self._traced_peaks[-1], tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+            self._traced_peaks.append(0)
+        # Nested stages are covered by the enclosing stage's profile
+        profiler = cProfile.Profile() if self.profile_dir and not self._profiling else None
+
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        if profiler:
+            self._profiling = True
+            profiler.enable()
+        status = 'ok'
+        try:
+            yield stats
+        except BaseException:
+            status = 'error'
+            raise
+        finally:
+            if profiler:
+                profiler.disable()
+                self._profiling = False
+            entry = {
+                'name': name,
+                'status': status,
+                'wall_s': round(time.perf_counter() - wall_start, 6),
+                'cpu_s': round(time.process_time() - cpu_start, 6),
+                'peak_rss_kb': peak_rss_kb(),
+            }
+            if self.trace_memory:
+                traced_peak = max(self._traced_peaks.pop(), tracemalloc.get_traced_memory()[1])
+                if self._traced_peaks:
+                    self._traced_peaks[-1] = max(self._traced_peaks[-1], traced_peak)
+                entry['peak_traced_kb'] = traced_peak // 1024
+            entry.update(stats)
+            if profiler:
+                os.makedirs(self.profile_dir, exist_ok=True)
+                profile_file = os.path.join(self.profile_dir, f"{self.name}_{len(self.stages):02d}_{_safe_name(name)}.prof")
+                profiler.dump_stats(profile_file)
+                entry['profile'] = profile_file
+            self.stages.append(entry)
+
+    def to_dict(self):
+        """The report as a JSON-serialisable dict"""
+        return {
+            'run': self.name,
+            'started': self.started.isoformat(),
+            'total_wall_s': round(time.perf_counter() - self._start, 6),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'argv': sys.argv,
+            'stages': self.stages,
+        }
+
+    def write(self, path):
+        """Save the report as JSON"""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2)
+        return path
+
+
+def _safe_name(name):
+    """Stage name usable in a file name"""
+    return ''.join(c if c.isalnum() or c in '-_.' else '_' for c in name)
+
+
+def file_size(path):
+    """Size of a local file, or None for URLs and missing files"""
+    return os.path.getsize(path) if os.path.isfile(path) else None
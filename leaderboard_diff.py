@@ -0,0 +1,175 @@
+"""What changed between two processed leaderboards.
+
+Systems are aligned through a hash index of (System Name, lm) keys, then
+per-metric deltas and rank changes are computed on NumPy arrays in one
+pass, so a diff costs about as much as reading the two tables and can run
+on every watch-mode tick. The result is a JSON-serialisable dict, also
+rendered as the "What changed" panel of the HTML leaderboard.
+"""
+import json
+import math
+from datetime import datetime, timezone
+
+import numpy as np
+
+from atomic_io import atomic_open
+from snapshot_store import parse_csv, row_keys
+
+CHANGES_FILE = 'leaderboard_changes.json'
+
+# Score changes smaller than this are float noise, not edits
+TOLERANCE = 1e-9
+
+
+def _cell(value):
+    """Text of a name/LM cell (NaN from pandas reads as empty, like in the CSV)"""
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return ''
+    return str(value)
+
+
+def leaderboard_table(data, metric_columns):
+    """(columns, rows) of a process_data result (DataFrame or list of dicts)"""
+    columns = ['System Name', 'lm', 'System Type'] + list(metric_columns)
+    if hasattr(data, 'to_dict'):
+        data = data.to_dict('records')
+    return columns, [[_cell(row['System Name']), _cell(row['lm']), _cell(row['System Type'])]
+                     + [row[metric] for metric in metric_columns] for row in data]
+
+
+def _prepare(columns, rows):
+    """Keys, labels and the float metric matrix of a (columns, rows) table"""
+    metrics = columns[3:]
+    matrix = np.asarray([row[3:] for row in rows], dtype=float).reshape(len(rows), len(metrics))
+    return row_keys(rows), metrics, matrix
+
+
+def _label(row, rank):
+    return {'system': row[0], 'lm': row[1], 'rank': rank}
+
+
+def diff_leaderboards(previous, current):
+    """Diff two (columns, rows) leaderboards (rows in rank order, cells as text or numbers).
+
+    Returns {'summary', 'added', 'removed', 'moved', 'changed', 'metrics_added',
+    'metrics_removed'}; 'moved' lists rank changes (positive = moved up) and
+    'changed' the per-metric score deltas of systems present in both.
+    """
+    prev_columns, prev_rows = previous
+    columns, rows = current
+    prev_keys, prev_metrics, prev_matrix = _prepare(prev_columns, prev_rows)
+    keys, metrics, matrix = _prepare(columns, rows)
+
+    # Hash index of the previous leaderboard: key -> row position (= rank - 1)
+    prev_index = {key: i for i, key in enumerate(prev_keys)}
+    positions = np.fromiter((prev_index.get(key, -1) for key in keys), dtype=np.int64, count=len(keys))
+    present = positions >= 0
+    cur_idx = np.flatnonzero(present)
+    prev_idx = positions[present]
+    removed_mask = np.ones(len(prev_keys), dtype=bool)
+    removed_mask[prev_idx] = False
+
+    # Metrics present in both versions, as column indices into each matrix
+    shared = [metric for metric in metrics if metric in prev_metrics]
+    cur_cols = [metrics.index(metric) for metric in shared]
+    prev_cols = [prev_metrics.index(metric) for metric in shared]
+    deltas = matrix[np.ix_(cur_idx, cur_cols)] - prev_matrix[np.ix_(prev_idx, prev_cols)]
+    rank_change = prev_idx - cur_idx  # positive = moved up
+
+    moved = []
+    for i in np.flatnonzero(rank_change):
+        moved.append(dict(_label(rows[cur_idx[i]], int(cur_idx[i]) + 1),
+                          previous_rank=int(prev_idx[i]) + 1, change=int(rank_change[i])))
+    moved.sort(key=lambda entry: -abs(entry['change']))
+
+    changed = []
+    changed_rows = np.flatnonzero((np.abs(deltas) > TOLERANCE).any(axis=1)) if shared else []
+    for i in changed_rows:
+        row_deltas = deltas[i]
+        changed.append(dict(_label(rows[cur_idx[i]], int(cur_idx[i]) + 1), deltas={
+            metric: round(float(row_deltas[j]), 6) for j, metric in enumerate(shared)
+            if abs(row_deltas[j]) > TOLERANCE}))
+
+    added = [_label(rows[i], int(i) + 1) for i in np.flatnonzero(~present)]
+    removed = [_label(prev_rows[i], int(i) + 1) for i in np.flatnonzero(removed_mask)]
+    return {
+        'summary': {'added': len(added), 'removed': len(removed), 'moved': len(moved), 'changed': len(changed),
+                    'systems': len(rows), 'previous_systems': len(prev_rows)},
+        'added': added,
+        'removed': removed,
+        'moved': moved,
+        'changed': changed,
+        'metrics_added': [metric for metric in metrics if metric not in prev_metrics],
+        'metrics_removed': [metric for metric in prev_metrics if metric not in metrics],
+    }
+
+
+def diff_csv(previous_content, current_content):
+    """Diff two leaderboard CSVs given as bytes"""
+    return diff_leaderboards(parse_csv(previous_content), parse_csv(current_content))
+
+
+def has_changes(diff):
+    """Whether a diff reports any difference"""
+    summary = diff['summary']
+    return bool(summary['added'] or summary['removed'] or summary['moved'] or summary['changed']
+                or diff['metrics_added'] or diff['metrics_removed'])
+
+
+def write_changes(diff, path):
+    """Save a diff as JSON (atomically), stamped with the time it was computed"""
+    with atomic_open(path, 'w', encoding='utf-8') as f:
+        json.dump(dict(diff, generated=datetime.now(timezone.utc).isoformat()), f, indent=2)
+    return path
+
+
+def read_changes(path):
+    """Diff saved by write_changes, or None"""
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _display(metric):
+    return metric.replace('<br>', ' ')
+
+
+def render_changes_panel(diff, limit=10):
+    """HTML "What changed" panel for the leaderboard page ('' when nothing changed)"""
+    if not diff or not has_changes(diff):
+        return ''
+
+    def system(entry):
+        lm = f" ({entry['lm']})" if entry['lm'] else ''
+        return f"<strong>{entry['system']}</strong>{lm}"
+
+    items = []
+    for entry in diff['added'][:limit]:
+        items.append(f"🆕 {system(entry)} entered at #{entry['rank']}")
+    for entry in diff['moved'][:limit]:
+        arrow = '⬆️' if entry['change'] > 0 else '⬇️'
+        items.append(f"{arrow} {system(entry)} #{entry['previous_rank']} → #{entry['rank']}")
+    for entry in diff['changed'][:limit]:
+        deltas = ', '.join(f"{_display(metric)} {delta:+.3f}" for metric, delta in entry['deltas'].items())
+        items.append(f"✏️ {system(entry)}: {deltas}")
+    for entry in diff['removed'][:limit]:
+        items.append(f"🗑️ {system(entry)} removed (was #{entry['rank']})")
+    for metric in diff['metrics_added']:
+        items.append(f"📏 New metric: {_display(metric)}")
+    for metric in diff['metrics_removed']:
+        items.append(f"📏 Metric dropped: {_display(metric)}")
+
+    summary = diff['summary']
+    generated = diff.get('generated', '')[:16].replace('T', ' ')
+    list_items = ''.join(f"                <li>{item}</li>\n" for item in items)
+    return f"""
+        <!-- What Changed Section -->
+        <div class="changes-section" style="margin: 40px 30px; padding: 20px; background: #f8f9ff; border-radius: 12px; border-left: 5px solid #667eea;">
+            <h3 style="color: #1e3c72; margin-bottom: 15px;">🔄 What Changed{f' ({generated} UTC)' if generated else ''}</h3>
+            <p style="margin-bottom: 10px;">{summary['added']} new, {summary['removed']} removed, {summary['moved']} moved, {summary['changed']} with updated scores since the previous version.</p>
+            <ul style="margin-left: 20px; line-height: 1.8;">
+{list_items}            </ul>
+        </div>
+"""
@@ -0,0 +1,210 @@
+# numpy and pandas are imported inside the functions that need them, so that
+# importing the registry (e.g. for the CLI or the html stage) stays cheap
+
+# Category headers, in the order they appear in the table and on the spider plots
+METRIC_CATEGORIES = [
+    {'name': 'Knowledge Synthesis', 'icon': '🧠'},
+    {'name': 'Retrieval Quality', 'icon': '🔍'},
+    {'name': 'Verifiability', 'icon': '✅'},
+]
+
+# Single source of truth for the seven leaderboard metrics.
+#   column:           long column name in the Google Sheet
+#   display:          column name in the processed leaderboard / CSV
+#   header:           table header and radar chart label on the HTML page
+#   individual_label: label on the individual spider plots
+#   combined_label:   label on the combined spider plot
+#   percent:          sheet stores the value as a percentage (divide by 100)
+#   fill_value:       value used when the cell is missing or not numeric
+#   clip_upper:       values are clipped to this maximum
+#   query_fill:       per-query value of a result without a numeric value, when
+#                     aggregating per-query results (None: the query is skipped)
+METRIC_SPECS = [
+    {
+        'key': 'organization',
+        'column': "Win rate (including ties as .5)",
+        'display': "Org.",
+        'header': "Organization",
+        'individual_label': 'Organization',
+        'combined_label': 'Organization',
+        'category': 'Knowledge Synthesis',
+        'description': "Measures how well the system organizes and structures the related work section",
+        'percent': True,
+        'fill_value': 0.0,
+        'clip_upper': 1.0,
+        'query_fill': None,
+    },
+    {
+        'key': 'nugget_coverage',
+        'column': "strict all",
+        'display': "Nugget<br>Cov.",
+        'header': "Nugget<br>Coverage",
+        'individual_label': 'Nugget \nCoverage',
+        'combined_label': 'Nugget \nCoverage',
+        'category': 'Knowledge Synthesis',
+        'description': "Evaluates the comprehensiveness of key insights and findings covered",
+        'percent': False,
+        'fill_value': 0.0,
+        'clip_upper': 1.0,
+        'query_fill': None,
+    },
+    {
+        'key': 'relevance_rate',
+        'column': "Retreival Relevance Normalized (Avg / 2) avg over ALL user-provided reference -> any arxiv id found in the report",
+        'display': "Rel.<br>Rate.",
+        'header': "Relevance<br>Rate",
+        'individual_label': 'Relevance \nRate',
+        'combined_label': 'Relevance \nRate',
+        'category': 'Retrieval Quality',
+        'description': "Assesses how relevant the retrieved references are to the query",
+        'percent': False,
+        'fill_value': 0.0,
+        'clip_upper': 1.0,
+        'query_fill': None,
+    },
+    {
+        'key': 'document_importance',
+        'column': "Document Importance RATIO (avg over median citations per reference div by gt arxiv number)",
+        'display': "Doc.<br>Imp.",
+        'header': "Document<br>Importance",
+        'individual_label': 'Document \n Importance',
+        'combined_label': 'Doc \n Importance',
+        'category': 'Retrieval Quality',
+        'description': "Measures the significance and impact of cited documents",
+        'percent': False,
+        'fill_value': 0.0,
+        'clip_upper': 1.0,
+        'query_fill': None,
+    },
+    {
+        'key': 'reference_coverage',
+        'column': "ARXIV Essential citation coverage avg per file",
+        'display': "Ref.<br>Cov.",
+        'header': "Reference<br>Coverage",
+        'individual_label': "Reference \n Coverage",
+        'combined_label': "Reference \n Coverage",
+        'category': 'Retrieval Quality',
+        'description': "Evaluates the breadth of reference sources included",
+        'percent': False,
+        'fill_value': 0.0,
+        'clip_upper': 1.0,
+        'query_fill': None,
+    },
+    {
+        'key': 'citation_precision',
+        'column': "Citation Precision (0's for Nans)",
+        'display': "Cite-P",
+        'header': "Citation<br>Precision",
+        'individual_label': 'Citation \n Precision',
+        'combined_label': 'Cite-P',
+        'category': 'Verifiability',
+        'description': "Measures the accuracy and correctness of citations",
+        'percent': True,
+        'fill_value': 0.0,
+        'clip_upper': 1.0,
+        'query_fill': 0.0,
+    },
+    {
+        'key': 'claim_coverage',
+        'column': "relaxed recall - divisor all sentences - slide 1  - 0 for nans",
+        'display': "Claim<br>Cov.",
+        'header': "Claim<br>Coverage",
+        'individual_label': 'Claim \n Coverage',
+        'combined_label': 'Claim Cov \n(w = 1)',
+        'category': 'Verifiability',
+        'description': "Evaluates how well claims are supported by evidence",
+        'percent': True,
+        'fill_value': 0.0,
+        'clip_upper': 1.0,
+        'query_fill': 0.0,
+    },
+]
+
+METRIC_COLUMNS = [spec['column'] for spec in METRIC_SPECS]
+METRIC_DISPLAY_NAMES = {spec['column']: spec['display'] for spec in METRIC_SPECS}
+
+# Named weightings of the metrics for the composite rankings of the page (see ranking.py).
+#   weights: metric key -> weight; missing metrics weigh 0 and weights are normalised to sum to 1
+RANKING_PROFILES = [
+    {'key': 'average', 'label': 'Average of all metrics', 'weights': {spec['key']: 1.0 for spec in METRIC_SPECS}},
+] + [
+    {'key': category['name'].lower().replace(' ', '_'), 'label': category['name'],
+     'weights': {spec['key']: 1.0 for spec in METRIC_SPECS if spec['category'] == category['name']}}
+    for category in METRIC_CATEGORIES
+]
+
+_SPECS_BY_KEY = {spec['key']: spec for spec in METRIC_SPECS}
+_SPECS_BY_COLUMN = {spec['column']: spec for spec in METRIC_SPECS}
+
+
+def get_spec(name):
+    """Look up a metric spec by key, sheet column or display name"""
+    if name in _SPECS_BY_KEY:
+        return _SPECS_BY_KEY[name]
+    if name in _SPECS_BY_COLUMN:
+        return _SPECS_BY_COLUMN[name]
+    for spec in METRIC_SPECS:
+        if spec['display'] == name:
+            return spec
+    raise KeyError(f"Unknown metric: {name}")
+
+
+def metric_renames(label_field, specs=None):
+    """Map sheet column names to one of the label fields of the registry"""
+    specs = METRIC_SPECS if specs is None else specs
+    return {spec['column']: spec[label_field] for spec in specs}
+
+
+def category_spans(specs=None):
+    """Return (category, icon, number of metrics) in table order"""
+    specs = METRIC_SPECS if specs is None else specs
+    spans = []
+    for category in METRIC_CATEGORIES:
+        count = sum(1 for spec in specs if spec['category'] == category['name'])
+        if count:
+            spans.append((category['name'], category['icon'], count))
+    return spans
+
+
+def compile_specs(specs=None):
+    """Compile metric specs into the vectors used by the normalisation pass"""
+    import numpy as np
+
+    specs = METRIC_SPECS if specs is None else specs
+    return {
+        'columns': [spec['column'] for spec in specs],
+        'scale': np.array([100.0 if spec['percent'] else 1.0 for spec in specs]),
+        'fill_value': np.array([spec['fill_value'] for spec in specs]),
+        'clip_upper': np.array([spec['clip_upper'] for spec in specs]),
+    }
+
+
+def normalize_matrix(values, compiled):
+    """Apply percent scaling, NaN filling and clipping to a raw metric matrix"""
+    import numpy as np
+
+    values = np.asarray(values, dtype=float) / compiled['scale']
+    values = np.where(np.isnan(values), compiled['fill_value'], values)
+    return np.minimum(values, compiled['clip_upper'])
+
+
+def parse_metric_values(frame, specs=None):
+    """Parse the raw sheet cells of every metric into one float matrix (NaN if not numeric)"""
+    import numpy as np
+    import pandas as pd
+
+    compiled = compile_specs(specs)
+    present = [column for column in compiled['columns'] if column in frame.columns]
+    values = np.full((len(frame), len(compiled['columns'])), np.nan)
+    if present and len(frame):
+        # Strip '%' and convert the whole block with a single to_numeric call
+        cells = pd.Series(frame[present].astype(str).to_numpy(dtype=object).ravel())
+        parsed = pd.to_numeric(cells.str.replace('%', '', regex=False), errors='coerce').to_numpy(dtype=float)
+        positions = [compiled['columns'].index(column) for column in present]
+        values[:, positions] = parsed.reshape(len(frame), len(present))
+    return values
+
+
+def normalize_metrics(frame, specs=None):
+    """Return the normalised metric matrix (rows of frame x specs) in one vectorized pass"""
+    return normalize_matrix(parse_metric_values(frame, specs), compile_specs(specs))
@@ -0,0 +1,124 @@
+"""Pareto frontier and dominance depth of the leaderboard over all metrics.
+
+process_data orders systems by Org. and then Doc. Imp. only. A system
+dominates another when it scores at least as high on every metric and
+higher on at least one; the frontier (layer 1) holds the systems no other
+system dominates, layer 2 those dominated only by layer 1, and so on.
+
+Layers use efficient non-dominated sorting with binary search: rows are
+sorted lexicographically (best first), so a row can only be dominated by
+rows placed before it, and the layers it is dominated by form a prefix of
+the layer list. Each row is therefore checked against O(log layers)
+layers instead of against every other row; the binary searches of a batch
+of rows run in lockstep, so each step is one vectorized comparison per
+layer. Pairwise dominance counts are inherently quadratic and
+are computed in bounded blocks of rows.
+"""
+import numpy as np
+
+# Rows placed per batch by dominance_layers
+BATCH = 256
+# Upper bound on the cells of one layer comparison
+LAYER_CELLS = 1 << 22
+# Rows compared against all others per block of dominance_counts
+COUNT_BLOCK = 1024
+# Largest leaderboard whose page shows pairwise dominance counts (quadratic in the number of systems)
+DOMINANCE_COUNT_LIMIT = 5000
+
+
+class _Layer:
+    """Rows of one layer, stored column by column in a buffer grown by doubling"""
+
+    def __init__(self, n_columns):
+        self.columns = np.empty((n_columns, 16))
+        self.size = 0
+
+    def extend(self, rows):
+        while self.size + len(rows) > self.columns.shape[1]:
+            self.columns = np.concatenate([self.columns, np.empty_like(self.columns)], axis=1)
+        self.columns[:, self.size:self.size + len(rows)] = rows.T
+        self.size += len(rows)
+
+    def dominates(self, rows):
+        """Whether each of rows is dominated by a row of the layer (rows distinct from the layer's)"""
+        dominated = np.zeros(len(rows), dtype=bool)
+        columns = self.columns[:, :self.size]
+        step = max(1, LAYER_CELLS // max(self.size, 1))
+        for start in range(0, len(rows), step):
+            block = rows[start:start + step]
+            # at_least[i, j]: layer row j >= block row i on every metric
+            at_least = columns[0][np.newaxis] >= block[:, 0, np.newaxis]
+            for column in range(1, len(columns)):
+                at_least &= columns[column][np.newaxis] >= block[:, column, np.newaxis]
+            dominated[start:start + step] = at_least.any(axis=1)
+        return dominated
+
+
+def dominance_layers(values, batch=BATCH):
+    """1-based Pareto layer of every row of a (rows x metrics) matrix, higher being better (1 = frontier)
+
+    Equal rows do not dominate each other and share a layer.
+    """
+    values = np.asarray(values, dtype=float)
+    if not len(values):
+        return np.zeros(0, dtype=np.int64)
+    unique, inverse = np.unique(values, axis=0, return_inverse=True)
+    n_rows, n_columns = unique.shape
+    # Lexicographically descending: no row can dominate a row placed before it
+    order = np.lexsort(tuple(-unique[:, column] for column in reversed(range(n_columns))))
+    ordered = unique[order]
+    layers = []
+    result = np.empty(n_rows, dtype=np.int64)
+    for start in range(0, n_rows, batch):
+        rows = ordered[start:start + batch]
+        # Binary search, in lockstep for the whole batch, for the first earlier layer not dominating each row
+        low = np.zeros(len(rows), dtype=np.int64)
+        high = np.full(len(rows), len(layers), dtype=np.int64)
+        while (low < high).any():
+            active = low < high
+            middle = (low + high) // 2
+            dominated = np.zeros(len(rows), dtype=bool)
+            for layer in np.unique(middle[active]):
+                selected = active & (middle == layer)
+                dominated[selected] = layers[layer].dominates(rows[selected])
+            low = np.where(active & dominated, middle + 1, low)
+            high = np.where(active & ~dominated, middle, high)
+
+        # Rows of the batch dominated by earlier rows of the same batch: one layer below their worst dominator
+        inside = (rows[:, np.newaxis] >= rows[np.newaxis]).all(axis=2)
+        np.fill_diagonal(inside, False)
+        batch_layers = low
+        for j in np.flatnonzero(inside.any(axis=0)):
+            batch_layers[j] = max(batch_layers[j], batch_layers[:j][inside[:j, j]].max() + 1)
+
+        for layer in np.unique(batch_layers):
+            if layer == len(layers):
+                layers.append(_Layer(n_columns))
+            layers[layer].extend(rows[batch_layers == layer])
+        result[order[start:start + batch]] = batch_layers + 1
+    return result[inverse.ravel()]
+
+
+def pareto_frontier(values):
+    """Row indices of the non-dominated rows"""
+    return np.flatnonzero(dominance_layers(values) == 1)
+
+
+def dominance_counts(values, block=COUNT_BLOCK):
+    """(how many rows each row dominates, how many rows dominate it)"""
+    values = np.asarray(values, dtype=float)
+    n_rows, n_columns = values.shape
+    dominates = np.zeros(n_rows, dtype=np.int64)
+    dominated_by = np.zeros(n_rows, dtype=np.int64)
+    for start in range(0, n_rows, block):
+        rows = values[start:start + block]
+        # at_least[i, j]: row start+i >= row j on every metric; better[i, j]: > on some metric
+        at_least = np.ones((len(rows), n_rows), dtype=bool)
+        better = np.zeros((len(rows), n_rows), dtype=bool)
+        for column in range(n_columns):
+            at_least &= rows[:, column, np.newaxis] >= values[np.newaxis, :, column]
+            better |= rows[:, column, np.newaxis] > values[np.newaxis, :, column]
+        dominance = at_least & better
+        dominates[start:start + block] = dominance.sum(axis=1)
+        dominated_by += dominance.sum(axis=0)
+    return dominates, dominated_by
@@ -0,0 +1,128 @@
+"""Composite rankings of the leaderboard under named metric weightings.
+
+Every profile of metrics.RANKING_PROFILES is a weight vector over the
+metrics; stacking them gives a (profiles x metrics) matrix, so the
+composite scores of all profiles are one matrix product with the
+(systems x metrics) scores. Dense ranks and percentiles are then computed
+for all composite and metric columns at once from a single column-wise
+sort. The page embeds the result and re-orders the table by a profile
+without recomputing anything in JavaScript.
+"""
+import json
+
+import numpy as np
+
+from metrics import RANKING_PROFILES, get_spec
+
+
+def profile_weights(metric_columns, profiles=None):
+    """(profiles x metrics) weight matrix, each row normalised to sum to 1"""
+    profiles = RANKING_PROFILES if profiles is None else profiles
+    keys = []
+    for metric in metric_columns:
+        try:
+            keys.append(get_spec(metric)['key'])
+        except KeyError:
+            keys.append(None)  # not a registry metric: weighs 0 in every profile
+    weights = np.array([[profile['weights'].get(key, 0.0) if key else 0.0 for key in keys] for profile in profiles],
+                       dtype=float).reshape(len(profiles), len(keys))
+    totals = weights.sum(axis=1, keepdims=True)
+    return np.divide(weights, totals, out=np.zeros_like(weights), where=totals > 0)
+
+
+def dense_ranks(values):
+    """(dense ranks, percentiles) of every column of a (rows x columns) matrix, higher being better.
+
+    Dense rank 1 is the best score and equal scores share a rank; the
+    percentile is the share of rows scoring at most as high, in percent.
+    """
+    values = np.asarray(values, dtype=float)
+    n_rows = len(values)
+    ranks = np.zeros(values.shape, dtype=np.int64)
+    percentiles = np.zeros(values.shape)
+    if not n_rows:
+        return ranks, percentiles
+    order = np.argsort(values, axis=0, kind='stable')
+    ordered = np.take_along_axis(values, order, axis=0)
+    starts = np.ones(values.shape, dtype=bool)
+    starts[1:] = ordered[1:] != ordered[:-1]
+    groups = np.cumsum(starts, axis=0)  # ascending dense ids, 1-based
+    # Rows scoring at most as high: one past the last position of the row's group
+    ends = np.ones(values.shape, dtype=bool)
+    ends[:-1] = starts[1:]
+    positions = np.where(ends, np.arange(1, n_rows + 1)[:, np.newaxis], n_rows + 1)
+    at_most = np.minimum.accumulate(positions[::-1], axis=0)[::-1]
+    np.put_along_axis(ranks, order, groups[-1] - groups + 1, axis=0)
+    np.put_along_axis(percentiles, order, at_most * 100.0 / n_rows, axis=0)
+    return ranks, percentiles
+
+
+def rank_profiles(scores, metric_columns, profiles=None):
+    """Composite scores, dense ranks and percentiles of every profile, plus per-metric ranks and percentiles.
+
+    scores: (systems x metrics) normalised leaderboard scores.
+    """
+    profiles = RANKING_PROFILES if profiles is None else profiles
+    scores = np.asarray(scores, dtype=float).reshape(-1, len(metric_columns))
+    composites = scores @ profile_weights(metric_columns, profiles).T  # (systems x profiles)
+    ranks, percentiles = dense_ranks(np.hstack([composites, scores]))
+    n_profiles = len(profiles)
+    return {
+        'profiles': [{
+            'key': profile['key'],
+            'label': profile['label'],
+            'composite': composites[:, p],
+            'rank': ranks[:, p],
+            'percentile': percentiles[:, p],
+        } for p, profile in enumerate(profiles)],
+        'metric_rank': ranks[:, n_profiles:],
+        'metric_percentile': percentiles[:, n_profiles:],
+    }
+
+
+def rankings_json(rankings):
+    """Compact JSON of the profile rankings, indexed by table row"""
+    return json.dumps({profile['key']: {
+        'label': profile['label'],
+        'composite': np.round(profile['composite'], 4).tolist(),
+        'rank': profile['rank'].tolist(),
+        'percentile': np.round(profile['percentile'], 1).tolist(),
+    } for profile in rankings['profiles']})
+
+
+def render_profile_selector(rankings):
+    """HTML ranking-profile selector and the script re-ordering the table by the embedded rankings"""
+    options = ''.join(f'<option value="{profile["key"]}">{profile["label"]}</option>'
+                      for profile in rankings['profiles'])
+    return f"""
+    <div class="ranking-profiles" style="margin: 20px 30px 0; display: flex; align-items: center; gap: 10px;">
+        <label for="rankingProfile" style="font-weight: 600; color: #1e3c72;">🏆 Rank by:</label>
+        <select id="rankingProfile" onchange="applyRankingProfile(this.value)" style="padding: 4px 8px;">
+            <option value="">Organization, then Document Importance</option>{options}
+        </select>
+    </div>
+    <script>
+        const RANKINGS = {rankings_json(rankings)};
+        function applyRankingProfile(key) {{
+            const tbody = document.getElementById('leaderboard').getElementsByTagName('tbody')[0];
+            const rows = Array.from(tbody.getElementsByTagName('tr'));
+            const profile = RANKINGS[key];
+            const position = (row) => Number(row.dataset.row);
+            rows.sort((a, b) => profile
+                ? profile.rank[position(a)] - profile.rank[position(b)] || position(a) - position(b)
+                : position(a) - position(b));
+            rows.forEach((row) => {{
+                const badge = row.querySelector('.profile-rank');
+                if (profile) {{
+                    const i = position(row);
+                    badge.textContent = `#${{profile.rank[i]}} · ${{profile.composite[i].toFixed(3)}} · ${{Math.round(profile.percentile[i])}}th percentile`;
+                    badge.style.display = 'inline';
+                }} else {{
+                    badge.style.display = 'none';
+                }}
+                tbody.appendChild(row);
+            }});
+            applyMetricColorCodingToVisibleRows();
+        }}
+    </script>
+"""
@@ -0,0 +1,194 @@
+"""Aggregate per-query evaluation results into leaderboard rows.
+
+Each system's results are a JSON-lines file (one file per system, e.g.
+results/<system>.jsonl), one record per evaluated query:
+
+    {"query_id": "2508.01234", "system": "My System (o3)", "lm": "o3", "system_type": "Open",
+     "organization": 50, "nugget_coverage": 0.41, "citation_precision": "62.5%", ...}
+
+Metrics are named by their registry key (metrics.py) or sheet column, and
+may also be nested under "metrics". Values use the same units as the
+sheet: the percent metrics are percentages (a trailing '%' is allowed).
+Files are streamed in bounded chunks of records into running sums and
+counts, so memory does not grow with the number of queries. A system's
+metric is the mean over the queries that report a numeric value, except
+for the metrics with a query_fill (Cite-P and Claim Cov., "0 for nans" in
+the sheet), where a query without one counts as that value. A metric with
+no numeric value stays NaN, which process_data turns into 0 like an empty
+sheet cell. A query_id may appear only once per file (the score cube holds
+one value per system and query); a repeated one is an error.
+"""
+import glob
+import json
+import math
+import os
+
+import numpy as np
+
+from metrics import METRIC_COLUMNS, METRIC_SPECS
+
+DEFAULT_CHUNK_SIZE = 10000
+
+# Record fields holding the system identity rather than a metric
+IDENTITY_FIELDS = {'system': 'System Name', 'lm': 'lm', 'system_type': 'open/close'}
+
+
+def metric_value(value):
+    """Float of a per-query metric value (numbers, numeric strings, 'x%'); NaN if missing or not numeric"""
+    if value is None or isinstance(value, bool):
+        return math.nan
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(str(value).strip().replace('%', ''))
+    except ValueError:
+        return math.nan
+
+
+# Metric position of every name a record may use: registry key, sheet column or display name
+_FIELD_POSITIONS = {name: i for i, spec in enumerate(METRIC_SPECS)
+                    for name in (spec['key'], spec['column'], spec['display'])}
+# Per-query value of a missing or non-numeric metric (NaN: skipped in the means)
+_QUERY_FILL = np.array([math.nan if spec['query_fill'] is None else spec['query_fill'] for spec in METRIC_SPECS])
+
+
+class MetricAccumulator:
+    """Running per-metric sums and counts of numeric values (NaN values are skipped)"""
+
+    def __init__(self, n_metrics=len(METRIC_SPECS)):
+        self.sums = np.zeros(n_metrics)
+        self.counts = np.zeros(n_metrics, dtype=np.int64)
+        self.records = 0
+
+    def update(self, values):
+        """Add a (records x metrics) block of values"""
+        values = np.asarray(values, dtype=float)
+        valid = ~np.isnan(values)
+        self.sums += np.where(valid, values, 0.0).sum(axis=0)
+        self.counts += valid.sum(axis=0)
+        self.records += len(values)
+
+    def remove(self, values):
+        """Subtract a block previously added with update"""
+        values = np.asarray(values, dtype=float)
+        valid = ~np.isnan(values)
+        self.sums -= np.where(valid, values, 0.0).sum(axis=0)
+        self.counts -= valid.sum(axis=0)
+        self.records -= len(values)
+
+    def means(self):
+        """Per-metric means (NaN where no value was seen)"""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(self.counts > 0, self.sums / np.maximum(self.counts, 1), np.nan)
+
+
+def spreadsheet_precision(values):
+    """Floats kept to 12 significant digits, like a spreadsheet cell
+
+    pandas' number parser reads such values back exactly (not always so with
+    15 digits), so both engines process them identically.
+    """
+    return [float(f"{value:.12g}") for value in values]
+
+
+def iter_record_chunks(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield lists of at most chunk_size parsed records from a JSON-lines file (blank lines skipped)"""
+    chunk = []
+    with open(path, encoding='utf-8') as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                chunk.append(json.loads(line))
+            except ValueError as e:
+                raise ValueError(f"{path}:{line_number}: invalid JSON record: {e}") from None
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+    if chunk:
+        yield chunk
+
+
+def check_query_ids(records, seen, path):
+    """Raise ValueError on a query_id already in seen (the ids of the file so far); adds the new ones"""
+    for record in records:
+        if record.get('query_id') is None:
+            continue
+        query_id = str(record['query_id'])
+        if query_id in seen:
+            raise ValueError(f"{path}: duplicate query_id {query_id!r}: a system is scored once per query")
+        seen.add(query_id)
+
+
+def records_matrix(records):
+    """(records x metrics) float matrix of a chunk of records, query_fill applied; NaN = skipped"""
+    values = np.full((len(records), len(METRIC_COLUMNS)), np.nan)
+    for i, record in enumerate(records):
+        nested = record.get('metrics') or {}
+        for fields in (record, nested):
+            for name, value in fields.items():
+                position = _FIELD_POSITIONS.get(name)
+                if position is not None:
+                    values[i, position] = metric_value(value)
+    return np.where(np.isnan(values), _QUERY_FILL, values)
+
+
+def aggregate_results_file(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """One sheet-layout row (System Name, lm, open/close, metric means, queries) for a system's results"""
+    accumulator = MetricAccumulator()
+    identity = {'System Name': None, 'lm': None, 'open/close': None}
+    seen = set()
+    for chunk in iter_record_chunks(path, chunk_size):
+        check_query_ids(chunk, seen, path)
+        accumulator.update(records_matrix(chunk))
+        for field, column in IDENTITY_FIELDS.items():
+            if identity[column] is None:
+                identity[column] = next((record[field] for record in chunk if record.get(field)), None)
+
+    if identity['System Name'] is None:
+        identity['System Name'] = os.path.splitext(os.path.basename(path))[0]
+    row = dict(identity)
+    row.update(zip(METRIC_COLUMNS, spreadsheet_precision(accumulator.means().tolist())))
+    row['queries'] = accumulator.records
+    return row
+
+
+def aggregate_results_dir(directory, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Rows for every *.jsonl file in a results directory, in file name order"""
+    return [aggregate_results_file(path, chunk_size)
+            for path in sorted(glob.glob(os.path.join(directory, '*.jsonl')))]
+
+
+def _identity_key(name, lm):
+    return str(name).strip(), '' if lm is None or (isinstance(lm, float) and math.isnan(lm)) else str(lm).strip()
+
+
+def merge_results(df, rows):
+    """Sheet DataFrame with the aggregated rows merged in (replacing rows with the same System Name and lm)"""
+    import pandas as pd
+
+    if not rows:
+        return df
+    results = pd.DataFrame([{column: row[column] for column in ['System Name', 'lm', 'open/close'] + METRIC_COLUMNS}
+                            for row in rows])
+    replaced = {_identity_key(row['System Name'], row['lm']) for row in rows}
+    keep = [_identity_key(name, lm) not in replaced for name, lm in zip(df.iloc[:, 0], df['lm'])]
+    return pd.concat([df[keep], results], ignore_index=True)
+
+
+def merge_result_rows(columns, data, rows):
+    """Fast-engine version of merge_results on (columns, text rows) from fast_engine.load_rows"""
+    if not rows:
+        return data
+    positions = {column: columns.index(column) for column in ['System Name', 'lm', 'open/close'] + METRIC_COLUMNS}
+    replaced = {_identity_key(row['System Name'], row['lm']) for row in rows}
+    merged = [row for row in data if _identity_key(row[0], row[positions['lm']]) not in replaced]
+    for row in rows:
+        cells = [''] * len(columns)
+        for column, position in positions.items():
+            value = row[column]
+            if value is None or (isinstance(value, float) and math.isnan(value)):
+                continue
+            cells[position] = repr(value) if isinstance(value, float) else str(value)
+        merged.append(cells)
+    return merged
@@ -0,0 +1,333 @@
+"""Incremental rolling-window leaderboard over streaming per-query results.
+
+Keeps running per-system, per-metric sums and counts, so new records cost
+O(records) to fold in and records leaving the time window cost O(records)
+to take out, instead of re-aggregating every result. The rows stay in
+process_data order (Org. then Doc. Imp., both descending, ties in order of
+first appearance): a system whose scores change is moved with a binary
+search in the sorted key list rather than re-sorting the table.
+
+ResultsTailer reads only the lines appended to the result files since the
+previous poll, which makes `create_leaderboard.py rolling` a live view of
+a results directory that evaluation jobs keep appending to. A file that is
+truncated, rewritten, replaced or deleted is reported as reset: the board
+takes out everything that file added (it keeps per-file sums for this)
+before its records are read again from the start.
+"""
+import bisect
+import glob
+import heapq
+import json
+import os
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from metrics import METRIC_DISPLAY_NAMES, METRIC_SPECS, compile_specs, normalize_matrix
+from results_ingest import IDENTITY_FIELDS, records_matrix, spreadsheet_precision
+
+# Record fields carrying the time a result was produced, in order of preference
+TIMESTAMP_FIELDS = ('timestamp', 'date')
+
+_ORG = [spec['key'] for spec in METRIC_SPECS].index('organization')
+_DOC = [spec['key'] for spec in METRIC_SPECS].index('document_importance')
+
+
+def record_time(record, default):
+    """UTC datetime of a record (its timestamp/date field, else default)"""
+    value = next((record[field] for field in TIMESTAMP_FIELDS if record.get(field)), None)
+    if value is None:
+        return default
+    try:
+        value = datetime.fromisoformat(str(value))
+    except ValueError:
+        return default
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+class RollingLeaderboard:
+    """Running sums/counts per system and metric, with optional sliding-window expiry"""
+
+    def __init__(self, window=None, specs=None):
+        self.window = window  # timedelta, or None to keep everything
+        self.specs = METRIC_SPECS if specs is None else specs
+        self._compiled = compile_specs(self.specs)
+        n_metrics = len(self.specs)
+        self.systems = []  # identities, in order of first appearance
+        self._index = {}  # (System Name, lm) -> system position
+        self.sums = np.zeros((0, n_metrics))
+        self.counts = np.zeros((0, n_metrics), dtype=np.int64)
+        self.values = np.zeros((0, n_metrics))  # normalised means, as in process_data
+        self._keys = {}  # system position -> its sort key, for systems currently on the board
+        self._order = []  # sorted sort keys
+        self._window_heap = []  # (timestamp, sequence, system position, values, source, generation) in the window
+        self._sequence = 0
+        self._sources = {}  # source -> {system position: [sums, counts, records]} of its records on the board
+        self._generations = {}  # source -> generation; window entries of older generations were already removed
+
+    def _system(self, identity):
+        """Position of a system, adding it (and growing the arrays) on first sight"""
+        key = (identity['System Name'], identity['lm'] or '')
+        position = self._index.get(key)
+        if position is None:
+            position = self._index[key] = len(self.systems)
+            self.systems.append(dict(identity))
+            if position >= len(self.sums):
+                grow = max(16, len(self.sums))
+                self.sums = np.vstack([self.sums, np.zeros((grow, self.sums.shape[1]))])
+                self.counts = np.vstack([self.counts, np.zeros((grow, self.counts.shape[1]), dtype=np.int64)])
+                self.values = np.vstack([self.values, np.zeros((grow, self.values.shape[1]))])
+        return position
+
+    def _refresh(self, position):
+        """Recompute one system's normalised means and move it to its place in the order"""
+        counts = self.counts[position]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = np.where(counts > 0, self.sums[position] / np.maximum(counts, 1), np.nan)
+        means = np.array(spreadsheet_precision(means.tolist()))
+        self.values[position] = normalize_matrix(means[np.newaxis, :], self._compiled)[0]
+
+        old_key = self._keys.pop(position, None)
+        if old_key is not None:
+            del self._order[bisect.bisect_left(self._order, old_key)]
+        if counts.any():
+            key = (-self.values[position, _ORG], -self.values[position, _DOC], position)
+            bisect.insort(self._order, key)
+            self._keys[position] = key
+
+    def add(self, identity, values, timestamps=None, now=None, source=None):
+        """Fold in a (records x metrics) block of raw values of one system; returns the records kept
+
+        Records already older than the window are skipped; records without a
+        timestamp count as produced now. Records added with a source (e.g. their
+        file) can be taken out again with remove_source.
+        """
+        now = now or datetime.now(timezone.utc)
+        values = np.atleast_2d(np.asarray(values, dtype=float))
+        timestamps = [ts or now for ts in timestamps] if timestamps is not None else [now] * len(values)
+        if self.window is not None:
+            cutoff = now - self.window
+            keep = [i for i, ts in enumerate(timestamps) if ts >= cutoff]
+            values = values[keep]
+            timestamps = [timestamps[i] for i in keep]
+        if not len(values):
+            return 0
+
+        position = self._system(identity)
+        valid = ~np.isnan(values)
+        sums = np.where(valid, values, 0.0).sum(axis=0)
+        counts = valid.sum(axis=0)
+        self.sums[position] += sums
+        self.counts[position] += counts
+        if source is not None:
+            contribution = self._sources.setdefault(source, {}).setdefault(
+                position, [np.zeros(len(sums)), np.zeros(len(counts), dtype=np.int64), 0])
+            contribution[0] += sums
+            contribution[1] += counts
+            contribution[2] += len(values)
+        if self.window is not None:
+            generation = self._generations.get(source, 0)
+            for ts, row in zip(timestamps, values):
+                self._sequence += 1
+                heapq.heappush(self._window_heap, (ts, self._sequence, position, row, source, generation))
+        self._refresh(position)
+        return len(values)
+
+    def remove_source(self, source):
+        """Take out every record still on the board that was added with this source; returns how many"""
+        contributions = self._sources.pop(source, {})
+        # Its entries still in the window heap are skipped when they expire
+        self._generations[source] = self._generations.get(source, 0) + 1
+        removed = 0
+        for position, (sums, counts, records) in contributions.items():
+            self.sums[position] -= sums
+            self.counts[position] -= counts
+            removed += records
+            if not self.counts[position].any():
+                self.sums[position] = 0.0
+            self._refresh(position)
+        return removed
+
+    def add_records(self, records, default_identity=None, now=None, source=None):
+        """Fold in parsed per-query records (results_ingest format), grouped by system"""
+        now = now or datetime.now(timezone.utc)
+        matrix = records_matrix(records)
+        groups = {}
+        for i, record in enumerate(records):
+            identity = dict(default_identity or {'System Name': None, 'lm': None, 'open/close': None})
+            for field, column in IDENTITY_FIELDS.items():
+                if record.get(field):
+                    identity[column] = record[field]
+            key = (identity['System Name'], identity['lm'] or '')
+            group = groups.setdefault(key, (identity, [], []))
+            group[1].append(i)
+            group[2].append(record_time(record, now))
+        return sum(self.add(identity, matrix[rows], timestamps, now, source)
+                   for identity, rows, timestamps in groups.values())
+
+    def expire(self, now=None):
+        """Take out the records that left the window; returns how many"""
+        if self.window is None:
+            return 0
+        cutoff = (now or datetime.now(timezone.utc)) - self.window
+        touched = set()
+        expired = 0
+        while self._window_heap and self._window_heap[0][0] < cutoff:
+            _, _, position, row, source, generation = heapq.heappop(self._window_heap)
+            if generation != self._generations.get(source, 0):
+                continue  # taken out with its source already
+            valid = ~np.isnan(row)
+            values = np.where(valid, row, 0.0)
+            self.sums[position] -= values
+            self.counts[position] -= valid
+            contribution = self._sources.get(source, {}).get(position) if source is not None else None
+            if contribution is not None:
+                contribution[0] -= values
+                contribution[1] -= valid
+                contribution[2] -= 1
+            touched.add(position)
+            expired += 1
+        for position in touched:
+            if not self.counts[position].any():
+                # Nothing left in the window: drop float residue from the running sums
+                self.sums[position] = 0.0
+            self._refresh(position)
+        return expired
+
+    def leaderboard(self):
+        """(records, metric columns) in process_data order, as accepted by create_html_leaderboard"""
+        metric_columns = [METRIC_DISPLAY_NAMES.get(spec['column'], spec['display']) for spec in self.specs]
+        records = []
+        for _, _, position in self._order:
+            system = self.systems[position]
+            record = {
+                'System Name': system['System Name'],
+                'lm': system['lm'] or '',
+                'System Type': system['open/close'] or '',
+            }
+            record.update(zip(metric_columns, self.values[position].tolist()))
+            records.append(record)
+        return records, metric_columns
+
+
+class ResultsTailer:
+    """Reads the complete lines appended to a directory of *.jsonl result files since the last poll"""
+
+    # Bytes before the read offset compared on every poll to detect a file rewritten in place
+    TAIL_BYTES = 256
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.offsets = {}
+        self._files = {}  # path -> (device, inode, bytes just before the offset)
+        self.invalid = []  # 'path@offset: error' of the lines skipped by the last poll
+
+    def _reset(self, path, stat):
+        """Whether the file at path is no longer the one read up to its offset"""
+        known = self._files.get(path)
+        offset = self.offsets.get(path, 0)
+        if known is None or not offset:
+            return False
+        device, inode, tail = known
+        if (stat.st_dev, stat.st_ino) != (device, inode) or stat.st_size < offset:
+            return True
+        with open(path, 'rb') as f:
+            f.seek(offset - len(tail))
+            return f.read(len(tail)) != tail
+
+    def poll(self):
+        """[(file path, [records], reset)] of the new records in each file
+
+        reset: the file was truncated, rewritten, replaced or deleted since
+        the previous poll, so the records it added before are void and
+        [records] are read from its start. Malformed lines are skipped and
+        listed in self.invalid.
+        """
+        batches = []
+        self.invalid = []
+        paths = sorted(glob.glob(os.path.join(self.directory, '*.jsonl')))
+        for path in sorted(set(self.offsets) - set(paths)):
+            del self.offsets[path], self._files[path]
+            batches.append((path, [], True))
+        for path in paths:
+            try:
+                stat = os.stat(path)
+                reset = self._reset(path, stat)
+                offset = 0 if reset else self.offsets.get(path, 0)
+                with open(path, 'rb') as f:
+                    f.seek(offset)
+                    data = f.read()
+            except FileNotFoundError:
+                continue  # removed since the directory listing: reported on the next poll
+            # Stop at the last newline; a partially written line is read on the next poll
+            end = data.rfind(b'\n') + 1
+            self.offsets[path] = offset + end
+            tail = (data[max(0, end - self.TAIL_BYTES):end] if end >= self.TAIL_BYTES or not offset
+                    else self._files[path][2][-(self.TAIL_BYTES - end):] + data[:end])
+            self._files[path] = (stat.st_dev, stat.st_ino, tail)
+            records = []
+            position = offset
+            for line in data[:end].splitlines(keepends=True):
+                if line.strip():
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError as e:
+                        self.invalid.append(f"{path}@{position}: invalid JSON record: {e}")
+                position += len(line)
+            if records or reset:
+                batches.append((path, records, reset))
+        return batches
+
+
+def file_identity(path):
+    """Default identity of records in a result file: the file name as the system name"""
+    return {'System Name': os.path.splitext(os.path.basename(path))[0], 'lm': None, 'open/close': None}
+
+
+def parse_window(days):
+    """timedelta of a window given in days (None for no window)"""
+    return None if days is None else timedelta(days=days)
+
+
+def write_leaderboard(board, output_dir):
+    """Write the rolling leaderboard CSV and HTML (atomically); returns the HTML path"""
+    from create_leaderboard import write_html
+    from fast_engine import write_csv
+
+    records, metric_columns = board.leaderboard()
+    write_csv(records, metric_columns, os.path.join(output_dir, 'leaderboard_data.csv'))
+    return write_html(records, metric_columns, output_dir)
+
+
+def follow(args):
+    """Poll the results directory, fold in new records, expire old ones and refresh the board on change"""
+    import time
+
+    board = RollingLeaderboard(parse_window(args.window_days))
+    tailer = ResultsTailer(args.results)
+    output_dir = os.path.join(args.output_dir, 'rolling')
+    window = f"{args.window_days}-day window" if args.window_days else "no window"
+    print(f"📡 Following {args.results} every {args.interval}s ({window}) -> {output_dir}")
+
+    polls = 0
+    try:
+        while args.max_polls is None or polls < args.max_polls:
+            polls += 1
+            start = time.perf_counter()
+            added = removed = 0
+            for path, records, reset in tailer.poll():
+                if reset:
+                    removed += board.remove_source(path)
+                added += board.add_records(records, file_identity(path), source=path)
+            for message in tailer.invalid:
+                print(f"⚠️ Skipped {message}")
+            expired = board.expire() + removed
+            if added or expired or polls == 1:
+                write_leaderboard(board, output_dir)
+                print(f"🔄 +{added} / -{expired} records, {len(board.leaderboard()[0])} systems "
+                      f"({time.perf_counter() - start:.3f}s)")
+            if args.max_polls is None or polls < args.max_polls:
+                time.sleep(args.interval)
+    except KeyboardInterrupt:
+        print("\n👋 Stopped following")
+    return polls
@@ -0,0 +1,193 @@
+"""Memory-mapped systems x queries x metrics score cube for sliced leaderboards.
+
+The cube is built once from the per-query result files (see results_ingest)
+and stored as a .npy file that is memory-mapped on load, next to the system
+and query metadata:
+
+    <cube dir>/scores.npy    float64 (systems, queries, metrics), NaN = no value
+                             (after the query_fill of results_ingest.records_matrix)
+    <cube dir>/systems.json  [{"System Name", "lm", "open/close"}]
+    <cube dir>/queries.json  [{"query_id", "category", "date"}]
+
+A slice ("cs.CL only", "last 30 days", ...) is a boolean mask over the
+query axis; its leaderboard is the masked mean per system and metric,
+computed in bounded blocks of systems, without reading the raw results.
+"""
+import json
+import os
+from datetime import date, datetime, timedelta, timezone
+
+import numpy as np
+
+from atomic_io import atomic_open
+from metrics import METRIC_COLUMNS, METRIC_SPECS, compile_specs, normalize_matrix
+from results_ingest import (DEFAULT_CHUNK_SIZE, IDENTITY_FIELDS, check_query_ids, iter_record_chunks, records_matrix,
+                            spreadsheet_precision)
+
+DEFAULT_CUBE_DIR = os.path.join('.cache', 'score_cube')
+
+# Record fields carrying query metadata, in order of preference
+CATEGORY_FIELDS = ('arxiv_category', 'category', 'categories')
+DATE_FIELDS = ('date', 'published')
+
+# Systems per block when computing masked means (bounds the memory of a slice)
+SYSTEM_BLOCK = 256
+
+# Positions of the leaderboard sort keys (process_data: Org. then Doc. Imp.)
+ORG_POSITION = [spec['key'] for spec in METRIC_SPECS].index('organization')
+DOC_POSITION = [spec['key'] for spec in METRIC_SPECS].index('document_importance')
+
+
+def _first(record, fields):
+    return next((record[field] for field in fields if record.get(field)), None)
+
+
+def _query_id(record, path):
+    if record.get('query_id') is None:
+        raise ValueError(f"{path}: record without a query_id: cannot align it across systems")
+    return str(record['query_id'])
+
+
+def build_cube(result_files, cube_dir=DEFAULT_CUBE_DIR, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Build the cube from per-system result files in two streaming passes; returns the cube directory
+
+    The first pass collects system identities and query ids/metadata (and
+    rejects a query_id repeated within a file, like results_ingest), the
+    second writes each chunk of scores straight into the memory-mapped array.
+    """
+    systems = []
+    queries = {}
+    for path in result_files:
+        identity = {'System Name': None, 'lm': None, 'open/close': None}
+        seen = set()
+        for chunk in iter_record_chunks(path, chunk_size):
+            check_query_ids(chunk, seen, path)
+            for record in chunk:
+                query = queries.setdefault(_query_id(record, path), {'category': None, 'date': None})
+                query['category'] = query['category'] or _first(record, CATEGORY_FIELDS)
+                query['date'] = query['date'] or _first(record, DATE_FIELDS)
+                for field, column in IDENTITY_FIELDS.items():
+                    if identity[column] is None and record.get(field):
+                        identity[column] = record[field]
+        if identity['System Name'] is None:
+            identity['System Name'] = os.path.splitext(os.path.basename(path))[0]
+        systems.append(identity)
+
+    query_ids = list(queries)
+    query_index = {query_id: i for i, query_id in enumerate(query_ids)}
+    os.makedirs(cube_dir, exist_ok=True)
+    scores_file = os.path.join(cube_dir, 'scores.npy')
+    tmp_file = scores_file + '.tmp.npy'
+    scores = np.lib.format.open_memmap(tmp_file, mode='w+', dtype=np.float64,
+                                       shape=(len(systems), len(query_ids), len(METRIC_COLUMNS)))
+    scores[:] = np.nan
+    for s, path in enumerate(result_files):
+        for chunk in iter_record_chunks(path, chunk_size):
+            rows = np.fromiter((query_index[_query_id(record, path)] for record in chunk), dtype=np.int64,
+                               count=len(chunk))
+            scores[s, rows] = records_matrix(chunk)
+    scores.flush()
+    del scores
+    os.replace(tmp_file, scores_file)
+
+    with atomic_open(os.path.join(cube_dir, 'systems.json'), 'w', encoding='utf-8') as f:
+        json.dump(systems, f)
+    with atomic_open(os.path.join(cube_dir, 'queries.json'), 'w', encoding='utf-8') as f:
+        json.dump([dict(query_id=query_id, **queries[query_id]) for query_id in query_ids], f)
+    return cube_dir
+
+
+class ScoreCube:
+    """A built cube, memory-mapped read-only"""
+
+    def __init__(self, cube_dir=DEFAULT_CUBE_DIR):
+        self.cube_dir = cube_dir
+        self.scores = np.load(os.path.join(cube_dir, 'scores.npy'), mmap_mode='r')
+        with open(os.path.join(cube_dir, 'systems.json'), encoding='utf-8') as f:
+            self.systems = json.load(f)
+        with open(os.path.join(cube_dir, 'queries.json'), encoding='utf-8') as f:
+            self.queries = json.load(f)
+        # Space/comma separated arXiv categories of each query, and publication dates
+        self.categories = [set(str(query['category'] or '').replace(',', ' ').split()) for query in self.queries]
+        self.dates = np.array([_parse_date(query['date']) for query in self.queries], dtype='datetime64[D]')
+
+    def query_mask(self, categories=None, since=None, until=None, last_days=None, today=None):
+        """Boolean mask over the queries of a slice.
+
+        categories: arXiv categories to keep ('cs.CL', or a prefix such as 'cs.*');
+        since/until: inclusive ISO dates; last_days: the trailing window ending today.
+        Queries without a date are excluded from date-bounded slices.
+        Raises ValueError for a since/until that is not an ISO date.
+        """
+        mask = np.ones(len(self.queries), dtype=bool)
+        if categories:
+            exact = {category for category in categories if not category.endswith('*')}
+            prefixes = tuple(category[:-1] for category in categories if category.endswith('*'))
+            mask &= np.fromiter((bool(tags & exact) or any(tag.startswith(prefixes) for tag in tags if prefixes)
+                                 for tags in self.categories), dtype=bool, count=len(self.queries))
+        since, until = parse_query_date(since), parse_query_date(until)
+        if last_days is not None:
+            today = today or datetime.now(timezone.utc).date()
+            since = max(filter(None, [since, today - timedelta(days=last_days - 1)]))
+        if since is not None:
+            mask &= self.dates >= np.datetime64(since, 'D')
+        if until is not None:
+            mask &= self.dates <= np.datetime64(until, 'D')
+        return mask
+
+    def masked_means(self, mask):
+        """(systems x metrics) mean over the queries in mask, skipping NaN; NaN where a system has no value"""
+        selected = np.flatnonzero(mask)
+        n_systems, _, n_metrics = self.scores.shape
+        sums = np.zeros((n_systems, n_metrics))
+        counts = np.zeros((n_systems, n_metrics), dtype=np.int64)
+        for start in range(0, n_systems, SYSTEM_BLOCK):
+            block = self.scores[start:start + SYSTEM_BLOCK][:, selected, :]
+            valid = ~np.isnan(block)
+            sums[start:start + SYSTEM_BLOCK] = np.where(valid, block, 0.0).sum(axis=1)
+            counts[start:start + SYSTEM_BLOCK] = valid.sum(axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(counts > 0, sums / np.maximum(counts, 1), np.nan), counts
+
+    def ranked_systems(self, mask):
+        """(system indices in slice leaderboard order, their normalised scores), as process_data ranks them"""
+        means, counts = self.masked_means(mask)
+        systems = np.flatnonzero(counts.any(axis=1))
+        point = np.array([spreadsheet_precision(row) for row in means[systems].tolist()]).reshape(len(systems), -1)
+        point = normalize_matrix(point, compile_specs())
+        order = np.lexsort((-point[:, DOC_POSITION], -point[:, ORG_POSITION]))
+        return systems[order], point[order]
+
+    def slice_frame(self, mask):
+        """Sheet-layout DataFrame of a slice (systems with no query in the slice are left out), ready for process_data"""
+        import pandas as pd
+
+        means, counts = self.masked_means(mask)
+        rows = []
+        for system, values, system_counts in zip(self.systems, means, counts):
+            if not system_counts.any():
+                continue
+            row = dict(system)
+            row.update(zip(METRIC_COLUMNS, spreadsheet_precision(values.tolist())))
+            rows.append(row)
+        return pd.DataFrame(rows, columns=['System Name', 'lm', 'open/close'] + METRIC_COLUMNS)
+
+
+def parse_query_date(value):
+    """date of a --since/--until ISO date (None if not given); raises ValueError if unparseable"""
+    if not value:
+        return None
+    parsed = _parse_date(value)
+    if parsed is None:
+        raise ValueError(f"invalid date {value!r} (expected an ISO date such as 2025-09-01)")
+    return parsed
+
+
+def _parse_date(value):
+    """date of an ISO date/datetime string (None if missing or unparseable)"""
+    if value is None or isinstance(value, date):
+        return value
+    try:
+        return datetime.fromisoformat(str(value)[:10]).date()
+    except ValueError:
+        return None
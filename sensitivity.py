@@ -0,0 +1,180 @@
+"""How fragile is the ranking? Sensitivity of the leaderboard to the metric weights.
+
+The reference ranking is the average of all metrics. It is recomputed
+under every leave-one-metric-out weighting and under random weight
+vectors drawn uniformly from the simplex. All weightings form one
+(variants x metrics) matrix, so the composite scores of a batch of
+variants are a single matrix product with the (systems x metrics) scores
+and their rankings a single argsort; batches bound the memory to
+MAX_RANK_CELLS ranks at a time. Tied systems share the best of their
+ranks, so the results do not depend on how the sort orders ties.
+
+Per system, ranks are accumulated into min/max/mean and a histogram over
+at most RANK_BINS rank bins (exact ranks for smaller leaderboards), from
+which the rank percentiles are read, interpolating within a bin. Stability is summarised by the
+Kendall tau between the reference and every variant over the top
+TAU_TOP systems of the reference.
+"""
+import json
+import os
+
+import numpy as np
+
+from atomic_io import atomic_open
+
+DEFAULT_SAMPLES = 2000
+TAU_TOP = 250
+RANK_BINS = 100
+
+# Upper bound on the (systems x variants) ranks of one batch
+MAX_RANK_CELLS = 1 << 24
+# Upper bound on the (variants x pairs) signs of one Kendall tau block
+MAX_TAU_CELLS = 1 << 24
+
+SENSITIVITY_JSON = 'leaderboard_sensitivity.json'
+
+
+def variant_weights(n_metrics, samples=DEFAULT_SAMPLES, seed=0):
+    """(variants x metrics) weights: equal weights with each metric left out, then random simplex samples"""
+    leave_one_out = 1.0 - np.eye(n_metrics)
+    # Normalised exponentials are uniform on the simplex (Dirichlet(1, ..., 1))
+    random = np.random.default_rng(seed).exponential(size=(samples, n_metrics))
+    weights = np.vstack([leave_one_out, random])
+    return weights / np.maximum(weights.sum(axis=1, keepdims=True), 1e-300)
+
+
+def rankings(scores, weights):
+    """(variants x systems) 1-based ranks; tied systems share the best of their ranks"""
+    composites = weights @ scores.T
+    order = np.argsort(-composites, axis=1)
+    ordered = np.take_along_axis(composites, order, axis=1)
+    # Rank of a sorted position: that of the first position holding the same composite
+    starts = np.ones(ordered.shape, dtype=bool)
+    starts[:, 1:] = ordered[:, 1:] != ordered[:, :-1]
+    first = np.maximum.accumulate(np.where(starts, np.arange(1, ordered.shape[1] + 1, dtype=np.int32), 0), axis=1)
+    ranks = np.empty(order.shape, dtype=np.int32)
+    np.put_along_axis(ranks, order, first, axis=1)
+    return ranks
+
+
+def kendall_tau(reference, ranks):
+    """Kendall tau of each row of (variants x systems) ranks against the reference ranks of the same systems"""
+    n = len(reference)
+    if n < 2:
+        return np.ones(len(ranks))
+    score = np.zeros(len(ranks))
+    step = max(1, MAX_TAU_CELLS // max(n * len(ranks), 1))
+    for start in range(0, n, step):
+        reference_signs = np.sign(reference[start:start + step, np.newaxis] - reference[np.newaxis])
+        signs = np.sign(ranks[:, start:start + step, np.newaxis] - ranks[:, np.newaxis])
+        score += (reference_signs * signs).sum(axis=(1, 2))
+    # Every pair is counted twice, once in each order
+    return score / (n * (n - 1))
+
+
+def analyse(scores, samples=DEFAULT_SAMPLES, seed=0, tau_top=TAU_TOP):
+    """Rank distributions and stability of the leaderboard under metric re-weighting.
+
+    scores: (systems x metrics) normalised scores in leaderboard order.
+    Returns {'reference_rank', 'rank_min', 'rank_max', 'rank_mean',
+    'rank_p5', 'rank_median', 'rank_p95', 'top1_share', 'leave_one_out_tau',
+    'leave_one_out_top', 'random_tau'}.
+    """
+    scores = np.asarray(scores, dtype=float)
+    n_systems, n_metrics = scores.shape
+    reference = rankings(scores, np.full((1, n_metrics), 1.0 / n_metrics))[0]
+    top = np.argsort(reference, kind='stable')[:tau_top]
+    weights = variant_weights(n_metrics, samples, seed)
+
+    bins = min(n_systems, RANK_BINS)
+    histogram = np.zeros(n_systems * bins, dtype=np.int64)
+    rank_min = np.full(n_systems, n_systems, dtype=np.int64)
+    rank_max = np.zeros(n_systems, dtype=np.int64)
+    rank_sum = np.zeros(n_systems)
+    top1 = np.zeros(n_systems, dtype=np.int64)
+    taus = []
+    leave_one_out_top = []
+    step = max(1, MAX_RANK_CELLS // max(n_systems, 1))
+    for start in range(0, len(weights), step):
+        ranks = rankings(scores, weights[start:start + step])
+        rank_min = np.minimum(rank_min, ranks.min(axis=0))
+        rank_max = np.maximum(rank_max, ranks.max(axis=0))
+        rank_sum += ranks.sum(axis=0)
+        top1 += (ranks == 1).sum(axis=0)
+        rank_bins = (ranks - 1) * bins // n_systems
+        histogram += np.bincount((np.arange(n_systems)[np.newaxis] * bins + rank_bins).ravel(),
+                                 minlength=n_systems * bins)
+        taus.append(kendall_tau(reference[top], ranks[:, top]))
+        leave_one_out_top += [int(np.argmin(row)) for row in ranks[:max(0, n_metrics - start)]]
+
+    histogram = histogram.reshape(n_systems, bins)
+    cumulative = np.cumsum(histogram, axis=1)
+
+    def percentile(q):
+        # First bin reaching the share q of the variants, interpolated within its ranks
+        target = q * len(weights)
+        first_bin = (cumulative < target).sum(axis=1)
+        rows = np.arange(n_systems)
+        in_bin = histogram[rows, first_bin]
+        before = cumulative[rows, first_bin] - in_bin
+        lower = (first_bin * n_systems + bins - 1) // bins + 1
+        upper = ((first_bin + 1) * n_systems + bins - 1) // bins
+        rank = lower - 1 + np.ceil((target - before) / in_bin * (upper - lower + 1)).astype(np.int64)
+        return np.clip(rank, rank_min, rank_max)
+
+    taus = np.concatenate(taus)
+    return {
+        'variants': len(weights),
+        'reference_rank': reference,
+        'rank_min': rank_min,
+        'rank_max': rank_max,
+        'rank_mean': rank_sum / len(weights),
+        'rank_p5': percentile(0.05),
+        'rank_median': percentile(0.5),
+        'rank_p95': percentile(0.95),
+        'top1_share': top1 / len(weights),
+        'leave_one_out_tau': taus[:n_metrics],
+        'leave_one_out_top': leave_one_out_top,
+        'random_tau': taus[n_metrics:],
+        'tau_systems': len(top),
+    }
+
+
+def sensitivity_json(result, records, metric_columns):
+    """JSON-serialisable summary of an analysis of the leaderboard rows"""
+    random_tau = result['random_tau']
+    tau_summary = {}
+    if len(random_tau):
+        tau_summary = {'mean': round(float(random_tau.mean()), 4), 'min': round(float(random_tau.min()), 4),
+                       'p5': round(float(np.percentile(random_tau, 5)), 4),
+                       'median': round(float(np.median(random_tau)), 4)}
+    return {
+        'variants': result['variants'],
+        'tau_systems': result['tau_systems'],
+        'leave_one_out': [{
+            'metric': metric,
+            'kendall_tau': round(float(result['leave_one_out_tau'][i]), 4),
+            'top_system': records[result['leave_one_out_top'][i]]['System Name'],
+        } for i, metric in enumerate(metric_columns)],
+        'random_weights': dict(tau_summary, samples=len(random_tau)),
+        'systems': [{
+            'system': row['System Name'],
+            'lm': row['lm'] if isinstance(row['lm'], str) else '',
+            'reference_rank': int(result['reference_rank'][i]),
+            'rank_min': int(result['rank_min'][i]),
+            'rank_p5': int(result['rank_p5'][i]),
+            'rank_median': int(result['rank_median'][i]),
+            'rank_p95': int(result['rank_p95'][i]),
+            'rank_max': int(result['rank_max'][i]),
+            'rank_mean': round(float(result['rank_mean'][i]), 2),
+            'top1_share': round(float(result['top1_share'][i]), 4),
+        } for i, row in enumerate(records)],
+    }
+
+
+def write_sensitivity(data, output_dir):
+    """Save the sensitivity summary as JSON (atomically); returns its path"""
+    path = os.path.join(output_dir, SENSITIVITY_JSON)
+    with atomic_open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2)
+    return path
@@ -0,0 +1,115 @@
+import contextlib
+import json
+import os
+import shutil
+
+from atomic_io import atomic_open
+from http_session import get_session
+
+# Use Sheet ID and GID from the URL
+SHEET_ID = "16vmSDBJ4ylWLWAgJJ8cRg0waVmQYO4miLA5jRT3aIGE"
+GID = "122040106"  # updated GID
+
+# Overrides the export URL everywhere (e.g. to point the build at a local stand-in server)
+SHEET_URL_ENV = 'DEEPSCHOLAR_SHEET_URL'
+
+# Where the fetch stage keeps the downloaded export
+DEFAULT_SHEET_CACHE = os.path.join('.cache', 'sheet_export.csv')
+
+
+def export_url(sheet_id=SHEET_ID, gid=GID):
+    """Construct the CSV export URL of a Google Sheets tab"""
+    return f"https://docs.google.com/spreadsheets/d/{sheet_id}/export?format=csv&gid={gid}"
+
+
+def sheet_url():
+    """The configured sheet URL: $DEEPSCHOLAR_SHEET_URL if set, else the Google Sheets export"""
+    return os.environ.get(SHEET_URL_ENV) or export_url()
+
+
+def _read_meta(path):
+    """Validators (URL, ETag, Last-Modified) saved alongside a cached export"""
+    try:
+        with open(path + '.meta.json', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _is_url(source):
+    return source.startswith(('http://', 'https://'))
+
+
+@contextlib.contextmanager
+def open_sheet(source=None, headers=None):
+    """Open a local export or an export URL as a binary stream.
+
+    URLs go through the shared HTTP session (pooled connections, timeouts,
+    retries) and the body is streamed rather than downloaded up front.
+    """
+    source = source or sheet_url()
+    if not _is_url(source):
+        with open(source, 'rb') as f:
+            yield f
+        return
+    with get_session().get(source, headers=headers) as response:
+        yield response
+
+
+def read_sheet_csv(source=None, chunksize=None):
+    """Parse the export into a DataFrame (second row as header) straight from the stream.
+
+    pandas tokenizes the stream as it arrives; with chunksize the rows are
+    also parsed in bounded batches and concatenated.
+    """
+    import pandas as pd
+
+    with open_sheet(source) as stream:
+        if not chunksize:
+            return pd.read_csv(stream, header=1)
+        return pd.concat(pd.read_csv(stream, header=1, chunksize=chunksize), ignore_index=True)
+
+
+def fetch_sheet(url, path=DEFAULT_SHEET_CACHE):
+    """Download the sheet export to a local file with a conditional request.
+
+    Returns a dict with the HTTP status, whether the cached copy was reused
+    (304 Not Modified) and the size of the local file.
+    """
+    if not _is_url(url):
+        # Local copies of the export (e.g. fixtures) are cached like any other source
+        url = os.path.abspath(url)
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+
+    headers = {}
+    meta = _read_meta(path)
+    if os.path.exists(path) and meta.get('url') == url:
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+        if not _is_url(url) and meta.get('last_modified') == str(os.path.getmtime(url)):
+            return {'status': 304, 'cached': True, 'bytes': os.path.getsize(path)}
+
+    with open_sheet(url, headers) as response:
+        status = getattr(response, 'status', 200)
+        if status == 304:
+            return {'status': 304, 'cached': True, 'bytes': os.path.getsize(path)}
+        with atomic_open(path) as f:
+            shutil.copyfileobj(response, f, 1 << 16)
+        etag = response.headers.get('ETag') if _is_url(url) else None
+        last_modified = response.headers.get('Last-Modified') if _is_url(url) else str(os.path.getmtime(url))
+
+    with atomic_open(path + '.meta.json', 'w', encoding='utf-8') as f:
+        json.dump({'url': url, 'etag': etag, 'last_modified': last_modified}, f)
+    return {'status': status, 'cached': False, 'bytes': os.path.getsize(path)}
+
+
+def resolve_source(source=None, cache_path=DEFAULT_SHEET_CACHE):
+    """Pick the sheet to read: a local CSV, the fetched copy of the URL, or the URL itself"""
+    url = source or sheet_url()
+    if not _is_url(url):
+        return url
+    if os.path.exists(cache_path) and _read_meta(cache_path).get('url') in (url, None):
+        return cache_path
+    return url
@@ -0,0 +1,222 @@
+"""Pairwise significance tests between the systems of a score-cube slice.
+
+Every pair of systems is compared on every metric with a paired test over
+the queries both systems answered:
+
+    sign         two-sided exact sign test on the per-query differences
+    permutation  two-sided paired permutation test (random sign flips of
+                 the differences, shared by all pairs)
+
+Pairs are evaluated in blocks of systems by broadcasting a block against
+all systems, so the work is a few array operations per block; with
+jobs > 1 the blocks are spread over a process pool. The result is a
+(systems x systems x metrics) p-value tensor, cached under the cube
+directory by a hash of the scores and test parameters, and the groups of
+statistically tied systems derived from it.
+"""
+import hashlib
+import json
+import math
+import os
+
+import numpy as np
+
+from atomic_io import atomic_open
+from metrics import METRIC_DISPLAY_NAMES, METRIC_SPECS
+from score_cube import ScoreCube
+
+TESTS = ('sign', 'permutation')
+DEFAULT_PERMUTATIONS = 1000
+DEFAULT_ALPHA = 0.05
+
+# Upper bound on the cells of one block's broadcast differences
+MAX_BLOCK_CELLS = 1 << 24
+
+SIGNIFICANCE_JSON = 'leaderboard_significance.json'
+
+
+def _binomial_cdf_table(n):
+    """P(X <= k) for k = 0..n, X ~ Binomial(n, 1/2)"""
+    k = np.arange(n + 1)
+    log_pmf = np.array([math.lgamma(n + 1) - math.lgamma(i + 1) - math.lgamma(n - i + 1) for i in k]) - n * math.log(2)
+    return np.minimum(np.cumsum(np.exp(log_pmf)), 1.0)
+
+
+def sign_test_pvalues(wins, losses):
+    """Two-sided exact sign test p-values of arrays of win and loss counts (ties are left out)"""
+    n = wins + losses
+    smaller = np.minimum(wins, losses)
+    pvalues = np.ones(n.shape)
+    for total in np.unique(n):
+        if total == 0:
+            continue
+        selected = n == total
+        pvalues[selected] = np.minimum(1.0, 2 * _binomial_cdf_table(int(total))[smaller[selected]])
+    return pvalues
+
+
+def _block_pvalues(scores, start, stop, test, flips):
+    """(block systems x systems x metrics) p-values of systems start:stop against all systems"""
+    block = scores[start:stop, np.newaxis]  # (block, 1, queries, metrics)
+    differences = block - scores[np.newaxis]  # NaN where either system has no value
+    if test == 'sign':
+        wins = (differences > 0).sum(axis=2)
+        losses = (differences < 0).sum(axis=2)
+        return sign_test_pvalues(wins, losses)
+
+    valid = ~np.isnan(differences)
+    differences = np.where(valid, differences, 0.0)
+    observed = np.abs(differences.sum(axis=2))  # (block, systems, metrics)
+    # (block * systems * metrics, queries) @ (queries, permutations): every flipped sum at once
+    rows = differences.transpose(0, 1, 3, 2).reshape(-1, differences.shape[2])
+    flipped = np.abs(rows @ flips.T).reshape(observed.shape + (len(flips),))
+    exceed = (flipped >= observed[..., np.newaxis] - 1e-12).sum(axis=-1)
+    pvalues = (exceed + 1) / (len(flips) + 1)
+    return np.where(valid.any(axis=2), pvalues, 1.0)
+
+
+def _block_rows(n_systems, n_queries, n_metrics, n_permutations):
+    per_row = n_systems * n_metrics * max(n_queries, n_permutations)
+    return max(1, MAX_BLOCK_CELLS // max(per_row, 1))
+
+
+def _cube_block(cube_dir, systems, queries, start, stop, test, flips):
+    """Worker: p-values of one block, memory-mapping the cube in the worker process"""
+    scores = ScoreCube(cube_dir).scores[systems][:, queries]
+    return _block_pvalues(scores, start, stop, test, flips)
+
+
+def data_hash(scores, test, permutations, seed):
+    """Cache key of a p-value tensor: hash of the scores and of the test parameters"""
+    digest = hashlib.sha256(np.ascontiguousarray(scores).tobytes())
+    digest.update(repr((scores.shape, test, permutations if test == 'permutation' else None, seed)).encode())
+    return digest.hexdigest()
+
+
+def pairwise_pvalues(cube, mask, test='sign', permutations=DEFAULT_PERMUTATIONS, seed=0, jobs=None, cache=True):
+    """(system indices in leaderboard order, systems x systems x metrics p-value tensor) of a slice
+
+    The diagonal is 1. Results are cached in <cube dir>/significance/<hash>.npy.
+    """
+    if test not in TESTS:
+        raise ValueError(f"unknown test {test!r} (expected one of {', '.join(TESTS)})")
+    queries = np.flatnonzero(mask)
+    systems, _ = cube.ranked_systems(mask)
+    scores = cube.scores[systems][:, queries]
+
+    cache_file = os.path.join(cube.cube_dir, 'significance', data_hash(scores, test, permutations, seed) + '.npy')
+    if cache and os.path.exists(cache_file):
+        return systems, np.load(cache_file)
+
+    flips = None
+    if test == 'permutation':
+        flips = np.random.default_rng(seed).choice([-1.0, 1.0], size=(permutations, len(queries)))
+    n_systems, n_queries, n_metrics = scores.shape
+    step = _block_rows(n_systems, n_queries, n_metrics, permutations if test == 'permutation' else 0)
+    starts = list(range(0, n_systems, step))
+    jobs = jobs or os.cpu_count() or 1
+    if jobs > 1 and len(starts) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            blocks = list(pool.map(_cube_block, [cube.cube_dir] * len(starts), [systems] * len(starts),
+                                   [queries] * len(starts), starts, [start + step for start in starts],
+                                   [test] * len(starts), [flips] * len(starts)))
+    else:
+        blocks = [_block_pvalues(scores, start, start + step, test, flips) for start in starts]
+    pvalues = np.concatenate(blocks) if blocks else np.ones((0, 0, n_metrics))
+    pvalues[np.arange(n_systems), np.arange(n_systems)] = 1.0
+
+    if cache:
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        with atomic_open(cache_file) as f:
+            np.save(f, pvalues)
+    return systems, pvalues
+
+
+def tied_groups(means, pvalues, alpha=DEFAULT_ALPHA):
+    """Groups of statistically tied systems on one metric, best first.
+
+    Systems are taken in descending order of their mean; a system joins the
+    current group unless it differs significantly from the group's leader.
+    means: (systems,) scores; pvalues: (systems x systems) of that metric.
+    Returns lists of system positions.
+    """
+    groups = []
+    for position in np.argsort(-means, kind='stable'):
+        if groups and pvalues[groups[-1][0], position] >= alpha:
+            groups[-1].append(int(position))
+        else:
+            groups.append([int(position)])
+    return groups
+
+
+def significance_json(cube, systems, point, pvalues, test, alpha=DEFAULT_ALPHA):
+    """JSON-serialisable p-values and tied groups of every metric (systems in leaderboard order)"""
+    metric_columns = [METRIC_DISPLAY_NAMES.get(spec['column'], spec['display']) for spec in METRIC_SPECS]
+    return {
+        'test': test,
+        'alpha': alpha,
+        'systems': [{'system': cube.systems[i]['System Name'], 'lm': cube.systems[i]['lm'] or ''} for i in systems],
+        'metrics': metric_columns,
+        # pvalues[metric][i][j], rounded for the page
+        'pvalues': [np.round(pvalues[:, :, m], 4).tolist() for m in range(len(metric_columns))],
+        'groups': {metric: tied_groups(point[:, m], pvalues[:, :, m], alpha) for m, metric in enumerate(metric_columns)},
+    }
+
+
+def write_significance(data, output_dir):
+    """Save the significance JSON (atomically); returns its path"""
+    path = os.path.join(output_dir, SIGNIFICANCE_JSON)
+    with atomic_open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    return path
+
+
+def render_significance_panel(data):
+    """HTML significance heatmap (one metric at a time) with the tied groups ('' without data)"""
+    if not data or not data['systems']:
+        return ''
+    options = ''.join(f'<option value="{i}">{metric.replace("<br>", " ")}</option>'
+                      for i, metric in enumerate(data['metrics']))
+    return f"""
+        <!-- Significance Section -->
+        <div class="significance-section" style="margin: 40px 30px; padding: 20px; background: #f8f9ff; border-radius: 12px; border-left: 5px solid #667eea;">
+            <h3 style="color: #1e3c72; margin-bottom: 15px;">🧪 Pairwise Significance</h3>
+            <p style="margin-bottom: 10px;">Paired {data['test']} test p-values between systems (in leaderboard order); dark cells are significant at α = {data['alpha']}. Systems in the same group are statistically tied.</p>
+            <select id="significanceMetric" onchange="drawSignificance()" style="margin-bottom: 15px; padding: 4px 8px;">{options}</select>
+            <div style="display: flex; gap: 30px; flex-wrap: wrap;">
+                <canvas id="significanceHeatmap" style="border: 1px solid #e9ecef; background: white;"></canvas>
+                <ol id="significanceGroups" style="margin-left: 20px; line-height: 1.8;"></ol>
+            </div>
+        </div>
+        <script>
+        const SIGNIFICANCE = {json.dumps(data)};
+        function drawSignificance() {{
+            const metric = Number(document.getElementById('significanceMetric').value);
+            const pvalues = SIGNIFICANCE.pvalues[metric];
+            const n = SIGNIFICANCE.systems.length;
+            const cell = Math.max(2, Math.min(16, Math.floor(600 / n)));
+            const canvas = document.getElementById('significanceHeatmap');
+            canvas.width = canvas.height = n * cell;
+            const ctx = canvas.getContext('2d');
+            for (let i = 0; i < n; i++) {{
+                for (let j = 0; j < n; j++) {{
+                    const p = pvalues[i][j];
+                    ctx.fillStyle = p < SIGNIFICANCE.alpha ? `rgba(30, 60, 114, ${{1 - p / SIGNIFICANCE.alpha * 0.6}})` : '#eef0fb';
+                    ctx.fillRect(j * cell, i * cell, cell, cell);
+                }}
+            }}
+            canvas.onmousemove = (event) => {{
+                const i = Math.floor(event.offsetY / cell), j = Math.floor(event.offsetX / cell);
+                if (i < n && j < n) {{
+                    canvas.title = `${{SIGNIFICANCE.systems[i].system}} vs ${{SIGNIFICANCE.systems[j].system}}: p = ${{pvalues[i][j]}}`;
+                }}
+            }};
+            const groups = SIGNIFICANCE.groups[SIGNIFICANCE.metrics[metric]];
+            document.getElementById('significanceGroups').innerHTML = groups.map(
+                (group) => '<li>' + group.map((i) => SIGNIFICANCE.systems[i].system).join(', ') + '</li>').join('');
+        }}
+        drawSignificance();
+        </script>
+"""
@@ -0,0 +1,257 @@
+"""Append-only history of processed leaderboards.
+
+Every processed leaderboard CSV is appended to a JSON-lines log as one
+snapshot, keyed by its UTC timestamp and the SHA-1 of the CSV. Snapshots
+are delta-encoded against the previous one (changed cells, added and
+removed systems, new row order) with a full keyframe every
+KEYFRAME_INTERVAL snapshots or whenever the columns change, so:
+
+  - appending costs one line, never a rewrite of the log;
+  - "leaderboard as of D" replays at most KEYFRAME_INTERVAL deltas;
+  - "system X over time" follows a single row key through the deltas.
+
+Cells are stored as the CSV text, so a reconstructed snapshot is
+byte-identical to the CSV it was taken from (checked against its hash).
+"""
+import bisect
+import csv
+import hashlib
+import io
+import json
+import os
+from datetime import date, datetime, time, timezone
+
+KEYFRAME_INTERVAL = 32
+
+# Columns identifying a system; the remaining columns are metrics
+KEY_COLUMNS = ('System Name', 'lm', 'System Type')
+
+
+def parse_timestamp(value, end_of_day=False):
+    """datetime (UTC) from an ISO date/datetime string or a datetime
+
+    end_of_day: read a date-only string as the last moment of that day, not midnight.
+    Raises ValueError for a string that is not an ISO date/datetime.
+    """
+    if isinstance(value, str):
+        try:
+            value = datetime.combine(date.fromisoformat(value), time.max if end_of_day else time.min)
+        except ValueError:
+            value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def parse_csv(content):
+    """(columns, rows) of CSV bytes, cells kept as text"""
+    rows = list(csv.reader(io.StringIO(content.decode('utf-8'), newline='')))
+    return rows[0], rows[1:]
+
+
+def format_csv(columns, rows):
+    """CSV bytes in the DataFrame.to_csv(index=False) layout"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    writer.writerow(columns)
+    writer.writerows(rows)
+    return buffer.getvalue().encode('utf-8')
+
+
+def row_keys(rows):
+    """Stable key per row: system name and LM, numbered if the pair repeats"""
+    keys = []
+    seen = {}
+    for row in rows:
+        key = f"{row[0]}\t{row[1]}"
+        seen[key] = seen.get(key, 0) + 1
+        keys.append(key if seen[key] == 1 else f"{key}#{seen[key]}")
+    return keys
+
+
+def _encode_delta(previous, columns, rows):
+    """Cells that changed since previous (a decoded snapshot), plus added/removed keys and order"""
+    keys = row_keys(rows)
+    current = set(keys)
+    previous_rows = previous['rows']
+    delta = {'set': {}, 'add': {}, 'remove': [key for key in previous['order'] if key not in current]}
+    for key, row in zip(keys, rows):
+        old = previous_rows.get(key)
+        if old is None:
+            delta['add'][key] = row
+            continue
+        changed = {str(i): cell for i, (cell, old_cell) in enumerate(zip(row, old)) if cell != old_cell}
+        if changed:
+            delta['set'][key] = changed
+    if keys != previous['order']:
+        delta['order'] = keys
+    return delta
+
+
+def _apply_delta(state, entry):
+    """Advance a decoded snapshot {'columns', 'rows', 'order'} by one log entry (in place)"""
+    if entry.get('keyframe'):
+        state['columns'] = entry['columns']
+        state['order'] = list(entry['rows'])
+        state['rows'] = dict(entry['rows'])
+        return state
+    rows = state['rows']
+    for key in entry.get('remove', []):
+        rows.pop(key, None)
+    for key, row in entry.get('add', {}).items():
+        rows[key] = row
+    for key, changed in entry.get('set', {}).items():
+        row = list(rows[key])
+        for i, cell in changed.items():
+            row[int(i)] = cell
+        rows[key] = row
+    if 'order' in entry:
+        state['order'] = entry['order']
+    elif entry.get('remove'):
+        removed = set(entry['remove'])
+        state['order'] = [key for key in state['order'] if key not in removed]
+    return state
+
+
+class SnapshotStore:
+    """Append-only, delta-encoded log of leaderboard snapshots"""
+
+    def __init__(self, path):
+        self.path = path
+        self._entries = None
+        self._latest = None  # decoded state after the last entry
+
+    def entries(self):
+        """Log entries in append order (a torn last line from a crash is ignored)"""
+        if self._entries is None:
+            self._entries = []
+            try:
+                with open(self.path, encoding='utf-8') as f:
+                    for line in f:
+                        try:
+                            self._entries.append(json.loads(line))
+                        except ValueError:
+                            break
+            except FileNotFoundError:
+                pass
+        return self._entries
+
+    def snapshots(self):
+        """[{'id', 'timestamp', 'hash', 'rows_total'}] without the payloads"""
+        return [{name: entry[name] for name in ('id', 'timestamp', 'hash', 'rows_total')} for entry in self.entries()]
+
+    def _state_at(self, index):
+        """Decoded snapshot after entry index, replaying from the closest keyframe"""
+        entries = self.entries()
+        start = index
+        while not entries[start].get('keyframe'):
+            start -= 1
+        state = {}
+        for entry in entries[start:index + 1]:
+            _apply_delta(state, entry)
+        return state
+
+    def append(self, content, timestamp=None):
+        """Append CSV bytes as a snapshot; returns the new entry, or None if identical to the last one"""
+        digest = hashlib.sha1(content).hexdigest()
+        entries = self.entries()
+        if entries and entries[-1]['hash'] == digest:
+            return None
+
+        columns, rows = parse_csv(content)
+        entry = {
+            'id': len(entries),
+            'timestamp': parse_timestamp(timestamp or datetime.now(timezone.utc)).isoformat(),
+            'hash': digest,
+            'rows_total': len(rows),
+        }
+        if entries and self._latest is None:
+            self._latest = self._state_at(len(entries) - 1)
+        since_keyframe = next((i for i, e in enumerate(reversed(entries)) if e.get('keyframe')), None)
+        if (not entries or self._latest['columns'] != columns
+                or since_keyframe is None or since_keyframe + 1 >= KEYFRAME_INTERVAL):
+            entry['keyframe'] = True
+            entry['columns'] = columns
+            entry['rows'] = dict(zip(row_keys(rows), rows))
+        else:
+            entry.update(_encode_delta(self._latest, columns, rows))
+
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry, separators=(',', ':')) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        entries.append(entry)
+        self._latest = _apply_delta(self._latest or {}, entry)
+        return entry
+
+    def append_file(self, csv_file, timestamp=None):
+        """Append a leaderboard CSV file as a snapshot"""
+        with open(csv_file, 'rb') as f:
+            return self.append(f.read(), timestamp)
+
+    def as_of(self, when):
+        """(columns, rows, entry) of the latest snapshot taken at or before when (None if there is none)
+
+        A date-only when includes every snapshot taken on that day.
+        """
+        entries = self.entries()
+        times = [parse_timestamp(entry['timestamp']) for entry in entries]
+        index = bisect.bisect_right(times, parse_timestamp(when, end_of_day=True)) - 1
+        if index < 0:
+            return None
+        state = self._state_at(index)
+        return state['columns'], [state['rows'][key] for key in state['order']], entries[index]
+
+    def as_of_csv(self, when):
+        """CSV bytes of the snapshot as_of(when), verified against its stored hash"""
+        snapshot = self.as_of(when)
+        if snapshot is None:
+            return None
+        columns, rows, entry = snapshot
+        content = format_csv(columns, rows)
+        if hashlib.sha1(content).hexdigest() != entry['hash']:
+            raise ValueError(f"{self.path}: snapshot {entry['id']} does not match its hash")
+        return content
+
+    def system_history(self, system_name, lm=None):
+        """[{'timestamp', 'rank', <column>: value}] for every snapshot containing the system
+
+        Follows the system's row through the deltas instead of rebuilding
+        each snapshot. Without lm, the first row with that system name is used.
+        """
+        history = []
+        columns = None
+        row = None
+        key = None if lm is None else f"{system_name}\t{lm}"
+        order = []
+        for entry in self.entries():
+            if entry.get('keyframe'):
+                columns = entry['columns']
+                order = list(entry['rows'])
+                if key is None:
+                    key = next((k for k in order if k.split('\t', 1)[0] == system_name), None)
+                row = entry['rows'].get(key)
+            else:
+                if key is None:
+                    key = next((k for k in entry.get('add', {}) if k.split('\t', 1)[0] == system_name), None)
+                if key in entry.get('add', {}):
+                    row = entry['add'][key]
+                elif key in entry.get('remove', []):
+                    row = None
+                elif row is not None and key in entry.get('set', {}):
+                    row = list(row)
+                    for i, cell in entry['set'][key].items():
+                        row[int(i)] = cell
+                if 'order' in entry:
+                    order = entry['order']
+                elif entry.get('remove'):
+                    removed = set(entry['remove'])
+                    order = [k for k in order if k not in removed]
+            if row is None:
+                continue
+            point = {'timestamp': entry['timestamp'], 'rank': order.index(key) + 1}
+            for name, cell in zip(columns, row):
+                point[name] = cell if name in KEY_COLUMNS else float(cell)
+            history.append(point)
+        return history
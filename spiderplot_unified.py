@@ -2,79 +2,67 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import numpy as np
 import colorsys
+import logging
 import os
 from matplotlib.colors import to_rgb
 from matplotlib.lines import Line2D
 from matplotlib.patches import Rectangle
 
-# Use Sheet ID and GID from the URL
-sheet_id = "16vmSDBJ4ylWLWAgJJ8cRg0waVmQYO4miLA5jRT3aIGE"
-gid = "122040106"  # updated GID
-    
-# Construct the export URL
-csv_url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/export?format=csv&gid={gid}"
+from atomic_io import atomic_open
+from distribution_plots import DISTRIBUTION_FILE, render_distributions
+from instrumentation import RunReport, file_size
+from metrics import METRIC_COLUMNS, METRIC_SPECS, category_spans, get_spec, metric_renames, normalize_metrics
+from sheet_source import read_sheet_csv, sheet_url
+
+logger = logging.getLogger(__name__)
 
-# Read the CSV into a DataFrame, using the second row as the header
-df = pd.read_csv(csv_url, header=1)
+# Where the PDFs are written
+DEFAULT_OUTPUT_DIR = 'eval/plots/spiderplot_final'
 
-# Clean whitespace in all metric names
-df.iloc[:, 0] = df.iloc[:, 0].astype(str).str.strip()
-df.columns = df.columns.str.strip()
+# Sheet data, populated by load_data() before any plot is generated
+df = None
 
 # Define metrics to plot (same for both individual and combined plots)
-metrics_to_plot = [
-    "Win rate (including ties as .5)",
-    "strict all",
-    "Retreival Relevance Normalized (Avg / 2) avg over ALL user-provided reference -> any arxiv id found in the report",
-    "Document Importance RATIO (avg over median citations per reference div by gt arxiv number)",
-    "ARXIV Essential citation coverage avg per file",
-    "Citation Precision (0's for Nans)",
-    "relaxed recall - divisor all sentences - slide 1  - 0 for nans",
-]
+metrics_to_plot = list(METRIC_COLUMNS)
 
 # Renaming dictionaries for individual plots
-individual_metric_renames = {
-    "Citation Precision (0's for Nans)": 'Citation \n Precision',
-    "relaxed recall - divisor all sentences - slide 1  - 0 for nans": 'Claim \n Coverage',
-    'Retreival Relevance Normalized (Avg / 2) avg over ALL user-provided reference -> any arxiv id found in the report':'Relevance \nRate',
-    'Win rate (including ties as .5)':'Organization',
-    "strict all":'Nugget \nCoverage',
-    "ARXIV Essential citation coverage avg per file" :"Reference \n Coverage",
-    "Document Importance RATIO (avg over median citations per reference div by gt arxiv number)":'Document \n Importance',
-}
+individual_metric_renames = metric_renames('individual_label')
 
 # Renaming dictionaries for combined plots (more compact labels)
-combined_metric_renames = {
-    "Citation Precision (0's for Nans)": 'Cite-P',
-    "relaxed recall - divisor all sentences - slide 1  - 0 for nans": 'Claim Cov \n(w = 1)',
-    'Retreival Relevance Normalized (Avg / 2) avg over ALL user-provided reference -> any arxiv id found in the report':'Relevance \nRate',
-    'Win rate (including ties as .5)':'Organization',
-    "strict all":'Nugget \nCoverage',
-    "ARXIV Essential citation coverage avg per file" :"Reference \n Coverage",
-    "Document Importance RATIO (avg over median citations per reference div by gt arxiv number)":'Doc \n Importance',
-}
+combined_metric_renames = metric_renames('combined_label')
+
+# Normalised metric values for every row of the sheet, computed once by load_data()
+metric_matrix = None
 
-# Define the two model groups
+# Systems that never appear on the spider plots (placeholders, baselines and ablations)
+always_excluded = ['Abalation (Llama-4,2,2) - no filter, topk', 'nan', 'Ground Truth', 'lotus gain', 'o1 + web',
+                   'Search AI (GPT-4.1)', 'DeepScholar-base (GPT4.1)', 'DeepScholar-base (GPT4.1 + o3)',
+                   'DeepScholar-base (GPT4.1 + Gemini-2.5-pro)', 'Claude- Parallel', 'Claude- Tavily',
+                   'Llama-4 - Parallel', 'Llama-4 - Tavily']
+
+# Define the two model groups as predicates over the sheet columns.
+# Each filter is {'column', 'op', 'value'} with op one of
+# 'in', 'not_in', 'contains', 'not_contains' (case-insensitive) or 'matches' (regex);
+# a system belongs to the group when every filter holds.
 model_groups = {
     'llama_only': {
-        'exclude': ['Abalation (Llama-4,2,2) - no filter, topk','nan','Ground Truth' ,'lotus gain','o1 + web',
-                   'Search AI (GPT-4.1)', 'Search AI (Claude-opus-4)','Search AI (Gemini-2.5-pro)','OpenAI DeepResearch',
-                   'DeepScholar-base (GPT4.1)','DeepScholar-base (Llama-4, Gemini-2.5-pro)','DeepScholar-base (GPT4.1 + Claude-opus-4)','DeepScholar-base (GPT4.1 + o3)',
-                   'Claude- Parallel','Claude- Tavily','DeepScholar-base (GPT4.1 + o3)','DeepScholar-base (GPT4.1 + Gemini-2.5-pro)',
-                   'DeepScholar-base (GPT4.1)', 'DeepScholar-base (GPT4.1 + o3)', 'DeepScholar-base (GPT4.1 + Gemini-2.5-pro)',
-                'Llama-4 - Parallel','Llama-4 - Tavily', 'Search AI (o3)','Claude- Tavily', 'Claude- Parallel','Ours (Llama-4, GPT4.1 2,2)'],
+        'filters': [
+            {'column': 'System Name', 'op': 'not_in', 'value': always_excluded},
+            {'column': 'System Name', 'op': 'not_in', 'value': [
+                'Search AI (Claude-opus-4)', 'Search AI (Gemini-2.5-pro)', 'Search AI (o3)', 'OpenAI DeepResearch',
+                'DeepScholar-base (Llama-4, Gemini-2.5-pro)', 'DeepScholar-base (GPT4.1 + Claude-opus-4)',
+                'Ours (Llama-4, GPT4.1 2,2)']},
+        ],
         'title': 'Open-source systems',
         'filename': 'open_source_systems'
     },
     'non_llama': {
-        'exclude': ['Abalation (Llama-4,2,2) - no filter, topk','nan','Ground Truth' ,'lotus gain','o1 + web',
-                   'DeepResearcher (Llama-4-scout)','STORM (Llama-4-scout)','OpenScholar (Llama-4-scout)',
-                   'Search AI (Llama-4-Scout)','Search AI (GPT-4.1)',
-                   'DeepScholar-base (Llama-4-scout)','DeepScholar-base (GPT4.1)',
-                   'Llama-4 - Parallel','Llama-4 - Tavily','Search AI (Llama-4-scout)',
-                    'DeepScholar-base (GPT4.1 + o3)', 'DeepScholar-base (GPT4.1 + Gemini-2.5-pro)',
-                    'Llama-4 - Parallel','Llama-4 - Tavily', 'Claude- Tavily', 'Claude- Parallel'
-],
+        'filters': [
+            {'column': 'System Name', 'op': 'not_in', 'value': always_excluded},
+            {'column': 'System Name', 'op': 'not_in', 'value': [
+                'DeepResearcher (Llama-4-scout)', 'STORM (Llama-4-scout)', 'OpenScholar (Llama-4-scout)',
+                'Search AI (Llama-4-Scout)', 'Search AI (Llama-4-scout)', 'DeepScholar-base (Llama-4-scout)']},
+        ],
         'title': 'Closed-source systems',
         'filename': 'closed_source_systems'
     }
@@ -100,61 +88,86 @@ colorblind_friendly_colors = [
     '#f7b6d2',  # light pink
 ]
 
-def get_models_for_group(exclude_list):
-    """Get models for a specific group"""
-    all_models = df.iloc[1:, 0].tolist()
-    # Clean the exclude list to handle whitespace
-    exclude_list_clean = [str(item).strip() for item in exclude_list]
-    
-    # Debug: print what we're working with
-    print(f"\nExcluding models: {exclude_list_clean}")
-    
-    filtered_models = []
-    for model in all_models:
-        model_clean = str(model).strip()
-        if model_clean not in exclude_list_clean:
-            filtered_models.append(model_clean)
+# Column aliases accepted in group filters (processed leaderboard name -> sheet name)
+_filter_column_aliases = {'System Name': 0, 'System Type': 'open/close'}
+
+# Compiled boolean masks over the sheet rows, keyed by group name
+_group_masks = {}
+
+
+def _filter_mask(values, op, value):
+    """Evaluate a single group filter over a column of stripped strings"""
+    if op == 'in':
+        return values.isin([str(v).strip() for v in value]).to_numpy()
+    if op == 'not_in':
+        return ~values.isin([str(v).strip() for v in value]).to_numpy()
+    if op == 'contains':
+        return values.str.contains(value, case=False, regex=False).to_numpy()
+    if op == 'not_contains':
+        return ~values.str.contains(value, case=False, regex=False).to_numpy()
+    if op == 'matches':
+        return values.str.contains(value, regex=True).to_numpy()
+    raise ValueError(f"Unknown group filter op: {op}")
+
+
+def compile_group_mask(group_config):
+    """Compile the filters of a group into a boolean mask over the sheet rows"""
+    # The first data row is not a system and is never plotted
+    mask = np.ones(len(df), dtype=bool)
+    mask[:1] = False
+
+    for group_filter in group_config['filters']:
+        column = _filter_column_aliases.get(group_filter['column'], group_filter['column'])
+        if isinstance(column, int):
+            values = df.iloc[:, column]
+        elif column in df.columns:
+            values = df[column]
         else:
-            print(f"Excluded: '{model_clean}'")
-    
-    print(f"Models included: {filtered_models}")
+            raise KeyError(f"Group filter column not in sheet: {group_filter['column']}")
+        mask &= _filter_mask(values.astype(str).str.strip(), group_filter['op'], group_filter['value'])
+    return mask
+
+
+def get_group_mask(group_name):
+    """Get the (memoized) boolean mask of a model group"""
+    if group_name not in _group_masks:
+        _group_masks[group_name] = compile_group_mask(model_groups[group_name])
+        logger.debug("Compiled mask for group %s: %d of %d rows", group_name,
+                     _group_masks[group_name].sum(), len(df))
+    return _group_masks[group_name]
+
+
+def get_models_for_group(group_name):
+    """Get models for a specific group"""
+    mask = get_group_mask(group_name)
+    filtered_models = df.iloc[:, 0].astype(str).str.strip()[mask].tolist()
+
+    if logger.isEnabledFor(logging.DEBUG):
+        excluded = df.iloc[1:, 0].astype(str).str.strip()[~mask[1:]].tolist()
+        logger.debug("Excluded from %s: %s", group_name, excluded)
+        logger.debug("Models included in %s: %s", group_name, filtered_models)
     return filtered_models
 
 def get_model_data(models_to_plot, metrics_to_plot, color_mapping=None):
     """Get data for a specific group of models"""
+    # First row of the sheet for each system name
+    row_positions = {}
+    for position, name in enumerate(df.iloc[:, 0].astype(str).str.strip()):
+        row_positions.setdefault(name, position)
+
+    # Metrics that are not in the registry (or not in the sheet) are plotted as 0
+    metric_positions = [METRIC_COLUMNS.index(metric) if metric in METRIC_COLUMNS and metric in df.columns else None
+                        for metric in metrics_to_plot]
+
     model_data = []
     for i, model_name in enumerate(models_to_plot):
-        # find the row
-        model_row = None
-        for idx, row in df.iterrows():
-            if str(row.iloc[0]).strip() == model_name:
-                model_row = row
-                break
-        if model_row is None:
+        position = row_positions.get(model_name)
+        if position is None:
             continue
 
         # extract values
-        values = []
-        for metric in metrics_to_plot:
-            try:
-                if metric in df.columns:
-                    val = model_row[metric]
-                    if pd.isna(val):
-                        val = 0
-                    else:
-                        val_str = str(val).replace('%', '').strip()
-                        val = float(val_str)
-                        if metric in ["Win rate (including ties as .5)",
-                                      "Citation Precision (0's for Nans)",
-                                      "relaxed recall - divisor all sentences - slide 1  - 0 for nans"]:
-                            val = val / 100
-                    # Clip values to maximum of 1.0 for the spider plot
-                    val = min(val, 1.0)
-                    values.append(val)
-                else:
-                    values.append(0)
-            except Exception as e:
-                values.append(0)
+        row_values = metric_matrix[position]
+        values = [float(row_values[j]) if j is not None else 0 for j in metric_positions]
 
         # Use global color mapping if provided, otherwise fall back to index-based coloring
         if color_mapping and model_name in color_mapping:
@@ -180,8 +193,8 @@ def create_individual_spider_plot(ax, model_data, title, metrics_to_plot, metric
     angles = np.linspace(0, 2*np.pi, len(labels), endpoint=False).tolist()
     angles += angles[:1]
 
-    idx_citep = metrics_to_plot.index("Citation Precision (0's for Nans)")
-    idx_claim = metrics_to_plot.index("relaxed recall - divisor all sentences - slide 1  - 0 for nans")
+    idx_citep = metrics_to_plot.index(get_spec('citation_precision')['column'])
+    idx_claim = metrics_to_plot.index(get_spec('claim_coverage')['column'])
 
     # midpoint angle (in radians) between the two axes
     mid_angle = 0.5 * (angles[idx_citep] + angles[idx_claim])
@@ -486,12 +499,6 @@ def create_combined_spider_plot(ax, model_data, title, metrics_to_plot, metric_r
                 ha='center', va='center', fontsize=26, fontweight='normal',
                 zorder=25)  # Much higher zorder to appear above arcs
 
-# Create global color mapping for consistency across all plots
-all_models_set = set()
-for group_name, group_config in model_groups.items():
-    models = get_models_for_group(group_config['exclude'])
-    all_models_set.update(models)
-
 # Create custom ordered list for legend
 legend_order = [
     'Search AI (Llama-4-Scout)',
@@ -507,17 +514,44 @@ legend_order = [
     'DeepScholar (GPT4.1 + o3)'
 ]
 
-# Filter to only include models that actually exist in our data
-sorted_models = [model for model in legend_order if model in all_models_set]
+# Legend order and colors shared by all plots, built by load_data()
+sorted_models = []
+global_color_map = {}
+
+def build_global_color_map():
+    """Create global color mapping for consistency across all plots"""
+    all_models_set = set()
+    for group_name, group_config in model_groups.items():
+        models = get_models_for_group(group_name)
+        all_models_set.update(models)
 
-# Add any remaining models that weren't in our custom order
-remaining_models = [model for model in all_models_set if model not in legend_order]
-sorted_models.extend(sorted(remaining_models))
+    # Filter to only include models that actually exist in our data
+    sorted_models[:] = [model for model in legend_order if model in all_models_set]
 
-# Create global color mapping - this ensures consistent colors across all plots
-global_color_map = {}
-for i, model_name in enumerate(sorted_models):
-    global_color_map[model_name] = colorblind_friendly_colors[i % len(colorblind_friendly_colors)]
+    # Add any remaining models that weren't in our custom order
+    remaining_models = [model for model in all_models_set if model not in legend_order]
+    sorted_models.extend(sorted(remaining_models))
+
+    # Create global color mapping - this ensures consistent colors across all plots
+    global_color_map.clear()
+    for i, model_name in enumerate(sorted_models):
+        global_color_map[model_name] = colorblind_friendly_colors[i % len(colorblind_friendly_colors)]
+
+def load_data(source=None):
+    """Load the sheet (Google Sheets export by default) and derive everything the plots need"""
+    global df, metric_matrix
+
+    # Read the CSV into a DataFrame, using the second row as the header
+    df = read_sheet_csv(source or sheet_url())
+
+    # Clean whitespace in all metric names
+    df.iloc[:, 0] = df.iloc[:, 0].astype(str).str.strip()
+    df.columns = df.columns.str.strip()
+
+    metric_matrix = normalize_metrics(df, METRIC_SPECS)
+    _group_masks.clear()
+    build_global_color_map()
+    return df
 
 def print_models_in_group(group_name, group_config):
     """Print which models are included in a specific group"""
@@ -525,19 +559,18 @@ def print_models_in_group(group_name, group_config):
     print(f"PLOT: {group_config['title']}")
     print(f"{'='*50}")
     
-    models = get_models_for_group(group_config['exclude'])
+    models = get_models_for_group(group_name)
     print(f"Total models in this plot: {len(models)}")
     print(f"Models: {models}")
     print(f"{'='*50}\n")
 
-def generate_individual_plots():
+def generate_individual_plots(output_dir=DEFAULT_OUTPUT_DIR, report=None):
     """Generate individual spider plots"""
     print("\n" + "="*80)
     print("GENERATING INDIVIDUAL PLOTS")
     print("="*80)
     
     # Create output directory if it doesn't exist
-    output_dir = 'eval/plots/spiderplot_final'
     os.makedirs(output_dir, exist_ok=True)
     
     # Generate individual plots
@@ -548,7 +581,7 @@ def generate_individual_plots():
         fig, ax = plt.subplots(figsize=(16, 16), subplot_kw=dict(projection='polar'))
         
         # Get models and data for this group
-        models = get_models_for_group(group_config['exclude'])
+        models = get_models_for_group(group_name)
         model_data = get_model_data(models, metrics_to_plot, global_color_map)
         
         # Create the spider plot
@@ -560,7 +593,10 @@ def generate_individual_plots():
         # Save the individual plot
         filename = f"indi_spider_plot_{group_config['filename']}.pdf"
         filepath = os.path.join(output_dir, filename)
-        plt.savefig(filepath, format='pdf', bbox_inches='tight', dpi=300)
+        with (report or RunReport('plots')).stage(f'save:{filename}', rows=len(model_data)) as stats:
+            with atomic_open(filepath) as f:
+                plt.savefig(f, format='pdf', bbox_inches='tight', dpi=300)
+            stats['bytes_out'] = file_size(filepath)
         print(f"Saved individual plot as: {filepath}")
         
         # Show the plot
@@ -571,14 +607,13 @@ def generate_individual_plots():
     
     print("\nAll individual plots have been saved!")
 
-def generate_combined_plot():
+def generate_combined_plot(output_dir=DEFAULT_OUTPUT_DIR, report=None):
     """Generate combined spider plot with legend"""
     print("\n" + "="*80)
     print("GENERATING COMBINED PLOT WITH LEGEND")
     print("="*80)
     
     # Create output directory if it doesn't exist
-    output_dir = 'eval/plots/spiderplot_final'
     os.makedirs(output_dir, exist_ok=True)
     
     # Create the combined figure - much bigger
@@ -649,7 +684,7 @@ def generate_combined_plot():
         ax = fig.add_subplot(gs[row, col], projection='polar')
         
         group_config = model_groups[group_name]
-        models = get_models_for_group(group_config['exclude'])
+        models = get_models_for_group(group_name)
         model_data = get_model_data(models, metrics_to_plot, global_color_map)
         create_combined_spider_plot(ax, model_data, group_config['title'], metrics_to_plot, combined_metric_renames)
         
@@ -665,20 +700,78 @@ def generate_combined_plot():
     # Save the combined plot
     filename = "spider_plot_combined_with_legend.pdf"
     filepath = os.path.join(output_dir, filename)
-    plt.savefig(filepath, format='pdf', bbox_inches='tight', dpi=300)
+    with (report or RunReport('plots')).stage(f'save:{filename}') as stats:
+        with atomic_open(filepath) as f:
+            plt.savefig(f, format='pdf', bbox_inches='tight', dpi=300)
+        stats['bytes_out'] = file_size(filepath)
     print(f"\nSaved combined plot as: {filepath}")
     plt.show()
 
-def main():
+def distribution_inputs():
+    """Arguments of distribution_plots.render_distributions for every system of the table, coloured by model group"""
+    shown = (df.iloc[:, 0].astype(str).str.strip() != 'nan').to_numpy()
+    open_source = get_group_mask('llama_only')[shown]
+    closed_source = get_group_mask('non_llama')[shown]
+    groups = [
+        (model_groups['llama_only']['title'], colorblind_friendly_colors[0], open_source & ~closed_source),
+        (model_groups['non_llama']['title'], colorblind_friendly_colors[1], closed_source & ~open_source),
+        ('In both spider-plot groups', colorblind_friendly_colors[4], open_source & closed_source),
+        ('Not in a spider-plot group', colorblind_friendly_colors[7], ~open_source & ~closed_source),
+    ]
+    labels = [individual_metric_renames.get(metric, metric) for metric in metrics_to_plot]
+    categories = [(category, count) for category, _, count in category_spans()]
+    return metric_matrix[shown], labels, categories, groups
+
+def generate_distribution_plot(output_dir=DEFAULT_OUTPUT_DIR, report=None, pending=None):
+    """Generate (or reuse the cached) per-metric distribution plot
+
+    pending: future of a render_distributions call already submitted to a worker.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    filepath = os.path.join(output_dir, DISTRIBUTION_FILE)
+    with (report or RunReport('plots')).stage(f'save:{DISTRIBUTION_FILE}') as stats:
+        if pending is not None:
+            result = pending.result()
+        else:
+            values, labels, categories, groups = distribution_inputs()
+            result = render_distributions(values, labels, categories, groups, filepath)
+        stats['cache'] = 'hit' if result['cached'] else 'miss'
+        stats['bytes_out'] = result['bytes']
+    if result['cached']:
+        print(f"Distribution plot unchanged: {filepath}")
+    else:
+        print(f"Saved distribution plot as: {filepath}")
+
+
+def main(verbose=False, source=None, output_dir=DEFAULT_OUTPUT_DIR, report=None):
     """Main function to generate both individual and combined plots"""
+    logging.basicConfig(level=logging.DEBUG if verbose else logging.INFO, format='%(message)s')
+    report = report or RunReport('plots')
+    with report.stage('plots_load') as stats:
+        load_data(source)
+        stats['rows'] = len(df)
+
     print("Spider Plot Generator - Unified Script (2 Plots)")
     print("=" * 50)
     
-    # Generate individual plots
-    generate_individual_plots()
-    
-    # Generate combined plot
-    generate_combined_plot()
+    # The distribution plot renders in a worker process while the spider plots are drawn
+    from concurrent.futures import ProcessPoolExecutor
+
+    os.makedirs(output_dir, exist_ok=True)
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        pending = pool.submit(render_distributions, *distribution_inputs(),
+                              os.path.join(output_dir, DISTRIBUTION_FILE))
+
+        # Generate individual plots
+        with report.stage('plots_individual'):
+            generate_individual_plots(output_dir, report)
+
+        # Generate combined plot
+        with report.stage('plots_combined'):
+            generate_combined_plot(output_dir, report)
+
+        with report.stage('plots_distributions'):
+            generate_distribution_plot(output_dir, report, pending)
     
     print("\n" + "="*80)
     print("ALL PLOTS GENERATED SUCCESSFULLY!")
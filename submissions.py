@@ -0,0 +1,287 @@
+"""Batch ingestion of leaderboard submissions from a directory.
+
+Each file submits one system, in the sheet's units, as JSON or CSV:
+
+    my-system.json  {"system": "My System (o3)", "lm": "o3", "system_type": "Open Pipeline",
+                     "organization": "52.1%", "nugget_coverage": 0.41, ...}
+    my-system.csv   a header row (System Name, lm, open/close or system, lm,
+                    system_type, then metric columns) and one data row
+
+Metrics are named by registry key, sheet column or display name ("Nugget
+Cov." for "Nugget<br>Cov."), and may also be nested under a "metrics" object
+in JSON; a JSON list or a CSV with several
+rows submits several systems. All submissions are validated together as
+one (submissions x metrics) matrix: unknown fields, non-numeric values,
+out-of-range values, likely percentage/fraction mix-ups (both from
+validation.check_matrix) and a missing system name reject a submission; a missing metric is allowed and counts as 0, like an
+empty sheet cell.
+
+Accepted submissions are keyed by System Name + lm. Repeated keys are
+deduplicated: identical submissions are duplicates, differing ones are
+conflicts, and the file last in name order wins. They are then upserted
+into the sheet through a hash index of its keys: a known system is
+updated in place (or left alone when unchanged), a new one appended. An
+update only overwrites the metrics the submission gives; the others keep
+their sheet cells, and the overwritten cells are listed in the report.
+"""
+import csv
+import glob
+import json
+import math
+import os
+from datetime import datetime, timezone
+
+import numpy as np
+
+from atomic_io import atomic_open
+from metrics import METRIC_COLUMNS, METRIC_DISPLAY_NAMES, METRIC_SPECS
+from results_ingest import IDENTITY_FIELDS, metric_value, spreadsheet_precision
+from validation import check_matrix
+
+SUBMISSIONS_FILE = 'leaderboard_submissions.json'
+PATTERNS = ('*.json', '*.csv')
+
+# Identity column of every accepted name: record field or sheet column
+_IDENTITY_NAMES = {**{column: column for column in IDENTITY_FIELDS.values()}, **IDENTITY_FIELDS}
+# Metric position of every accepted name: registry key, sheet column or display name
+# (as in the CSV, or with its <br> written as a space)
+_METRIC_POSITIONS = {name: i for i, spec in enumerate(METRIC_SPECS)
+                     for name in (spec['key'], spec['column'], spec['display'], spec['display'].replace('<br>', ' '))}
+
+
+def _text(value):
+    """Stripped cell text, '' for missing cells"""
+    return '' if value is None or (isinstance(value, float) and math.isnan(value)) else str(value).strip()
+
+
+def submission_key(name, lm):
+    """Hash key of a system: stripped System Name and lm ('' when missing)"""
+    return str(name).strip(), _text(lm)
+
+
+def read_submission_file(path):
+    """Records (dicts) of a JSON or CSV submission file"""
+    if path.endswith('.csv'):
+        with open(path, newline='', encoding='utf-8') as f:
+            return [{name.strip(): value for name, value in row.items() if name}
+                    for row in csv.DictReader(f) if any((value or '').strip() for value in row.values())]
+    with open(path, encoding='utf-8') as f:
+        try:
+            data = json.load(f)
+        except ValueError as e:
+            raise ValueError(f"{path}: invalid JSON: {e}") from None
+    records = data if isinstance(data, list) else [data]
+    if not all(isinstance(record, dict) for record in records):
+        raise ValueError(f"{path}: expected an object or a list of objects")
+    return records
+
+
+def load_submissions(directory):
+    """(records, source file of each record) of every submission file, in file name order
+
+    Files that cannot be read are returned as records with an '_error'.
+    """
+    paths = sorted(path for pattern in PATTERNS for path in glob.glob(os.path.join(directory, pattern)))
+    records, sources = [], []
+    for path in paths:
+        try:
+            found = read_submission_file(path)
+        except (OSError, UnicodeDecodeError, ValueError) as e:
+            found = [{'_error': str(e)}]
+        records += found
+        sources += [os.path.basename(path)] * len(found)
+    return records, sources
+
+
+def submission_matrix(records):
+    """(identities, raw values, given, unknown fields) of a batch of records
+
+    values: (records x metrics) floats in sheet units, NaN where missing or not numeric;
+    given[i, j]: record i has a non-empty value for metric j;
+    unknown[i]: fields of record i that are neither identity nor metric names
+    (nested ones as 'metrics.NAME'), and 'metrics' itself when it is not an object.
+    """
+    identities = []
+    values = np.full((len(records), len(METRIC_COLUMNS)), np.nan)
+    given = np.zeros(values.shape, dtype=bool)
+    unknown = []
+    for i, record in enumerate(records):
+        identity = {'System Name': None, 'lm': None, 'open/close': None}
+        nested = record.get('metrics', {})
+        fields = {name: value for name, value in record.items() if name not in ('_error', 'metrics')}
+        unknown.append([] if isinstance(nested, dict) else ['metrics (not an object)'])
+        for prefix, source in (('', fields), ('metrics.', nested if isinstance(nested, dict) else {})):
+            for name, value in source.items():
+                if name in _IDENTITY_NAMES and not prefix:
+                    identity[_IDENTITY_NAMES[name]] = value
+                elif name in _METRIC_POSITIONS:
+                    values[i, _METRIC_POSITIONS[name]] = metric_value(value)
+                    given[i, _METRIC_POSITIONS[name]] = value is not None and str(value).strip() != ''
+                else:
+                    unknown[i].append(prefix + name)
+        identities.append(identity)
+    return identities, values, given, unknown
+
+
+def validate_submissions(records, sources):
+    """(accepted record positions, rejections [{file, system, errors}], identities, raw values, given) of a batch"""
+    identities, values, given, unknown = submission_matrix(records)
+    non_numeric = given & np.isnan(values)
+    flags = check_matrix(values)
+    errors = [[record['_error']] if '_error' in record else [] for record in records]
+    for i, j in zip(*np.nonzero(non_numeric)):
+        errors[i].append(f"{METRIC_SPECS[j]['key']}: not a number")
+    for i, j in zip(*np.nonzero(flags['out_of_range'])):
+        errors[i].append(f"{METRIC_SPECS[j]['key']}: out of range ({values[i, j]:g})")
+    for i, j in zip(*np.nonzero(flags['scale_mixup'] & ~flags['out_of_range'])):
+        unit = 'percentage' if METRIC_SPECS[j]['percent'] else 'fraction'
+        errors[i].append(f"{METRIC_SPECS[j]['key']}: looks like the wrong scale for a {unit} ({values[i, j]:g})")
+    for i, identity in enumerate(identities):
+        if unknown[i]:
+            errors[i].append(f"unknown fields: {', '.join(unknown[i])}")
+        if not _text(identity['System Name']) and '_error' not in records[i]:
+            errors[i].append("missing system name")
+    accepted = [i for i in range(len(records)) if not errors[i]]
+    rejected = [{'file': sources[i], 'system': identities[i]['System Name'], 'errors': errors[i]}
+                for i in range(len(records)) if errors[i]]
+    return accepted, rejected, identities, values, given
+
+
+def ingest_submissions(directory):
+    """Validated, deduplicated sheet-layout rows of a submissions directory, and the ingestion report"""
+    records, sources = load_submissions(directory)
+    accepted, rejected, identities, values, given = validate_submissions(records, sources)
+
+    rows = {}
+    duplicates, conflicts = [], {}
+    for i in accepted:
+        name, lm = submission_key(identities[i]['System Name'], identities[i]['lm'])
+        row = {'System Name': name, 'lm': lm, 'open/close': _text(identities[i]['open/close']), 'source': sources[i],
+               'given': [column for column, present in zip(METRIC_COLUMNS, given[i]) if present]}
+        row.update(zip(METRIC_COLUMNS, spreadsheet_precision(values[i].tolist())))
+        previous = rows.get((name, lm))
+        if previous is not None:
+            same = previous['open/close'] == row['open/close'] and np.array_equal(
+                [previous[column] for column in METRIC_COLUMNS], [row[column] for column in METRIC_COLUMNS],
+                equal_nan=True)
+            if same:
+                duplicates.append({'system': name, 'lm': lm, 'file': sources[i], 'duplicate_of': previous['source']})
+                continue
+            conflicts.setdefault((name, lm), [previous['source']]).append(sources[i])
+        rows[(name, lm)] = row
+
+    report = {
+        'directory': directory,
+        'files': len(set(sources)),
+        'submissions': len(records),
+        'accepted': len(rows),
+        'rejected': rejected,
+        'duplicates': duplicates,
+        'conflicts': [{'system': name, 'lm': lm, 'files': files, 'kept': files[-1]}
+                      for (name, lm), files in conflicts.items()],
+    }
+    return list(rows.values()), report
+
+
+def _merge_update(existing_cells, system_type, row):
+    """(submission row completed from an existing sheet row, metric cells it overwrites)
+
+    Metrics and system type the submission leaves out keep their sheet cells.
+    """
+    merged = dict(row)
+    overwritten = []
+    for column, cell in zip(METRIC_COLUMNS, existing_cells):
+        if column not in row['given']:
+            merged[column] = cell
+            continue
+        previous = metric_value(cell)
+        if previous != row[column]:
+            overwritten.append({'metric': METRIC_DISPLAY_NAMES[column],
+                                'previous': None if math.isnan(previous) else previous, 'value': row[column]})
+    if not row['open/close']:
+        merged['open/close'] = _text(system_type)
+    merged['overwritten'] = overwritten
+    return merged, bool(overwritten) or _text(system_type) != merged['open/close']
+
+
+def _upsert_plan(keys, rows):
+    """(updates [(position, row)], inserts [row]) of rows against the hash index of the existing keys"""
+    index = {}
+    for position, key in enumerate(keys):
+        index.setdefault(key, position)
+    updates, inserts = [], []
+    for row in rows:
+        position = index.get((row['System Name'], row['lm']))
+        if position is None:
+            inserts.append(row)
+        else:
+            updates.append((position, row))
+    return updates, inserts
+
+
+def _outcome(report, updated, unchanged, inserts):
+    def entries(rows):
+        return [{'system': row['System Name'], 'lm': row['lm'], 'file': row['source'],
+                 **({'overwritten': row['overwritten']} if 'overwritten' in row else {})} for row in rows]
+
+    report.update(inserted=entries(inserts), updated=entries(updated), unchanged=entries(unchanged),
+                  generated=datetime.now(timezone.utc).isoformat())
+    return report
+
+
+def upsert_submissions(df, rows, report):
+    """Sheet DataFrame with the submission rows upserted on System Name + lm; fills in the report's outcome"""
+    import pandas as pd
+
+    updates, inserts = _upsert_plan([submission_key(name, lm) for name, lm in zip(df.iloc[:, 0], df['lm'])], rows)
+    columns = ['System Name', 'lm', 'open/close'] + METRIC_COLUMNS
+    existing = df[METRIC_COLUMNS].to_numpy(dtype=object)
+    system_types = df['open/close'].to_numpy(dtype=object)
+    updated, unchanged = [], []
+    for position, row in updates:
+        row, changed = _merge_update(existing[position], system_types[position], row)
+        (updated if changed else unchanged).append((position, row))
+    if updated:
+        df = df.copy()
+        positions = [position for position, _ in updated]
+        for column in columns:
+            if column not in METRIC_COLUMNS and df[column].dtype != object:
+                df[column] = df[column].astype(object)
+            df.iloc[positions, df.columns.get_loc(column)] = [row[column] for _, row in updated]
+    if inserts:
+        df = pd.concat([df, pd.DataFrame([{column: row[column] for column in columns} for row in inserts])],
+                       ignore_index=True)
+    return df, _outcome(report, [row for _, row in updated], [row for _, row in unchanged], inserts)
+
+
+def upsert_submission_rows(columns, data, rows, report):
+    """Fast-engine version of upsert_submissions on (columns, text rows) from fast_engine.load_rows"""
+    positions = {column: columns.index(column) for column in ['System Name', 'lm', 'open/close'] + METRIC_COLUMNS}
+    lm, system_type = positions['lm'], positions['open/close']
+    updates, inserts = _upsert_plan([submission_key(row[0], row[lm]) for row in data], rows)
+
+    def cells(row, base):
+        for column, position in positions.items():
+            value = row[column]
+            base[position] = repr(value) if isinstance(value, float) and not math.isnan(value) else _text(value)
+        return base
+
+    merged = list(data)
+    updated, unchanged = [], []
+    for position, row in updates:
+        existing = [data[position][positions[column]] for column in METRIC_COLUMNS]
+        row, changed = _merge_update(existing, data[position][system_type], row)
+        if changed:
+            merged[position] = cells(row, list(data[position]))
+            updated.append(row)
+        else:
+            unchanged.append(row)
+    merged += [cells(row, [''] * len(columns)) for row in inserts]
+    return merged, _outcome(report, updated, unchanged, inserts)
+
+
+def write_submissions_report(report, path):
+    """Save an ingestion report as JSON (atomically)"""
+    with atomic_open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    return path
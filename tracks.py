@@ -0,0 +1,154 @@
+"""Build several sheet tabs ("tracks") in one run.
+
+A tracks file lists the sources, one leaderboard per track:
+
+    {
+      "tracks": [
+        {"name": "main", "gid": "122040106"},
+        {"name": "archive", "sheet_id": "...", "gid": "0"},
+        {"name": "local", "url": "fixtures/local.csv"}
+      ]
+    }
+
+All tracks are fetched concurrently in a thread pool (so refreshing every
+track takes about as long as the slowest fetch), then processed and
+rendered in parallel worker processes into <output-dir>/<track>/.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from http_session import configure_session
+from instrumentation import RunReport
+from sheet_source import SHEET_ID, export_url, fetch_sheet
+
+# Stages that run per track after the concurrent fetch
+TRACK_STAGES = {
+    'fetch': [],
+    'process': ['process'],
+    'html': ['html'],
+    'plots': ['plots'],
+    'build': ['process', 'html'],
+    'all': ['process', 'html', 'plots'],
+}
+
+_TRACK_NAME = re.compile(r'^[A-Za-z0-9][A-Za-z0-9_.-]*$')
+
+
+def load_tracks(path):
+    """Read and validate a tracks file; returns [{'name', 'url'}]"""
+    with open(path, encoding='utf-8') as f:
+        config = json.load(f)
+
+    tracks = []
+    for entry in config.get('tracks', []):
+        name = entry.get('name', '')
+        if not _TRACK_NAME.match(name):
+            raise ValueError(f"{path}: invalid track name {name!r} (letters, digits, '_', '-', '.')")
+        if name in {track['name'] for track in tracks}:
+            raise ValueError(f"{path}: duplicate track name {name!r}")
+        if 'url' in entry:
+            url = entry['url']
+        elif 'gid' in entry:
+            url = export_url(entry.get('sheet_id', SHEET_ID), entry['gid'])
+        else:
+            raise ValueError(f"{path}: track {name!r} needs a 'url' or a 'gid'")
+        tracks.append({'name': name, 'url': url})
+    if not tracks:
+        raise ValueError(f"{path}: no tracks configured")
+    return tracks
+
+
+def track_args(args, track):
+    """Copy of the CLI arguments pointed at one track's source, cache and output directories"""
+    values = dict(vars(args))
+    values.update(
+        source=track['url'],
+        sheet_cache=os.path.join(os.path.dirname(args.sheet_cache), 'tracks', f"{track['name']}.csv"),
+        output_dir=os.path.join(args.output_dir, track['name']),
+        plots_dir=os.path.join(args.plots_dir, track['name']),
+        history=os.path.join(os.path.dirname(args.history), track['name'], os.path.basename(args.history))
+        if args.history else None,
+        tracks=None,
+    )
+    return argparse.Namespace(**values)
+
+
+def _fetch_track(args):
+    """Fetch one track's export; returns (result, wall seconds)"""
+    start = time.perf_counter()
+    result = fetch_sheet(args.source, args.sheet_cache)
+    return result, time.perf_counter() - start
+
+
+def _build_track(stage_names, args):
+    """Worker: run the per-track stages; returns (captured output, stage entries)"""
+    import create_leaderboard
+
+    # Don't share the parent's pooled connections with forked workers
+    configure_session(connect_timeout=args.connect_timeout, read_timeout=args.timeout, retries=args.retries)
+    if 'plots' in stage_names:
+        import matplotlib
+        matplotlib.use('Agg')
+
+    report = RunReport(os.path.basename(args.output_dir))
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        for name in stage_names:
+            create_leaderboard.STAGES[name][0](args, report)
+    return output.getvalue(), report.stages
+
+
+def fetch_tracks(tracks, args, report):
+    """Fetch every track concurrently; one report entry per track"""
+    per_track = [track_args(args, track) for track in tracks]
+    print(f"⬇️  Fetching {len(tracks)} tracks concurrently")
+    with report.stage('fetch_tracks', rows=len(tracks)) as stats:
+        with ThreadPoolExecutor(max_workers=len(tracks)) as pool:
+            results = list(pool.map(_fetch_track, per_track))
+        stats['bytes_in'] = sum(0 if result['cached'] else result['bytes'] for result, _ in results)
+
+    for track, (result, wall) in zip(tracks, results):
+        report.stages.append({
+            'name': f"{track['name']}/fetch",
+            'status': 'ok',
+            'wall_s': round(wall, 6),
+            'bytes_in': 0 if result['cached'] else result['bytes'],
+            'cache': 'hit' if result['cached'] else 'miss',
+        })
+        state = "unchanged" if result['cached'] else f"{result['bytes']} bytes"
+        print(f"  ✅ {track['name']}: {state}")
+
+
+def build_tracks(tracks, stage_names, args, report):
+    """Process/render every track in parallel worker processes"""
+    per_track = [track_args(args, track) for track in tracks]
+    jobs = min(len(tracks), args.jobs or os.cpu_count() or 1)
+    print(f"🏗️  Building {len(tracks)} tracks with {jobs} worker(s)")
+    with report.stage('build_tracks', rows=len(tracks)):
+        if jobs == 1:
+            results = [_build_track(stage_names, track) for track in per_track]
+        else:
+            with ProcessPoolExecutor(max_workers=jobs) as pool:
+                results = list(pool.map(_build_track, [stage_names] * len(per_track), per_track))
+
+    for track, (output, stages) in zip(tracks, results):
+        print(f"\n📂 Track {track['name']}")
+        print(output, end='')
+        for entry in stages:
+            entry['name'] = f"{track['name']}/{entry['name']}"
+            report.stages.append(entry)
+
+
+def run_tracks(args, stage, report):
+    """Run a CLI stage for every track in args.tracks"""
+    tracks = load_tracks(args.tracks)
+    if stage in ('fetch', 'build', 'all'):
+        fetch_tracks(tracks, args, report)
+    if TRACK_STAGES[stage]:
+        build_tracks(tracks, TRACK_STAGES[stage], args, report)
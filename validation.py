@@ -0,0 +1,152 @@
+"""Anomaly checks on the raw metric values of a build, before normalisation hides them.
+
+normalize_matrix divides percentages by 100, fills missing cells and clips
+to the metric's maximum, so a fraction typed into a percentage column (or
+the reverse) ends up looking like an ordinary score. The checks run on the
+raw (systems x metrics) matrix as whole-matrix comparisons:
+
+    out_of_range  value below 0 or above the metric's maximum after scaling
+    clipped       value lowered to the maximum by the clip
+    filled        missing or non-numeric cell replaced by the fill value
+    scale_mixup   0 < value <= 1 in a percentage column, or
+                  1 < value <= 100 in a fraction column
+    jump          normalised score moved by at least z_threshold standard
+                  deviations since the previous build, for the same System
+                  Name + lm (spread of the metric across those systems in
+                  the previous build)
+
+The report counts every check per metric and lists the first MAX_ISSUES
+cells of each, with the raw value and the normalised score. A check fails the build when its count exceeds its limit.
+"""
+import csv
+import json
+from datetime import datetime, timezone
+
+import numpy as np
+
+from atomic_io import atomic_open
+from metrics import METRIC_DISPLAY_NAMES, METRIC_SPECS, compile_specs, normalize_matrix
+
+CHECKS = ('out_of_range', 'clipped', 'filled', 'scale_mixup', 'jump')
+Z_THRESHOLD = 2.0
+MAX_ISSUES = 100
+VALIDATION_FILE = 'leaderboard_validation.json'
+
+
+class ValidationError(SystemExit):
+    """Raised when a check exceeds its limit; .report holds the full report
+
+    A SystemExit, so the CLI stops with the message and a non-zero status.
+    """
+
+    def __init__(self, message, report):
+        super().__init__(message)
+        self.report = report
+
+
+def parse_limits(values):
+    """{check: max count} from 'CHECK=COUNT' strings"""
+    limits = {}
+    for value in values or []:
+        check, _, count = value.partition('=')
+        if check not in CHECKS or not count.isdigit():
+            raise ValueError(f"invalid limit {value!r} (expected CHECK=COUNT with CHECK one of {', '.join(CHECKS)})")
+        limits[check] = int(count)
+    return limits
+
+
+def previous_scores(content, keys):
+    """(normalised scores, present) of keys in a previous leaderboard CSV, aligned with keys; NaN where absent"""
+    scores = np.full((len(keys), len(METRIC_SPECS)), np.nan)
+    if not content:
+        return scores, np.zeros(len(keys), dtype=bool)
+    lines = content.decode('utf-8').splitlines()
+    header = next(csv.reader(lines[:1]), [])
+    # System Name, lm and System Type, then the metrics: plain numbers, split off each line without the csv module
+    n_metrics = len(header) - 3
+    split = [line.rsplit(',', n_metrics) for line in lines[1:] if line]
+    index = {}
+    for position, row in enumerate(csv.reader([parts[0] for parts in split])):
+        index.setdefault((row[0], row[1]), position)
+    positions = np.array([index.get(key, -1) for key in keys], dtype=np.int64)
+    present = positions >= 0
+    display = [METRIC_DISPLAY_NAMES[spec['column']] for spec in METRIC_SPECS]
+    columns = [i for i, name in enumerate(display) if name in header[3:]]
+    if present.any() and columns:
+        # Every matched row's metric cells, converted in one call
+        text = ','.join(','.join(split[p][1:]) for p in positions[present].tolist())
+        values = np.fromstring(text, sep=',').reshape(int(present.sum()), n_metrics)
+        scores[np.ix_(present, columns)] = values[:, [header.index(display[i]) - 3 for i in columns]]
+    return scores, present
+
+
+def check_matrix(raw, previous=None, z_threshold=Z_THRESHOLD, compiled=None):
+    """{check: (systems x metrics) bool} for a raw metric matrix (NaN for missing cells)
+
+    previous: normalised scores of the same systems in the previous build (NaN where absent).
+    """
+    compiled = compiled or compile_specs()
+    raw = np.asarray(raw, dtype=float).reshape(-1, len(compiled['columns']))
+    missing = np.isnan(raw)
+    with np.errstate(invalid='ignore'):
+        scaled = raw / compiled['scale']
+        clipped = scaled > compiled['clip_upper']
+        percent = compiled['scale'] != 1.0
+        mixup = np.where(percent, (raw > 0) & (raw <= 1), (raw > 1) & (raw <= 100))
+        flags = {
+            'out_of_range': (scaled < 0) | clipped,
+            'clipped': clipped,
+            'filled': missing,
+            'scale_mixup': mixup,
+            'jump': np.zeros(raw.shape, dtype=bool),
+        }
+        if previous is not None:
+            previous = np.asarray(previous, dtype=float)
+            spread = np.nanstd(previous, axis=0) if np.isfinite(previous).any() else np.zeros(raw.shape[1])
+            change = np.abs(normalize_matrix(raw, compiled) - previous)
+            # A constant metric has no spread: any change of it is a jump
+            flags['jump'] = np.where(spread > 0, change >= z_threshold * spread, change > 0) & ~np.isnan(change)
+    return flags
+
+
+def validation_report(raw, names, lms, previous=None, limits=None, z_threshold=Z_THRESHOLD):
+    """Counts, sample issues and failed checks of a build's raw metric matrix"""
+    compiled = compile_specs()
+    raw = np.asarray(raw, dtype=float).reshape(-1, len(compiled['columns']))
+    flags = check_matrix(raw, previous, z_threshold, compiled)
+    scores = normalize_matrix(raw, compiled)
+    display = [METRIC_DISPLAY_NAMES[column] for column in compiled['columns']]
+    limits = limits or {}
+    counts = {}
+    issues = {}
+    failed = []
+    for check in CHECKS:
+        per_metric = flags[check].sum(axis=0)
+        counts[check] = dict(zip(display, per_metric.tolist()), total=int(per_metric.sum()))
+        rows, columns = np.nonzero(flags[check])
+        issues[check] = [{
+            'system': names[i],
+            'lm': lms[i],
+            'metric': display[j],
+            'value': None if np.isnan(raw[i, j]) else float(raw[i, j]),
+            'score': round(float(scores[i, j]), 6),
+            'previous': None if previous is None or np.isnan(previous[i, j]) else round(float(previous[i, j]), 6),
+        } for i, j in zip(rows[:MAX_ISSUES].tolist(), columns[:MAX_ISSUES].tolist())]
+        if check in limits and counts[check]['total'] > limits[check]:
+            failed.append(check)
+    return {
+        'systems': len(raw),
+        'z_threshold': z_threshold,
+        'limits': limits,
+        'counts': counts,
+        'issues': issues,
+        'failed': failed,
+        'generated': datetime.now(timezone.utc).isoformat(),
+    }
+
+
+def write_validation(report, path):
+    """Save a validation report as JSON (atomically)"""
+    with atomic_open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    return path
@@ -0,0 +1,136 @@
+"""Watch mode: poll the sheet and regenerate the leaderboard when it changes.
+
+Every --interval seconds the export is fetched with a conditional request
+(a 304 costs one round trip and no parsing). When the sheet changed, polling
+switches to --debounce seconds until the sheet stops changing, so a burst
+of edits triggers one rebuild. Only artifacts whose content changed are
+rewritten, each atomically (temp file + rename), so the served HTML is
+never half-written.
+"""
+import hashlib
+import os
+import time
+
+from atomic_io import atomic_open
+from instrumentation import RunReport
+from sheet_source import fetch_sheet, sheet_url
+from validation import ValidationError
+
+
+def _fetch(url, cache_path):
+    """Conditional fetch; returns True if the sheet changed"""
+    return not fetch_sheet(url, cache_path)['cached']
+
+
+def wait_until_settled(url, cache_path, debounce, max_wait):
+    """Keep re-fetching every debounce seconds until a poll sees no change (or max_wait passes)"""
+    deadline = time.monotonic() + max_wait
+    polls = 0
+    while time.monotonic() < deadline:
+        time.sleep(debounce)
+        polls += 1
+        try:
+            if not _fetch(url, cache_path):
+                break
+        except OSError:
+            # Build from what we have; the next tick retries
+            break
+    return polls
+
+
+def regenerate(args, report):
+    """Rebuild from the cached sheet; returns the list of artifacts that were rewritten"""
+    from create_leaderboard import (_is_missing, load_data, merge_ingested_results, merge_submissions, process_data,
+                                    raw_metric_values, read_bytes, record_snapshot, update_changes, update_correlation,
+                                    validate_build, write_html)
+    from leaderboard_diff import CHANGES_FILE, read_changes
+
+    with report.stage('parse') as stats:
+        df = load_data(args.sheet_cache)
+        stats['rows'] = len(df)
+    df = merge_ingested_results(df, args, report)
+    df = merge_submissions(df, args, report)
+    csv_file = os.path.join(args.output_dir, 'leaderboard_data.csv')
+    previous_content = read_bytes(csv_file)
+    with report.stage('normalise', rows=len(df)):
+        raw = raw_metric_values(df)
+        leaderboard_data, metric_columns = process_data(df, raw)
+    kept = df[df['System Name'] != 'nan']
+    validate_build(args, kept['System Name'].tolist(), ['' if _is_missing(lm) else lm for lm in kept['lm']], raw,
+                   previous_content, report)
+
+    csv_bytes = leaderboard_data.to_csv(index=False).encode('utf-8')
+    if previous_content == csv_bytes:
+        # An edit outside the leaderboard columns (notes, other metrics): nothing to redraw
+        return []
+
+    changes = update_changes(args, previous_content, csv_bytes, report)
+    with report.stage('csv_write', rows=len(leaderboard_data), bytes_out=len(csv_bytes)):
+        with atomic_open(csv_file) as f:
+            f.write(csv_bytes)
+    record_snapshot(args, csv_file, report)
+    update_correlation(args, csv_file, report)
+    if changes is None:
+        changes = read_changes(os.path.join(args.output_dir, CHANGES_FILE))
+    changed = [csv_file, write_html(leaderboard_data, metric_columns, args.output_dir, report, changes)]
+    if args.with_plots:
+        import spiderplot_unified
+
+        spiderplot_unified.main(verbose=args.verbose, source=args.sheet_cache, output_dir=args.plots_dir,
+                                report=report)
+        changed.append(args.plots_dir)
+    return changed
+
+
+def watch(args):
+    """Poll the sheet and regenerate changed artifacts until interrupted (or --max-polls)"""
+    url = args.source or sheet_url()
+    print(f"👀 Watching {url} every {args.interval}s (debounce {args.debounce}s)")
+
+    polls = 0
+    first = True
+    try:
+        while args.max_polls is None or polls < args.max_polls:
+            polls += 1
+            try:
+                changed = _fetch(url, args.sheet_cache)
+            except OSError as e:
+                # Keep the last good build and try again on the next tick
+                print(f"⚠️  Fetch failed, keeping current leaderboard: {e}")
+                changed = False
+
+            if (changed or first) and os.path.exists(args.sheet_cache):
+                if changed and not first:
+                    polls += wait_until_settled(url, args.sheet_cache, args.debounce, args.debounce * 10)
+                report = RunReport('watch')
+                try:
+                    with report.stage('regenerate'):
+                        rewritten = regenerate(args, report)
+                except ValidationError as e:
+                    # Keep the last good build until the sheet is fixed
+                    failure, rewritten = e, None
+                except Exception as e:
+                    # E.g. a renamed metric column: keep the last good build until the sheet changes again
+                    failure, rewritten = f"build failed ({type(e).__name__}: {e})", None
+                if args.report:
+                    report.write(args.report)
+                sheet_hash = _file_hash(args.sheet_cache)
+                if rewritten is None:
+                    print(f"⚠️  Sheet {sheet_hash} -> {failure}, keeping current leaderboard")
+                elif rewritten:
+                    print(f"🔄 Sheet {sheet_hash} -> rewrote {len(rewritten)} artifact(s)")
+                else:
+                    print(f"✅ Sheet {sheet_hash} -> leaderboard unchanged")
+                first = False
+
+            if args.max_polls is None or polls < args.max_polls:
+                time.sleep(args.interval)
+    except KeyboardInterrupt:
+        print("\n👋 Stopped watching")
+    return polls
+
+
+def _file_hash(path):
+    """Short content hash for log lines"""
+    with open(path, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()[:10]